@@ -2,10 +2,13 @@
 from __future__ import annotations
 
 from typing import Dict, List, Optional, Tuple
+import numpy as np
 import streamlit as st
 import pandas as pd
 
+from data.log_mirror import fetch_log_rows
 from services.supabase_client import get_supabase_client
+from utils.deck_utils import deck_keys_from_codes, make_deck_codes, unpack_deck_codes
 
 
 # -------------------------
@@ -59,13 +62,14 @@ def make_def_key(a: str, b: str, c: str) -> str:
     return "|".join([a] + rest)
 
 
-def _is_win(result: str) -> Optional[bool]:
-    r = (result or "").strip()
-    if r == "Win":
-        return True
-    if r == "Lose":
-        return False
-    return None
+def make_def_codes(a: pd.Series, b: pd.Series, c: pd.Series) -> np.ndarray:
+    """
+    make_def_key의 정수 코드 버전(utils.deck_utils.make_deck_codes).
+    2,3번 슬롯 중 하나라도 비면 0(= 키 "").
+    """
+    codes = make_deck_codes(a, b, c)
+    _, _, last = unpack_deck_codes(codes)
+    return np.where(last == 0, 0, codes)
 
 
 def _pct(win: int, total: int) -> str:
@@ -75,39 +79,86 @@ def _pct(win: int, total: int) -> str:
 
 
 # -------------------------
-# Public APIs
+# Count cube
 # -------------------------
+CUBE_COLUMNS = ["def_key", "opp_guild", "first_seen", "d1", "d2", "d3", "win", "lose", "other"]
+
+
 @st.cache_data(ttl=300)
-def get_opp_guild_options() -> List[str]:
+def get_defense_count_cube() -> pd.DataFrame:
     """
-    defense_logs에서 opp_guild 유니크 목록(전량 스캔).
+    defense_logs 1회 전량 스캔으로 만든 (def_key × opp_guild × result) 카운트 큐브.
+    셀 하나 = (def_key, opp_guild 원본값), 컬럼 win/lose/other. def_key/opp_guild는 Categorical.
+    first_seen/d1~d3은 그 셀에서 처음 나온 Win/Lose row의 스캔 순번과 원본 표시 순서(없으면 None).
+    def_key가 ""인 셀은 비정상 덱 row(길드 목록에만 쓰임).
+    Best Defense의 모든 뷰가 이 큐브를 잘라 쓴다.
     """
-    client = sb()
-    page_size = 1000
-    start = 0
+    df = pd.DataFrame(
+        fetch_log_rows("defense_logs", "result, opp_guild, deck1_1, deck1_2, deck1_3"),
+        columns=["result", "opp_guild", "deck1_1", "deck1_2", "deck1_3"],
+    ).rename(columns={"deck1_1": "d1", "deck1_2": "d2", "deck1_3": "d3"})
+    for col in ["opp_guild", "d1", "d2", "d3"]:
+        df[col] = df[col].fillna("")
+
+    # 셀은 (덱 코드, 길드 코드) 정수 쌍으로 묶고, 키/길드명은 셀마다 한 번만 복원해 Categorical로 둔다.
+    df["def_code"] = make_def_codes(df["d1"], df["d2"], df["d3"])
+    df["guild_code"], guilds = pd.factorize(df["opp_guild"])
+    df["first_seen"] = range(len(df))
+    # 예전 쿼리의 in_(result, [Win, Lose])와 같은 정확 일치
+    df["win"] = df["result"] == "Win"
+    df["lose"] = df["result"] == "Lose"
+    df["other"] = ~(df["win"] | df["lose"])
+
+    cell_keys = ["def_code", "guild_code"]
+    counts = df.groupby(cell_keys, sort=False)[["win", "lose", "other"]].sum()
+    shown = (
+        df[df["win"] | df["lose"]]
+        .groupby(cell_keys, sort=False)[["first_seen", "d1", "d2", "d3"]]
+        .first()
+    )
+    cube = counts.join(shown).reset_index()
+    cube["def_key"] = pd.Categorical(deck_keys_from_codes(cube["def_code"]))
+    cube["opp_guild"] = pd.Categorical.from_codes(cube["guild_code"], categories=guilds)
+    return cube[CUBE_COLUMNS]
 
-    s = set()
 
-    while True:
-        res = (
-            client
-            .table("defense_logs")
-            .select("opp_guild")
-            .range(start, start + page_size - 1)
-            .execute()
-        )
-        batch = res.data or []
-        if not batch:
-            break
+def _deck_cells(cube: pd.DataFrame) -> pd.DataFrame:
+    # 집계 대상(정상 덱 + Win/Lose) 셀만, 처음 나온 순서대로
+    cells = cube[(cube["def_key"] != "") & (cube["win"] + cube["lose"] > 0)]
+    return cells.sort_values("first_seen", kind="stable")
+
+
+def _base_map(cells: pd.DataFrame) -> Dict[str, List]:
+    # def_key -> [d1,d2,d3, win, lose], 표시는 def_key가 처음 나온 row 기준
+    base_map: Dict[str, List] = {}
+    for def_key, d1, d2, d3, w, l in cells[["def_key", "d1", "d2", "d3", "win", "lose"]].itertuples(index=False):
+        if def_key not in base_map:
+            base_map[def_key] = [d1, d2, d3, 0, 0]
+        base_map[def_key][3] += int(w)
+        base_map[def_key][4] += int(l)
+    return base_map
+
+
+def _group_pairs(cells: pd.DataFrame, guilds: set) -> Dict[str, Tuple[int, int]]:
+    in_group = cells["opp_guild"].str.strip().isin(guilds)
+    sums = cells[in_group].groupby("def_key")[["win", "lose"]].sum()
+    return {k: (int(w), int(l)) for k, w, l in sums.itertuples()}
+
 
-        for r in batch:
-            g = (r.get("opp_guild") or "").strip()
-            if g:
-                s.add(g)
+# -------------------------
+# Public APIs
+# -------------------------
+@st.cache_data(ttl=300)
+def get_opp_guild_options() -> List[str]:
+    """
+    defense_logs에서 opp_guild 유니크 목록(카운트 큐브 기준).
+    """
+    s = set()
 
-        if len(batch) < page_size:
-            break
-        start += page_size
+    for og in get_defense_count_cube()["opp_guild"]:
+        g = og.strip()
+        if g:
+            s.add(g)
 
     return sorted(s)
 
@@ -128,71 +179,11 @@ def get_defense_deck_stats(limit: int = 50) -> pd.DataFrame:
         limit = 50
     limit = int(limit)
 
-    client = sb()
-    page_size = 1000
-    start = 0
-
-    # base_map: def_key -> [d1,d2,d3, win, lose]
-    base_map: Dict[str, List] = {}
-    g32: Dict[str, Tuple[int, int]] = {}
-    g12: Dict[str, Tuple[int, int]] = {}
-    g4: Dict[str, Tuple[int, int]] = {}
-
-    def _inc_pair(m: Dict[str, Tuple[int, int]], k: str, is_win: bool):
-        w, l = m.get(k, (0, 0))
-        if is_win:
-            w += 1
-        else:
-            l += 1
-        m[k] = (w, l)
-
-    while True:
-        res = (
-            client
-            .table("defense_logs")
-            .select("result, opp_guild, deck1_1, deck1_2, deck1_3")
-            .in_("result", ["Win", "Lose"])
-            .range(start, start + page_size - 1)
-            .execute()
-        )
-        batch = res.data or []
-        if not batch:
-            break
-
-        for r in batch:
-            is_win = _is_win(r.get("result"))
-            if is_win is None:
-                continue
-
-            d1 = r.get("deck1_1") or ""
-            d2 = r.get("deck1_2") or ""
-            d3 = r.get("deck1_3") or ""
-            def_key = make_def_key(d1, d2, d3)
-            if not def_key:
-                continue
-
-            # base
-            if def_key not in base_map:
-                # 표시는 원본 순서대로(leader / deck1_2 / deck1_3)
-                base_map[def_key] = [d1, d2, d3, 0, 0]  # win, lose
-            if is_win:
-                base_map[def_key][3] += 1
-            else:
-                base_map[def_key][4] += 1
-
-            # group stats
-            og = (r.get("opp_guild") or "").strip()
-            if og:
-                if og in GUILD_GROUPS["in32"]:
-                    _inc_pair(g32, def_key, is_win)
-                if og in GUILD_GROUPS["in12"]:
-                    _inc_pair(g12, def_key, is_win)
-                if og in GUILD_GROUPS["in4"]:
-                    _inc_pair(g4, def_key, is_win)
-
-        if len(batch) < page_size:
-            break
-        start += page_size
+    cells = _deck_cells(get_defense_count_cube())
+    base_map = _base_map(cells)
+    g32 = _group_pairs(cells, GUILD_GROUPS["in32"])
+    g12 = _group_pairs(cells, GUILD_GROUPS["in12"])
+    g4 = _group_pairs(cells, GUILD_GROUPS["in4"])
 
     if not base_map:
         return pd.DataFrame([{"error": "No defense_logs data available to aggregate."}])
@@ -272,48 +263,8 @@ def get_defense_decks_vs_guild(opp_guild: str, limit: int = 50) -> pd.DataFrame:
         limit = 50
     limit = int(limit)
 
-    client = sb()
-    page_size = 1000
-    start = 0
-
-    base_map: Dict[str, List] = {}
-
-    while True:
-        res = (
-            client
-            .table("defense_logs")
-            .select("result, opp_guild, deck1_1, deck1_2, deck1_3")
-            .eq("opp_guild", opp_guild)
-            .in_("result", ["Win", "Lose"])
-            .range(start, start + page_size - 1)
-            .execute()
-        )
-        batch = res.data or []
-        if not batch:
-            break
-
-        for r in batch:
-            is_win = _is_win(r.get("result"))
-            if is_win is None:
-                continue
-
-            d1 = r.get("deck1_1") or ""
-            d2 = r.get("deck1_2") or ""
-            d3 = r.get("deck1_3") or ""
-            def_key = make_def_key(d1, d2, d3)
-            if not def_key:
-                continue
-
-            if def_key not in base_map:
-                base_map[def_key] = [d1, d2, d3, 0, 0]  # win, lose
-            if is_win:
-                base_map[def_key][3] += 1
-            else:
-                base_map[def_key][4] += 1
-
-        if len(batch) < page_size:
-            break
-        start += page_size
+    cells = _deck_cells(get_defense_count_cube())
+    base_map = _base_map(cells[cells["opp_guild"] == opp_guild])
 
     if not base_map:
         return pd.DataFrame([{"error": f"No defense deck records found vs {opp_guild}."}])
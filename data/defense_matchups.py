@@ -0,0 +1,245 @@
+# data/defense_matchups.py
+from __future__ import annotations
+
+import argparse
+from contextlib import closing
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from data.log_mirror import (
+    WATERMARK_COLUMN,
+    connect_mirror,
+    load_resynced_at,
+    load_watermark,
+    resolve_mirror_path,
+    rewind_watermark,
+    store_resynced_at,
+    store_watermark,
+    sync_mirror,
+)
+from services.supabase_client import get_supabase_client
+from utils.deck_utils import make_deck_keys, split_deck_key
+
+MATCHUP_TABLE = "defense_matchups"
+# log_id -> the cell it was counted in, so a re-synced siege_logs row moves
+# its win/lose instead of counting twice.
+LEDGER_TABLE = "defense_matchup_logs"
+MATCHUP_COLUMNS = ("o1", "o2", "o3", "win", "lose", "total", "win_rate")
+_SOURCE_COLUMNS = (
+    "log_id", WATERMARK_COLUMN, "result",
+    "deck1_1", "deck1_2", "deck1_3", "deck2_1", "deck2_2", "deck2_3",
+)
+# Keeps each IN (...) under SQLite's bound-parameter limit.
+_LEDGER_CHUNK = 500
+
+_refresh_lock = threading.Lock()
+
+
+def refresh_defense_matchups(
+    path: Optional[Path] = None,
+    client: Any = None,
+    sync: bool = True,
+    full: bool = False,
+) -> int:
+    """
+    미러의 siege_logs에서 워터마크 이후 바뀐 row만 반영해 defense_matchups(def_key × off_key)를 갱신.
+    공덱 기준 win/lose(result는 공격자 시점), 반영한 row 수를 반환.
+    full이면 siege_logs 미러부터 전체 동기화한 뒤 처음부터 다시 만든다. 미러가 전체 동기화된 뒤에도 다시 만든다.
+    """
+    path = path or resolve_mirror_path()
+    if path is None:
+        return 0
+    if sync:
+        sync_mirror("siege_logs", path=path, client=client or get_supabase_client(), full=full)
+    with _refresh_lock, closing(_connect_matchups(path)) as conn:
+        # A mirror resync can drop siege_logs rows the ledger still counts.
+        mirror_resynced_at = load_resynced_at(conn, "siege_logs")
+        if mirror_resynced_at is not None and (load_resynced_at(conn, MATCHUP_TABLE) or 0.0) < mirror_resynced_at:
+            full = True
+        if full:
+            with conn:
+                conn.execute(f"DELETE FROM {MATCHUP_TABLE}")
+                conn.execute(f"DELETE FROM {LEDGER_TABLE}")
+                conn.execute("DELETE FROM mirror_state WHERE table_name = ?", (MATCHUP_TABLE,))
+                store_resynced_at(conn, MATCHUP_TABLE, max(time.time(), mirror_resynced_at or 0.0))
+        watermark = load_watermark(conn, MATCHUP_TABLE)
+        rows = _changed_rows(conn, watermark)
+        if rows.empty:
+            return 0
+
+        entries = _ledger_entries(rows)
+        previous = _load_ledger(conn, [entry[0] for entry in entries])
+        deltas: Dict[Tuple[str, str], List[int]] = {}
+        changed = []
+        for entry in entries:
+            old = previous.get(entry[0])
+            if old == entry[1:]:
+                continue
+            if old is not None:
+                _add_delta(deltas, old, -1)
+            _add_delta(deltas, entry[1:], 1)
+            changed.append(entry)
+
+        newest = rows[WATERMARK_COLUMN].dropna().max()
+        with conn:
+            _apply_deltas(conn, deltas)
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {LEDGER_TABLE} (log_id, def_key, off_key, outcome) VALUES (?, ?, ?, ?)",
+                changed,
+            )
+            if isinstance(newest, str) and newest != watermark:
+                store_watermark(conn, MATCHUP_TABLE, newest)
+    return len(changed)
+
+
+def fetch_matchups(
+    def_key: str,
+    limit: int = 200,
+    client: Any = None,
+    path: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """
+    def_key 상대 공덱 매치업(o1,o2,o3,win,lose,total,win_rate), total/win_rate 내림차순.
+    미러가 켜져 있으면 로컬 defense_matchups를 갱신한 뒤 인덱스로 읽고, 아니면 Supabase 테이블을 읽는다.
+    """
+    path = path or resolve_mirror_path()
+    if path is None:
+        res = (
+            (client or get_supabase_client())
+            .table(MATCHUP_TABLE)
+            .select(",".join(MATCHUP_COLUMNS))
+            .eq("def_key", def_key)
+            .order("total", desc=True)
+            .order("win_rate", desc=True)
+            .limit(int(limit))
+            .execute()
+        )
+        return res.data or []
+    refresh_defense_matchups(path=path, client=client)
+    with closing(_connect_matchups(path)) as conn:
+        cursor = conn.execute(
+            f"SELECT {', '.join(MATCHUP_COLUMNS)} FROM {MATCHUP_TABLE} WHERE def_key = ? "
+            # off_key breaks ties the way the old per-query groupby ordered them.
+            "ORDER BY total DESC, win_rate DESC, off_key LIMIT ?",
+            (def_key, int(limit)),
+        )
+        return [dict(zip(MATCHUP_COLUMNS, row)) for row in cursor]
+
+
+def _connect_matchups(path: Path) -> sqlite3.Connection:
+    conn = connect_mirror(path)
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {MATCHUP_TABLE} ("
+        "def_key TEXT NOT NULL, off_key TEXT NOT NULL, "
+        "o1 TEXT, o2 TEXT, o3 TEXT, "
+        "win INTEGER NOT NULL, lose INTEGER NOT NULL, total INTEGER NOT NULL, win_rate REAL NOT NULL, "
+        "PRIMARY KEY (def_key, off_key))"
+    )
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS {MATCHUP_TABLE}_lookup "
+        f"ON {MATCHUP_TABLE} (def_key, total DESC, win_rate DESC)"
+    )
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} ("
+        "log_id PRIMARY KEY, def_key TEXT, off_key TEXT, outcome INTEGER)"
+    )
+    return conn
+
+
+def _changed_rows(conn: sqlite3.Connection, watermark: Optional[str]) -> pd.DataFrame:
+    sql = f"SELECT {', '.join(_SOURCE_COLUMNS)} FROM siege_logs"
+    params: List[Any] = []
+    if watermark is not None:
+        # Same overlap as the mirror sync: rows can reach the mirror after
+        # newer ones. The ledger makes reading them again a no-op.
+        sql += f" WHERE {WATERMARK_COLUMN} >= ?"
+        params.append(rewind_watermark(watermark))
+    cursor = conn.execute(sql + " ORDER BY log_id", params)
+    return pd.DataFrame(cursor.fetchall(), columns=list(_SOURCE_COLUMNS))
+
+
+def _ledger_entries(rows: pd.DataFrame) -> List[Tuple[Any, Optional[str], Optional[str], Optional[int]]]:
+    # (log_id, def_key, off_key, outcome); outcome 1 = offense win, 0 = loss,
+    # None when the row is not counted (other result or a missing deck).
+    def_keys = make_deck_keys(rows["deck2_1"], rows["deck2_2"], rows["deck2_3"])
+    off_keys = make_deck_keys(rows["deck1_1"], rows["deck1_2"], rows["deck1_3"])
+    outcomes = rows["result"].map({"Win": 1, "Lose": 0})
+    counted = outcomes.notna() & (def_keys != "") & (off_keys != "")
+    return [
+        (log_id, def_key, off_key, int(outcome)) if ok else (log_id, None, None, None)
+        for log_id, def_key, off_key, outcome, ok in zip(rows["log_id"], def_keys, off_keys, outcomes, counted)
+    ]
+
+
+def _load_ledger(conn: sqlite3.Connection, log_ids: Sequence[Any]) -> Dict[Any, Tuple[Any, ...]]:
+    ledger: Dict[Any, Tuple[Any, ...]] = {}
+    for start in range(0, len(log_ids), _LEDGER_CHUNK):
+        chunk = list(log_ids[start:start + _LEDGER_CHUNK])
+        cursor = conn.execute(
+            f"SELECT log_id, def_key, off_key, outcome FROM {LEDGER_TABLE} "
+            f"WHERE log_id IN ({', '.join('?' for _ in chunk)})",
+            chunk,
+        )
+        for log_id, *entry in cursor:
+            ledger[log_id] = tuple(entry)
+    return ledger
+
+
+def _add_delta(deltas: Dict[Tuple[str, str], List[int]], entry: Tuple[Any, ...], sign: int) -> None:
+    def_key, off_key, outcome = entry
+    if outcome is None:
+        return
+    cell = deltas.setdefault((def_key, off_key), [0, 0])
+    cell[0 if outcome else 1] += sign
+
+
+def _apply_deltas(conn: sqlite3.Connection, deltas: Dict[Tuple[str, str], List[int]]) -> None:
+    for (def_key, off_key), (win, lose) in deltas.items():
+        if not win and not lose:
+            continue
+        row = conn.execute(
+            f"SELECT win, lose FROM {MATCHUP_TABLE} WHERE def_key = ? AND off_key = ?",
+            (def_key, off_key),
+        ).fetchone()
+        win += row[0] if row else 0
+        lose += row[1] if row else 0
+        total = win + lose
+        if total <= 0:
+            conn.execute(
+                f"DELETE FROM {MATCHUP_TABLE} WHERE def_key = ? AND off_key = ?",
+                (def_key, off_key),
+            )
+            continue
+        o1, o2, o3 = split_deck_key(off_key)
+        conn.execute(
+            f"INSERT OR REPLACE INTO {MATCHUP_TABLE} "
+            "(def_key, off_key, o1, o2, o3, win, lose, total, win_rate) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (def_key, off_key, o1, o2, o3, win, lose, total, win / total * 100),
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Refresh the local defense_matchups table from mirrored siege_logs.")
+    parser.add_argument("--path", type=Path, default=None, help="Mirror SQLite file (defaults to SIEGE_MIRROR_PATH).")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Resync siege_logs from Supabase and rebuild every matchup instead of applying new rows.",
+    )
+    parser.add_argument("--no-sync", action="store_true", help="Skip pulling new siege_logs rows from Supabase.")
+    args = parser.parse_args(argv)
+    path = args.path or resolve_mirror_path()
+    if path is None:
+        parser.error("The mirror is disabled; pass --path or set SIEGE_MIRROR_PATH.")
+    applied = refresh_defense_matchups(path=path, sync=not args.no_sync, full=args.full)
+    print(f"Applied {applied} siege_logs rows to {MATCHUP_TABLE} in {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# data/log_mirror.py
+from __future__ import annotations
+
+import argparse
+from contextlib import closing
+from datetime import datetime, timedelta
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from services.supabase_client import get_supabase_client
+from services.supabase_scan import SCAN_PAGE_SIZE, scan_table_concurrent
+
+MIRROR_PATH_ENV = "SIEGE_MIRROR_PATH"
+DEFAULT_MIRROR_PATH = Path.home() / ".cache" / "sw-analyzer" / "siege_logs_mirror.sqlite3"
+# Reads within this window reuse the last sync instead of asking Supabase
+# for new rows again.
+MIRROR_SYNC_INTERVAL_S = 60.0
+# Incremental syncs never see rows deleted or re-keyed in Supabase, so the
+# whole table is re-read this often and rows missing from it are dropped.
+MIRROR_RESYNC_INTERVAL_S = 24 * 60 * 60.0
+PAGE_SIZE = SCAN_PAGE_SIZE
+WATERMARK_COLUMN = "updated_at"
+# Syncs page by log_id, not updated_at, so a row updated mid-scan behind the
+# cursor can carry an older timestamp than rows read after it. Re-reading a
+# short window before the watermark picks those rows up on the next sync.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# table -> (primary key, mirrored columns). Only tables known to carry a
+# unique key and an updated_at column can be mirrored; defense_logs has
+# neither as far as the app's queries show, so it is always read remotely.
+MIRROR_TABLES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "siege_logs": (
+        "log_id",
+        (
+            "log_id", "match_id", "ts", "updated_at", "wizard", "opp_wizard", "opp_guild",
+            "result", "base", "deck1_1", "deck1_2", "deck1_3", "deck2_1", "deck2_2", "deck2_3",
+        ),
+    ),
+}
+_INDEXED_COLUMNS = ("updated_at", "wizard", "opp_guild")
+
+_sync_lock = threading.Lock()
+_last_sync: Dict[Tuple[str, str], float] = {}
+
+
+def resolve_mirror_path() -> Optional[Path]:
+    # An empty SIEGE_MIRROR_PATH turns the mirror off and every read goes to Supabase.
+    value = os.environ.get(MIRROR_PATH_ENV)
+    if value is None:
+        return DEFAULT_MIRROR_PATH
+    if not value.strip():
+        return None
+    return Path(value)
+
+
+def fetch_log_rows(
+    table: str,
+    columns: str,
+    eq: Optional[Dict[str, Any]] = None,
+    in_: Optional[Dict[str, Sequence[Any]]] = None,
+    client: Any = None,
+    path: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """
+    table 전량 스캔(eq/in_ 필터). 미러가 켜져 있으면 새 row만 받아온 뒤 로컬에서 읽는다.
+    """
+    selected = _parse_columns(columns)
+    path = path or resolve_mirror_path()
+    mirrored = MIRROR_TABLES.get(table)
+    client = client or get_supabase_client()
+    if path is None or mirrored is None or not set(selected) <= set(mirrored[1]):
+        return _fetch_remote_rows(client, table, selected, eq or {}, in_ or {})
+    sync_mirror(table, path=path, client=client)
+    return _read_mirror(path, table, selected, eq or {}, in_ or {})
+
+
+def sync_mirror(
+    table: str,
+    path: Optional[Path] = None,
+    client: Any = None,
+    force: bool = False,
+    full: bool = False,
+) -> int:
+    """
+    저장된 updated_at 워터마크 이후 바뀐 row만 복사하고, 받아온 row 수를 반환.
+    full이거나 마지막 전체 동기화가 MIRROR_RESYNC_INTERVAL_S보다 오래됐으면 table 전체를 다시 받고,
+    원격에서 지워졌거나 key가 바뀐 row는 로컬에서도 지운다.
+    """
+    path = path or resolve_mirror_path()
+    if path is None:
+        return 0
+    key_column, columns = MIRROR_TABLES[table]
+    client = client or get_supabase_client()
+    with _sync_lock:
+        last = _last_sync.get((str(path), table))
+        if not (force or full) and last is not None and time.monotonic() - last < MIRROR_SYNC_INTERVAL_S:
+            return 0
+        fetched = 0
+        with closing(connect_mirror(path)) as conn:
+            watermark = load_watermark(conn, table)
+            resynced_at = load_resynced_at(conn, table)
+            if resynced_at is None or time.time() - resynced_at >= MIRROR_RESYNC_INTERVAL_S:
+                full = True
+            if full:
+                # Keys seen by the full scan; every other local row is gone remotely.
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS resync_keys (key PRIMARY KEY)")
+                conn.execute("DELETE FROM resync_keys")
+                since, newest = None, None
+            else:
+                since = {WATERMARK_COLUMN: rewind_watermark(watermark)} if watermark is not None else None
+                newest = watermark
+            for batch in scan_table_concurrent(client, table, columns, key=key_column, gte=since, page_size=PAGE_SIZE):
+                # The watermark only moves once the whole scan is stored, so an
+                # interrupted sync starts over from the same point.
+                with conn:
+                    _upsert_rows(conn, table, columns, batch)
+                    if full:
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO resync_keys (key) VALUES (?)",
+                            [(row.get(key_column),) for row in batch],
+                        )
+                marks = [row.get(WATERMARK_COLUMN) for row in batch if row.get(WATERMARK_COLUMN)]
+                if marks:
+                    newest = max(marks + ([newest] if newest else []))
+                fetched += len(batch)
+            if full:
+                with conn:
+                    conn.execute(f"DELETE FROM {table} WHERE {key_column} NOT IN (SELECT key FROM resync_keys)")
+                    conn.execute("DELETE FROM mirror_state WHERE table_name = ?", (table,))
+                    if newest is not None:
+                        store_watermark(conn, table, newest)
+                    store_resynced_at(conn, table, time.time())
+                conn.execute("DROP TABLE resync_keys")
+            elif newest is not None and newest != watermark:
+                with conn:
+                    store_watermark(conn, table, newest)
+        _last_sync[(str(path), table)] = time.monotonic()
+    return fetched
+
+
+def _parse_columns(columns: str) -> List[str]:
+    return [column.strip() for column in columns.split(",") if column.strip()]
+
+
+def _fetch_remote_rows(
+    client: Any,
+    table: str,
+    columns: List[str],
+    eq: Dict[str, Any],
+    in_: Dict[str, Sequence[Any]],
+) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for batch in scan_table_concurrent(client, table, columns, eq=eq, in_=in_, page_size=PAGE_SIZE):
+        rows.extend(batch)
+    return rows
+
+
+def _read_mirror(
+    path: Path,
+    table: str,
+    columns: List[str],
+    eq: Dict[str, Any],
+    in_: Dict[str, Sequence[Any]],
+) -> List[Dict[str, Any]]:
+    key_column, _ = MIRROR_TABLES[table]
+    clauses: List[str] = []
+    params: List[Any] = []
+    for column, value in eq.items():
+        clauses.append(f"{column} = ?")
+        params.append(value)
+    for column, values in in_.items():
+        values = list(values)
+        if not values:
+            return []
+        clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+        params.extend(values)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    # Key order stands in for the insertion order the remote scans returned.
+    sql = f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY {key_column}"
+    with closing(connect_mirror(path)) as conn:
+        cursor = conn.execute(sql, params)
+        return [dict(zip(columns, row)) for row in cursor]
+
+
+def connect_mirror(path: Path) -> sqlite3.Connection:
+    """
+    미러 SQLite 파일을 열고 mirror_state와 미러 테이블/인덱스를 준비한다.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS mirror_state ("
+        "table_name TEXT PRIMARY KEY, "
+        "watermark TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS mirror_resync ("
+        "table_name TEXT PRIMARY KEY, "
+        "resynced_at REAL NOT NULL)"
+    )
+    for table, (key_column, columns) in MIRROR_TABLES.items():
+        column_defs = ", ".join(
+            f"{column} PRIMARY KEY" if column == key_column else column for column in columns
+        )
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({column_defs})")
+        for column in _INDEXED_COLUMNS:
+            if column in columns:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+    return conn
+
+
+def rewind_watermark(watermark: str) -> str:
+    """
+    늦게 도착한 row를 놓치지 않도록 워터마크를 WATERMARK_OVERLAP만큼 되돌린다.
+    """
+    try:
+        return (datetime.fromisoformat(watermark) - WATERMARK_OVERLAP).isoformat()
+    except ValueError:
+        return watermark
+
+
+def load_watermark(conn: sqlite3.Connection, table: str) -> Optional[str]:
+    """
+    mirror_state에 저장된 table의 워터마크, 없으면 None.
+    """
+    row = conn.execute("SELECT watermark FROM mirror_state WHERE table_name = ?", (table,)).fetchone()
+    return row[0] if row else None
+
+
+def store_watermark(conn: sqlite3.Connection, table: str, watermark: str) -> None:
+    """
+    table의 워터마크를 mirror_state에 기록(커밋은 호출자 몫).
+    """
+    conn.execute(
+        "INSERT OR REPLACE INTO mirror_state (table_name, watermark) VALUES (?, ?)",
+        (table, watermark),
+    )
+
+
+def load_resynced_at(conn: sqlite3.Connection, table: str) -> Optional[float]:
+    """
+    table을 마지막으로 처음부터 다시 만든 시각(epoch 초), 없으면 None.
+    """
+    row = conn.execute("SELECT resynced_at FROM mirror_resync WHERE table_name = ?", (table,)).fetchone()
+    return row[0] if row else None
+
+
+def store_resynced_at(conn: sqlite3.Connection, table: str, resynced_at: float) -> None:
+    """
+    table을 처음부터 다시 만든 시각을 mirror_resync에 기록(커밋은 호출자 몫).
+    """
+    conn.execute(
+        "INSERT OR REPLACE INTO mirror_resync (table_name, resynced_at) VALUES (?, ?)",
+        (table, resynced_at),
+    )
+
+
+def _upsert_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Tuple[str, ...],
+    rows: List[Dict[str, Any]],
+) -> None:
+    if not rows:
+        return
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})",
+        [tuple(row.get(column) for column in columns) for row in rows],
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sync the local mirror of Supabase log tables.")
+    parser.add_argument("--path", type=Path, default=None, help="Mirror SQLite file (defaults to SIEGE_MIRROR_PATH).")
+    parser.add_argument("--table", choices=sorted(MIRROR_TABLES), default="siege_logs")
+    parser.add_argument("--full", action="store_true", help="Re-read the whole table and drop rows deleted remotely.")
+    args = parser.parse_args(argv)
+    path = args.path or resolve_mirror_path()
+    if path is None:
+        parser.error("The mirror is disabled; pass --path or set SIEGE_MIRROR_PATH.")
+    fetched = sync_mirror(args.table, path=path, force=True, full=args.full)
+    print(f"Fetched {fetched} {args.table} rows into {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,10 @@
 import pandas as pd
 import streamlit as st
 
+from data.defense_matchups import fetch_matchups
+from data.log_mirror import fetch_log_rows, resolve_mirror_path
 from services.supabase_client import get_supabase_client
-from utils.deck_utils import make_deck_key
+from utils.deck_utils import deck_keys_from_codes, make_deck_codes, make_deck_key
 
 
 def _or_val(v: str) -> str:
@@ -18,52 +20,23 @@ def sb():
 
 @st.cache_data(ttl=300)
 def build_worst_offense_list(cutoff: int = 4) -> pd.DataFrame:
-    client = sb()
-
-    rows = []
-    page_size = 1000
-    start = 0
-
-    while True:
-        res = (
-            client
-            .table("siege_logs")
-            .select("result, deck2_1, deck2_2, deck2_3")
-            .in_("result", ["Win", "Lose"])
-            .range(start, start + page_size - 1)
-            .execute()
-        )
-
-        batch = res.data or []
-        if not batch:
-            break
-
-        rows.extend(batch)
-
-        if len(batch) < page_size:
-            break
-
-        start += page_size
+    rows = fetch_log_rows("siege_logs", "result, deck2_1, deck2_2, deck2_3", in_={"result": ["Win", "Lose"]})
 
     df = pd.DataFrame(rows)
     if df.empty:
         return df
 
-    def make_def_key(r):
-        a = r["deck2_1"]
-        rest = sorted([r["deck2_2"], r["deck2_3"]])
-        return "|".join([a] + rest)
-
-    df["def_key"] = df.apply(make_def_key, axis=1)
-
-    agg = (
-        df.groupby("def_key")
-        .agg(
-            win=("result", lambda x: (x == "Lose").sum()),
-            lose=("result", lambda x: (x == "Win").sum()),
-        )
-        .reset_index()
+    # 방덱 키는 정수 코드로 묶고, 문자열 키는 묶인 덱마다 한 번만 만든다.
+    counts = pd.DataFrame(
+        {
+            "def_code": make_deck_codes(df["deck2_1"], df["deck2_2"], df["deck2_3"]),
+            "win": (df["result"] == "Lose").to_numpy(),
+            "lose": (df["result"] == "Win").to_numpy(),
+        }
     )
+    agg = counts[counts["def_code"] != 0].groupby("def_code")[["win", "lose"]].sum()
+    agg.insert(0, "def_key", deck_keys_from_codes(agg.index))
+    agg = agg.sort_values("def_key").reset_index(drop=True)
 
     agg["total"] = agg["win"] + agg["lose"]
     agg = agg[agg["total"] >= cutoff]
@@ -77,10 +50,6 @@ def build_worst_offense_list(cutoff: int = 4) -> pd.DataFrame:
     return agg
 
 
-def make_key_fixed(a: str, b: str, c: str) -> str:
-    return make_deck_key(a, b, c)
-
-
 @st.cache_data(ttl=300)
 def get_offense_stats_by_defense(def1: str, def2: str, def3: str, limit: int = 50) -> pd.DataFrame:
     def1 = (def1 or "").strip()
@@ -89,6 +58,9 @@ def get_offense_stats_by_defense(def1: str, def2: str, def3: str, limit: int = 5
     if not (def1 and def2 and def3):
         return pd.DataFrame()
 
+    if resolve_mirror_path() is not None:
+        return _offense_stats_from_matchups(make_deck_key(def1, def2, def3), limit)
+
     def_perms = [(def1, def2, def3), (def1, def3, def2)]
 
     q = (
@@ -109,22 +81,20 @@ def get_offense_stats_by_defense(def1: str, def2: str, def3: str, limit: int = 5
     if df.empty:
         return df
 
-    def off_key_row(r) -> str:
-        return make_key_fixed(r.get("deck1_1", ""), r.get("deck1_2", ""), r.get("deck1_3", ""))
-
-    df["off_key"] = df.apply(off_key_row, axis=1)
-    df = df[df["off_key"] != ""]
-    if df.empty:
+    counts = pd.DataFrame(
+        {
+            "off_code": make_deck_codes(df["deck1_1"], df["deck1_2"], df["deck1_3"]),
+            "wins": (df["result"] == "Win").to_numpy(),
+            "losses": (df["result"] == "Lose").to_numpy(),
+        }
+    )
+    counts = counts[counts["off_code"] != 0]
+    if counts.empty:
         return pd.DataFrame()
 
-    agg = (
-        df.groupby("off_key")
-        .agg(
-            wins=("result", lambda x: (x == "Win").sum()),
-            losses=("result", lambda x: (x == "Lose").sum()),
-        )
-        .reset_index()
-    )
+    agg = counts.groupby("off_code")[["wins", "losses"]].sum()
+    agg.insert(0, "off_key", deck_keys_from_codes(agg.index))
+    agg = agg.sort_values("off_key").reset_index(drop=True)
     agg["total"] = agg["wins"] + agg["losses"]
     agg["win_rate"] = agg.apply(lambda r: (r["wins"] / r["total"] * 100) if r["total"] else 0.0, axis=1)
 
@@ -135,3 +105,16 @@ def get_offense_stats_by_defense(def1: str, def2: str, def3: str, limit: int = 5
     agg["Summary"] = agg["wins"].astype(int).astype(str) + "W-" + agg["losses"].astype(int).astype(str) + "L"
 
     return agg[["Unit #1", "Unit #2", "Unit #3", "wins", "losses", "Win Rate", "Summary", "total"]]
+
+
+def _offense_stats_from_matchups(def_key: str, limit: int) -> pd.DataFrame:
+    # 로컬 defense_matchups에 이미 (def_key, off_key)별로 집계돼 있어 인덱스 조회 한 번이면 된다.
+    rows = fetch_matchups(def_key, limit=int(limit))
+    if not rows:
+        return pd.DataFrame()
+
+    agg = pd.DataFrame(rows).rename(columns={"o1": "Unit #1", "o2": "Unit #2", "o3": "Unit #3", "win": "wins", "lose": "losses"})
+    agg["Win Rate"] = agg["win_rate"].map(lambda x: f"{x:.1f}%")
+    agg["Summary"] = agg["wins"].astype(int).astype(str) + "W-" + agg["losses"].astype(int).astype(str) + "L"
+
+    return agg[["Unit #1", "Unit #2", "Unit #3", "wins", "losses", "Win Rate", "Summary", "total"]]
@@ -2,18 +2,14 @@
 import math
 import pandas as pd
 
-from utils.deck_utils import make_deck_key
+from utils.deck_utils import deck_keys_from_codes, make_deck_codes
 
 MAX_POINTS = 500
 TOP_N_OFFENSE = 7
 
 
-def _norm(v) -> str:
-    return str(v).strip() if v is not None else ""
-
-
-def make_off_key(a, b, c) -> str:
-    return make_deck_key(_norm(a), _norm(b), _norm(c))
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    return df[name] if name in df.columns else pd.Series(None, index=df.index, dtype=object)
 
 
 def build_cumulative_trend_df(siege_df: pd.DataFrame) -> pd.DataFrame:
@@ -29,11 +25,8 @@ def build_cumulative_trend_df(siege_df: pd.DataFrame) -> pd.DataFrame:
 
     df["is_win"] = (df["result"].astype(str).str.lower() == "win").astype(int)
 
-    df["off_key"] = df.apply(
-        lambda r: make_off_key(r.get("deck1_1"), r.get("deck1_2"), r.get("deck1_3")),
-        axis=1,
-    )
-    df = df[df["off_key"] != ""].reset_index(drop=True)
+    df["off_code"] = make_deck_codes(_column(df, "deck1_1"), _column(df, "deck1_2"), _column(df, "deck1_3"))
+    df = df[df["off_code"] != 0].reset_index(drop=True)
     if df.empty:
         return pd.DataFrame()
 
@@ -48,17 +41,25 @@ def build_cumulative_trend_df(siege_df: pd.DataFrame) -> pd.DataFrame:
     last = df.groupby("bucket_idx", as_index=False).tail(1).reset_index(drop=True)
 
     top_off = (
-        df["off_key"]
+        df["off_code"]
         .value_counts()
         .head(TOP_N_OFFENSE)
         .index
-        .tolist()
     )
 
-    df["offense"] = df["off_key"].where(df["off_key"].isin(top_off), other="Others")
+    # offense는 정렬된 라벨의 Categorical(덱 키 + Others)이라 groupby가 정수 코드로 돈다.
+    is_top = df["off_code"].isin(top_off)
+    top_keys = deck_keys_from_codes(top_off)
+    labels = sorted(list(top_keys) + (["Others"] if not is_top.all() else []))
+    label_codes = {code: labels.index(key) for code, key in zip(top_off, top_keys)}
+    others = labels.index("Others") if "Others" in labels else -1
+    df["offense"] = pd.Categorical.from_codes(
+        df["off_code"].map(label_codes).fillna(others).astype(int),
+        categories=labels,
+    )
 
     bucket_counts = (
-        df.groupby(["bucket_idx", "offense"])
+        df.groupby(["bucket_idx", "offense"], observed=True)
           .size()
           .unstack(fill_value=0)   # bucket_idx x offense grid (없으면 0)
           .sort_index()
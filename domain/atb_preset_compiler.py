@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+import json
+from typing import Any, Dict
+
+from config.atb_simulator_presets import build_full_preset
+from domain.atb_simulator_utils import prefix_monsters
+
+ALLY_PREFIX = "A"
+ENEMY_PREFIX = "E"
+
+
+class FrozenDict(dict):
+    """Read-only dict that copies as itself, so compiled presets can be shared."""
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("Compiled presets are read-only; pass overrides instead.")
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self) -> FrozenDict:
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> FrozenDict:
+        return self
+
+    def __reduce__(self) -> Any:
+        return FrozenDict, (dict(self),)
+
+
+@dataclass(frozen=True)
+class CompiledPreset:
+    preset_id: str
+    preset: FrozenDict
+    fingerprint: str
+
+
+@lru_cache(maxsize=None)
+def compile_preset(preset_id: str) -> CompiledPreset:
+    preset = build_full_preset(preset_id)
+    allies, _ = prefix_monsters(preset["allies"], prefix=ALLY_PREFIX)
+    enemies, _ = prefix_monsters(preset["enemies"], prefix=ENEMY_PREFIX)
+    compiled = dict(preset, allies=allies, enemies=enemies)
+    return CompiledPreset(
+        preset_id=preset_id,
+        preset=freeze(compiled),
+        fingerprint=preset_content_hash(compiled),
+    )
+
+
+def preset_content_hash(preset: Dict[str, Any]) -> str:
+    canonical = json.dumps(preset, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
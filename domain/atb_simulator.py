@@ -1,6 +1,68 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 import copy
+from dataclasses import dataclass, field
 import math
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class SimulationStats:
+    """Work done by the simulations run inside ``collect_simulation_stats``.
+
+    ``ticks`` and ``turns`` are summed over simulations, so a batch of 100
+    rows stepping 30 ticks adds 3000 ticks. Phases may nest; each phase's
+    time and simulation count include those of the phases inside it.
+    """
+
+    simulations: int = 0
+    batch_runs: int = 0
+    ticks: int = 0
+    turns: int = 0
+    cache: Dict[str, int] = field(default_factory=dict)
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+    phase_simulations: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, ticks: int, turns: int, simulations: int = 1) -> None:
+        self.simulations += simulations
+        self.ticks += ticks
+        self.turns += turns
+
+    def count_cache(self, name: str) -> None:
+        self.cache[name] = self.cache.get(name, 0) + 1
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        simulations = self.simulations
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + time.perf_counter() - start
+            self.phase_simulations[name] = self.phase_simulations.get(name, 0) + self.simulations - simulations
+
+
+# Checked once per simulation, so counting costs nothing measurable while no
+# collector is active. A context variable keeps Streamlit sessions, which run
+# on separate threads, from counting into each other's collectors.
+_active_stats: ContextVar[Optional[SimulationStats]] = ContextVar("active_simulation_stats", default=None)
+
+
+@contextmanager
+def collect_simulation_stats() -> Iterator[SimulationStats]:
+    stats = SimulationStats()
+    token = _active_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+def active_simulation_stats() -> Optional[SimulationStats]:
+    return _active_stats.get()
 
 
 def simulate(preset: Dict[str, Any], overrides: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
@@ -34,14 +96,23 @@ def simulate(preset: Dict[str, Any], overrides: Optional[Dict[str, Dict[str, Any
         monsters.append(transform_monster(simulator, enemy))
 
     monsters = sorted(monsters, key=lambda item: item["combat_speed"], reverse=True)
+    simulator["skill_tables"] = compile_skill_tables(simulator, monsters)
 
     simulator["ticks"].append({
         "tick": 0,
         "monsters": copy.deepcopy(monsters),
     })
 
+    stats = _active_stats.get()
+    # Turn events are only collected to count turns for an active collector.
+    turn_events: Optional[List[Dict[str, Any]]] = [] if stats is not None else None
     for i in range(1, tick_count + 1):
-        tick_monsters = run_tick(simulator, simulator["ticks"][i - 1]["monsters"], tick_index=i)
+        tick_monsters = run_tick(
+            simulator,
+            simulator["ticks"][i - 1]["monsters"],
+            tick_index=i,
+            turn_events=turn_events,
+        )
         simulator["ticks"].append({
             "tick": i,
             "monsters": copy.deepcopy(tick_monsters),
@@ -50,6 +121,8 @@ def simulate(preset: Dict[str, Any], overrides: Optional[Dict[str, Dict[str, Any
     if simulator["ticks"]:
         simulator["ticks"].pop()
 
+    if stats is not None:
+        stats.record(ticks=tick_count, turns=len(turn_events))
     return simulator["ticks"]
 
 
@@ -91,6 +164,7 @@ def simulate_with_turn_log(
         monsters.append(transform_monster(simulator, enemy))
 
     monsters = sorted(monsters, key=lambda item: item["combat_speed"], reverse=True)
+    simulator["skill_tables"] = compile_skill_tables(simulator, monsters)
 
     simulator["ticks"].append({
         "tick": 0,
@@ -131,6 +205,9 @@ def simulate_with_turn_log(
     if simulator["ticks"]:
         simulator["ticks"].pop()
 
+    stats = _active_stats.get()
+    if stats is not None:
+        stats.record(ticks=tick_count, turns=len(turn_events))
     return simulator["ticks"], turn_events
 
 
@@ -144,7 +221,86 @@ def simulate_atb_table(
 ) -> List[Dict[str, Any]]:
     if tick_limit <= 0:
         return []
-    overrides = overrides or {}
+    ticks = iter_ticks(
+        preset,
+        overrides,
+        tick_limit=tick_limit,
+        start_tick=0,
+        atb_keys=atb_keys,
+        atb_labels=atb_labels,
+        atb_names=atb_names,
+    )
+    return [tick["atb"] for tick in ticks if tick["atb"] is not None]
+
+
+def iter_ticks(
+    preset: Dict[str, Any],
+    overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+    tick_limit: Optional[int] = None,
+    start_tick: int = 1,
+    atb_keys: Optional[List[str]] = None,
+    atb_labels: Optional[Dict[str, str]] = None,
+    atb_names: Optional[Dict[str, str]] = None,
+    copy_monsters: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Simulate lazily, yielding one entry per tick.
+
+    Each entry holds ``tick``, ``monsters``, ``turn_event`` (``None`` when no
+    monster moved) and ``atb`` (``None`` unless ``atb_keys`` is given). Ticks
+    are only simulated as they are pulled, so callers can stop after the
+    turns they need. ``monsters`` is the live state unless ``copy_monsters``
+    is set; copy it before keeping it past the next tick.
+    """
+    tick_count = preset.get("tickCount", 0) if tick_limit is None else tick_limit
+    simulator, monsters = _start_simulation(preset, overrides or {}, tick_count)
+    stats = _active_stats.get()
+    turns = 0
+    try:
+        for tick_index in range(start_tick, start_tick + tick_count):
+            turn_events: List[Dict[str, Any]] = []
+            atb_log: List[Dict[str, Any]] = []
+            monsters = run_tick(
+                simulator,
+                monsters,
+                tick_index=tick_index,
+                turn_events=turn_events,
+                atb_log=atb_log,
+                atb_log_keys=atb_keys,
+                atb_log_labels=atb_labels,
+                atb_log_names=atb_names,
+            )
+            # run_tick only checks the tick count to apply opening skills once.
+            simulator["ticks"].append({"tick": tick_index})
+            if turn_events:
+                turns += 1
+            yield {
+                "tick": tick_index,
+                "monsters": copy.deepcopy(monsters) if copy_monsters else monsters,
+                "turn_event": turn_events[0] if turn_events else None,
+                "atb": atb_log[0] if atb_log else None,
+            }
+    finally:
+        # Callers that stop early only pay for (and count) the ticks they pulled.
+        if stats is not None:
+            stats.record(ticks=len(simulator["ticks"]) - 1, turns=turns)
+
+
+def iter_turn_events(
+    preset: Dict[str, Any],
+    overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+    tick_limit: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield the same turn events as ``simulate_with_turn_log``, lazily."""
+    for tick in iter_ticks(preset, overrides, tick_limit=tick_limit):
+        if tick["turn_event"] is not None:
+            yield tick["turn_event"]
+
+
+def _start_simulation(
+    preset: Dict[str, Any],
+    overrides: Dict[str, Dict[str, Any]],
+    tick_count: int,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
     allies = apply_overrides(preset.get("allies", []), overrides)
     enemies = apply_overrides(preset.get("enemies", []), overrides)
 
@@ -153,7 +309,7 @@ def simulate_atb_table(
         "enemies": enemies,
         "allyEffects": preset.get("allyEffects", {}),
         "enemyEffects": preset.get("enemyEffects", {}),
-        "tickCount": tick_limit,
+        "tickCount": tick_count,
         "ticks": [],
     }
 
@@ -164,29 +320,9 @@ def simulate_atb_table(
     for enemy in enemies:
         monsters.append(transform_monster(simulator, enemy))
     monsters = sorted(monsters, key=lambda item: item["combat_speed"], reverse=True)
-
-    simulator["ticks"].append({
-        "tick": 0,
-        "monsters": copy.deepcopy(monsters),
-    })
-
-    atb_log: List[Dict[str, Any]] = []
-    for tick_index in range(tick_limit):
-        monsters = run_tick(
-            simulator,
-            monsters,
-            tick_index=tick_index,
-            atb_log=atb_log,
-            atb_log_keys=atb_keys,
-            atb_log_labels=atb_labels,
-            atb_log_names=atb_names,
-        )
-        simulator["ticks"].append({
-            "tick": tick_index + 1,
-            "monsters": copy.deepcopy(monsters),
-        })
-
-    return atb_log
+    simulator["skill_tables"] = compile_skill_tables(simulator, monsters)
+    simulator["ticks"].append({"tick": 0})
+    return simulator, monsters
 
 
 def _collect_debug_tick(
@@ -217,18 +353,22 @@ def _collect_debug_tick(
 
 
 def apply_overrides(base_monsters: List[Dict[str, Any]], overrides: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
-    monsters = copy.deepcopy(base_monsters)
-    for monster in monsters:
+    # Only top-level fields are written during a simulation, so a shallow copy
+    # per monster is enough and skills stay shared with the (possibly frozen)
+    # preset.
+    monsters = []
+    for base_monster in base_monsters:
+        monster = dict(base_monster)
         override = overrides.get(monster.get("key"))
-        if not override:
-            continue
-        monster.update({
-            "rune_speed": override.get("rune_speed", monster.get("rune_speed", 0)),
-            "speedIncreasingEffect": override.get(
-                "speedIncreasingEffect",
-                monster.get("speedIncreasingEffect", 0),
-            ),
-        })
+        if override:
+            monster.update({
+                "rune_speed": override.get("rune_speed", monster.get("rune_speed", 0)),
+                "speedIncreasingEffect": override.get(
+                    "speedIncreasingEffect",
+                    monster.get("speedIncreasingEffect", 0),
+                ),
+            })
+        monsters.append(monster)
     return monsters
 
 
@@ -308,13 +448,17 @@ def run_tick(
     atb_log_labels: Optional[Dict[str, str]] = None,
     atb_log_names: Optional[Dict[str, str]] = None,
 ) -> List[Dict[str, Any]]:
+    tables = simulator.get("skill_tables")
     if len(simulator["ticks"]) == 1:
         for i, monster in enumerate(monsters):
-            actual_monster = find_base_monster(simulator, monster)
-            if not actual_monster:
-                continue
-            skills = [skill for skill in actual_monster.get("skills", []) if skill.get("applyOnTurn") == 0]
-            skill_targets = get_skill_targets(skills, monsters, i)
+            if tables is not None:
+                skills = tables["opening"][i]
+            else:
+                actual_monster = find_base_monster(simulator, monster)
+                if not actual_monster:
+                    continue
+                skills = [skill for skill in actual_monster.get("skills", []) if skill.get("applyOnTurn") == 0]
+            skill_targets = get_skill_targets(skills, monsters, i, tables)
             apply_skill_effects(monsters, skills, skill_targets)
 
     for monster in monsters:
@@ -328,7 +472,10 @@ def run_tick(
         combat_snapshot = {}
         speed_buff_snapshot = {}
         for key in atb_log_keys:
-            monster = next((item for item in monsters if item.get("key") == key), None)
+            if tables is not None:
+                monster = monsters[tables["key_index"][key]] if key in tables["key_index"] else None
+            else:
+                monster = next((item for item in monsters if item.get("key") == key), None)
             atb_snapshot[key] = monster.get("attack_bar") if monster else None
             combat_snapshot[key] = monster.get("combat_speed") if monster else None
             speed_buff_snapshot[key] = bool(monster.get("has_speed_buff")) if monster else False
@@ -355,14 +502,20 @@ def run_tick(
                 "attack_bar_before_reset": monsters[move_index].get("attack_bar"),
                 "combat_speed": monsters[move_index].get("combat_speed"),
             })
-        actual_monster = find_base_monster(simulator, monsters[move_index])
-        skills = []
-        if actual_monster:
-            skills = [
-                skill for skill in actual_monster.get("skills", [])
-                if skill.get("applyOnTurn") == monsters[move_index]["turn"] or skill.get("applyOnTurn") == -1
-            ]
-        skill_targets = get_skill_targets(skills, monsters, move_index)
+        if tables is not None:
+            skills = tables["by_turn"][move_index].get(
+                monsters[move_index]["turn"],
+                tables["every_turn"][move_index],
+            )
+        else:
+            actual_monster = find_base_monster(simulator, monsters[move_index])
+            skills = []
+            if actual_monster:
+                skills = [
+                    skill for skill in actual_monster.get("skills", [])
+                    if skill.get("applyOnTurn") == monsters[move_index]["turn"] or skill.get("applyOnTurn") == -1
+                ]
+        skill_targets = get_skill_targets(skills, monsters, move_index, tables)
 
         monsters[move_index]["attack_bar"] = 0
 
@@ -438,24 +591,33 @@ def get_skill_targets(
     skills: List[Dict[str, Any]],
     monsters: List[Dict[str, Any]],
     self_idx: int,
+    tables: Optional[Dict[str, Any]] = None,
 ) -> List[List[int]]:
     skill_targets: List[List[int]] = []
+    if not skills:
+        return skill_targets
+    if tables is not None:
+        ally_indexes = tables["ally_indexes"]
+        enemy_indexes = tables["enemy_indexes"]
+    else:
+        ally_indexes = [index for index, item in enumerate(monsters) if item.get("isAlly")]
+        enemy_indexes = [index for index, item in enumerate(monsters) if not item.get("isAlly")]
     for skill in skills:
         targets: List[int] = []
         target_type = skill.get("target")
         if target_type == "allies":
-            targets = [index for index, item in enumerate(monsters) if item.get("isAlly")]
+            targets = list(ally_indexes)
         elif target_type == "enemies":
-            targets = [index for index, item in enumerate(monsters) if not item.get("isAlly")]
+            targets = list(enemy_indexes)
         elif target_type == "self":
             targets = [self_idx]
         elif target_type == "ally_atb_high":
-            allies = [(m, idx) for idx, m in enumerate(monsters) if m.get("isAlly")]
+            allies = [(monsters[idx], idx) for idx in ally_indexes]
             if allies:
                 best = max(allies, key=lambda item: item[0].get("attack_bar", 0))
                 targets = [best[1]]
         elif target_type == "ally_atb_low":
-            allies = [(m, idx) for idx, m in enumerate(monsters) if m.get("isAlly")]
+            allies = [(monsters[idx], idx) for idx in ally_indexes]
             if allies:
                 best = min(
                     allies,
@@ -466,20 +628,23 @@ def get_skill_targets(
                 )
                 targets = [best[1]]
         elif target_type == "enemy_atb_high":
-            enemies = [(m, idx) for idx, m in enumerate(monsters) if not m.get("isAlly")]
+            enemies = [(monsters[idx], idx) for idx in enemy_indexes]
             if enemies:
                 best = max(enemies, key=lambda item: item[0].get("attack_bar", 0))
                 targets = [best[1]]
         elif target_type == "enemy_atb_low":
-            enemies = [(m, idx) for idx, m in enumerate(monsters) if not m.get("isAlly")]
+            enemies = [(monsters[idx], idx) for idx in enemy_indexes]
             if enemies:
                 best = min(enemies, key=lambda item: item[0].get("attack_bar", 0))
                 targets = [best[1]]
         else:
-            target_index = next(
-                (index for index, item in enumerate(monsters) if item.get("key") == target_type),
-                None,
-            )
+            if tables is not None:
+                target_index = tables["key_index"].get(target_type)
+            else:
+                target_index = next(
+                    (index for index, item in enumerate(monsters) if item.get("key") == target_type),
+                    None,
+                )
             if target_index is not None:
                 targets = [target_index]
 
@@ -487,6 +652,382 @@ def get_skill_targets(
     return skill_targets
 
 
+def compile_skill_tables(simulator: Dict[str, Any], monsters: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Resolve skill dispatch once per simulation.
+
+    Monster order is fixed after the initial speed sort and sides never change,
+    so per-turn skill lists, side index lists and key -> index maps are built
+    here instead of being rescanned on every turn.
+    """
+    opening: List[List[Dict[str, Any]]] = []
+    by_turn: List[Dict[Any, List[Dict[str, Any]]]] = []
+    every_turn: List[List[Dict[str, Any]]] = []
+    for monster in monsters:
+        actual_monster = find_base_monster(simulator, monster)
+        skills = list(actual_monster.get("skills", [])) if actual_monster else []
+        opening.append([skill for skill in skills if skill.get("applyOnTurn") == 0])
+        every_turn.append([skill for skill in skills if skill.get("applyOnTurn") == -1])
+        turn_table: Dict[Any, List[Dict[str, Any]]] = {}
+        for skill in skills:
+            turn = skill.get("applyOnTurn")
+            if turn in (0, -1) or turn in turn_table:
+                continue
+            turn_table[turn] = [
+                candidate for candidate in skills
+                if candidate.get("applyOnTurn") == turn or candidate.get("applyOnTurn") == -1
+            ]
+        by_turn.append(turn_table)
+
+    key_index: Dict[Any, int] = {}
+    for index, monster in enumerate(monsters):
+        key_index.setdefault(monster.get("key"), index)
+    return {
+        "opening": opening,
+        "by_turn": by_turn,
+        "every_turn": every_turn,
+        "key_index": key_index,
+        "ally_indexes": [index for index, monster in enumerate(monsters) if monster.get("isAlly")],
+        "enemy_indexes": [index for index, monster in enumerate(monsters) if not monster.get("isAlly")],
+    }
+
+
 def find_base_monster(simulator: Dict[str, Any], monster: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     source = simulator["allies"] if monster.get("isAlly") else simulator["enemies"]
     return next((item for item in source if item.get("key") == monster.get("key")), None)
+
+
+def simulate_batch(
+    preset: Dict[str, Any],
+    overrides_batch: List[Dict[str, Dict[str, Any]]],
+    tick_count: Optional[int] = None,
+    max_turns: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Run many override combinations of one preset in lockstep.
+
+    Every row of ``overrides_batch`` is simulated exactly like
+    ``simulate_with_turn_log`` would, but the monster state is held in
+    ``(batch, monsters)`` NumPy arrays. ``turn_order`` holds, per row, the
+    index into ``keys`` of each monster that took a turn (``-1`` padded) and
+    ``turn_ticks`` the tick it moved on. With ``max_turns`` the run stops as
+    soon as every row has recorded that many turns.
+    """
+    keys, rune_speed, effect = batch_speed_inputs(preset, len(overrides_batch))
+    key_index = {key: index for index, key in enumerate(keys)}
+    for row, overrides in enumerate(overrides_batch):
+        for key, override in (overrides or {}).items():
+            index = key_index.get(key)
+            if index is None or not override:
+                continue
+            rune_speed[row, index] = override.get("rune_speed", rune_speed[row, index])
+            effect[row, index] = override.get("speedIncreasingEffect", effect[row, index])
+    return simulate_batch_arrays(preset, rune_speed, effect, tick_count=tick_count, max_turns=max_turns)
+
+
+def batch_speed_inputs(preset: Dict[str, Any], batch_size: int) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Preset rune speeds and effects repeated per row, in ``simulate_batch`` key order."""
+    base_monsters = _batch_base_monsters(preset)
+    keys = [monster.get("key") for monster in base_monsters]
+    rune_speed = np.repeat(
+        np.array([[monster["rune_speed"] for monster in base_monsters]], dtype=np.float64),
+        batch_size,
+        axis=0,
+    )
+    effect = np.repeat(
+        np.array([[monster["speedIncreasingEffect"] for monster in base_monsters]], dtype=np.float64),
+        batch_size,
+        axis=0,
+    )
+    return keys, rune_speed, effect
+
+
+def batch_speed_bonus(preset: Dict[str, Any], batch_size: int) -> np.ndarray:
+    """Preset tower + lead percent repeated per row, in ``simulate_batch`` key order."""
+    return np.repeat(
+        np.array(
+            [[monster["tower_buff"] + monster["lead"] for monster in _batch_base_monsters(preset)]],
+            dtype=np.float64,
+        ),
+        batch_size,
+        axis=0,
+    )
+
+
+def _batch_base_monsters(preset: Dict[str, Any]) -> List[Dict[str, Any]]:
+    simulator = {
+        "allies": preset.get("allies", []),
+        "enemies": preset.get("enemies", []),
+        "allyEffects": preset.get("allyEffects", {}),
+        "enemyEffects": preset.get("enemyEffects", {}),
+    }
+    return [
+        transform_monster(simulator, monster)
+        for monster in [*simulator["allies"], *simulator["enemies"]]
+    ]
+
+
+def simulate_batch_arrays(
+    preset: Dict[str, Any],
+    rune_speed: np.ndarray,
+    effect: np.ndarray,
+    tick_count: Optional[int] = None,
+    max_turns: Optional[int] = None,
+    until_keys: Optional[List[str]] = None,
+    speed_bonus: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    """``simulate_batch`` for callers that build the per-row inputs directly.
+
+    ``rune_speed`` and ``effect`` are ``(batch, monsters)`` arrays in the key
+    order returned by ``batch_speed_inputs``; large grids skip building one
+    overrides dict per row this way. With ``until_keys`` the run also stops
+    once every row has seen each of those monsters take a turn; keys that
+    are not in the preset raise ``ValueError``.
+    ``speed_bonus`` replaces the tower + lead percent per row and monster
+    (see ``batch_speed_bonus``).
+    """
+    allies = preset.get("allies", [])
+    enemies = preset.get("enemies", [])
+    batch_size = rune_speed.shape[0]
+    if tick_count is None:
+        tick_count = preset.get("tickCount", 0)
+    turn_limit = tick_count if max_turns is None else min(max_turns, tick_count)
+
+    simulator = {
+        "allies": allies,
+        "enemies": enemies,
+        "allyEffects": preset.get("allyEffects", {}),
+        "enemyEffects": preset.get("enemyEffects", {}),
+    }
+    base_monsters = [transform_monster(simulator, monster) for monster in [*allies, *enemies]]
+    keys = [monster.get("key") for monster in base_monsters]
+    monster_count = len(base_monsters)
+    if batch_size == 0 or monster_count == 0:
+        return {
+            "keys": keys,
+            "turn_order": np.full((batch_size, turn_limit), -1, dtype=np.int64),
+            "turn_ticks": np.zeros((batch_size, turn_limit), dtype=np.int64),
+            "turn_counts": np.zeros(batch_size, dtype=np.int64),
+        }
+
+    skills_by_monster = [monster.get("skills") or [] for monster in base_monsters]
+    for skills in skills_by_monster:
+        if any(skill.get("flatSpeedBuff") for skill in skills):
+            raise ValueError("simulate_batch does not support flatSpeedBuff skills.")
+
+    key_index = {key: index for index, key in enumerate(keys)}
+    unknown_keys = [key for key in until_keys or [] if key not in key_index]
+    if unknown_keys:
+        raise ValueError(f"until_keys not in preset: {unknown_keys}")
+
+    if speed_bonus is None:
+        speed_bonus = np.array(
+            [[monster["tower_buff"] + monster["lead"] for monster in base_monsters]],
+            dtype=np.float64,
+        )
+    base_speed = np.array([[monster["base_speed"] for monster in base_monsters]], dtype=np.float64)
+    base_total = base_speed * (100 + speed_bonus) / 100
+    is_ally = np.array([bool(monster.get("isAlly")) for monster in base_monsters])
+
+    # Monsters keep the initial (stable, descending) combat speed order for
+    # the whole run, so every per-monster array is permuted into that order.
+    initial_speed = np.ceil(base_total + rune_speed)
+    order = np.argsort(-initial_speed, axis=1, kind="stable")
+    rows = np.arange(batch_size)
+    position_of = np.empty_like(order)
+    position_of[rows[:, None], order] = np.arange(monster_count)[None, :]
+
+    state = {
+        "speed": np.take_along_axis(base_total + rune_speed, order, axis=1),
+        "effect": np.take_along_axis(effect, order, axis=1),
+        "is_ally": is_ally[order],
+        "attack_bar": np.zeros((batch_size, monster_count), dtype=np.float64),
+        "has_speed_buff": np.zeros((batch_size, monster_count), dtype=bool),
+        "speed_buff_duration": np.zeros((batch_size, monster_count), dtype=np.int64),
+        "has_slow": np.zeros((batch_size, monster_count), dtype=bool),
+        "slow_duration": np.zeros((batch_size, monster_count), dtype=np.int64),
+        "turn": np.zeros((batch_size, monster_count), dtype=np.int64),
+    }
+    positions = np.arange(monster_count)[None, :]
+
+    turn_order = np.full((batch_size, turn_limit), -1, dtype=np.int64)
+    turn_ticks = np.zeros((batch_size, turn_limit), dtype=np.int64)
+    turn_counts = np.zeros(batch_size, dtype=np.int64)
+
+    for position in range(monster_count):
+        self_position = np.full(batch_size, position)
+        for monster_index, skills in enumerate(skills_by_monster):
+            opening = [skill for skill in skills if skill.get("applyOnTurn") == 0]
+            if not opening:
+                continue
+            active = order[:, position] == monster_index
+            if not active.any():
+                continue
+            targets = [
+                _batch_skill_targets(skill, state, active, self_position, position_of, key_index)
+                for skill in opening
+            ]
+            for skill, target in zip(opening, targets):
+                _apply_batch_skill_effects(state, skill, target)
+
+    watched = np.array([key_index[key] for key in until_keys or []], dtype=np.int64)
+    seen = np.zeros((batch_size, len(watched)), dtype=bool)
+    ticks_stepped = 0
+    for tick_index in range(1, tick_count + 1):
+        if turn_limit and (turn_counts >= turn_limit).all():
+            break
+        if until_keys and seen.all():
+            break
+        ticks_stepped += 1
+        combat_speed = _batch_combat_speed(state)
+        state["attack_bar"] += combat_speed * 0.07
+
+        ready = state["attack_bar"] >= 100
+        moved = ready.any(axis=1) & (turn_counts < turn_limit)
+        if not moved.any():
+            continue
+        mover = np.where(ready, state["attack_bar"], -np.inf).argmax(axis=1)
+        mover_index = order[rows, mover]
+
+        state["turn"][rows, mover] += moved
+        slot = np.minimum(turn_counts, max(turn_limit - 1, 0))
+        turn_order[rows[moved], slot[moved]] = mover_index[moved]
+        turn_ticks[rows[moved], slot[moved]] = tick_index
+        turn_counts += moved
+        seen |= moved[:, None] & (mover_index[:, None] == watched[None, :])
+        mover_turn = state["turn"][rows, mover]
+
+        pending = []
+        for monster_index, skills in enumerate(skills_by_monster):
+            if not skills:
+                continue
+            acting = moved & (mover_index == monster_index)
+            if not acting.any():
+                continue
+            for skill in skills:
+                apply_on_turn = skill.get("applyOnTurn")
+                if apply_on_turn == -1:
+                    active = acting
+                else:
+                    active = acting & (mover_turn == apply_on_turn)
+                if not active.any():
+                    continue
+                pending.append((
+                    skill,
+                    _batch_skill_targets(skill, state, active, mover, position_of, key_index),
+                ))
+
+        mover_mask = moved[:, None] & (positions == mover[:, None])
+        state["attack_bar"][mover_mask] = 0
+        buffed = mover_mask & state["has_speed_buff"]
+        state["speed_buff_duration"] -= buffed
+        state["has_speed_buff"] &= ~buffed | (state["speed_buff_duration"] > 0)
+        slowed = mover_mask & state["has_slow"]
+        state["slow_duration"] -= slowed
+        state["has_slow"] &= ~slowed | (state["slow_duration"] > 0)
+
+        for skill, target in pending:
+            _apply_batch_skill_effects(state, skill, target)
+
+    stats = _active_stats.get()
+    if stats is not None:
+        stats.batch_runs += 1
+        stats.record(
+            ticks=ticks_stepped * batch_size,
+            turns=int(turn_counts.sum()),
+            simulations=batch_size,
+        )
+    return {
+        "keys": keys,
+        "turn_order": turn_order,
+        "turn_ticks": turn_ticks,
+        "turn_counts": turn_counts,
+    }
+
+
+def batch_turn_order_keys(batch_result: Dict[str, Any], limit: Optional[int] = None) -> List[List[str]]:
+    keys = batch_result["keys"]
+    orders = []
+    for row in batch_result["turn_order"]:
+        indexes = [int(index) for index in row if index >= 0]
+        if limit is not None:
+            indexes = indexes[:limit]
+        orders.append([keys[index] for index in indexes])
+    return orders
+
+
+def _batch_combat_speed(state: Dict[str, Any]) -> np.ndarray:
+    speed = state["speed"]
+    speed = np.where(state["has_slow"], speed * 0.7, speed)
+    speed = np.where(
+        state["has_speed_buff"],
+        speed * (1 + 0.3 * (100 + state["effect"]) / 100),
+        speed,
+    )
+    return np.ceil(speed)
+
+
+def _batch_skill_targets(
+    skill: Dict[str, Any],
+    state: Dict[str, Any],
+    active: np.ndarray,
+    self_position: np.ndarray,
+    position_of: np.ndarray,
+    key_index: Dict[str, int],
+) -> np.ndarray:
+    batch_size, monster_count = state["attack_bar"].shape
+    rows = np.arange(batch_size)
+    positions = np.arange(monster_count)[None, :]
+    is_ally = state["is_ally"]
+    attack_bar = state["attack_bar"]
+    target_type = skill.get("target")
+
+    def pick(side: np.ndarray, highest: bool) -> np.ndarray:
+        if highest:
+            chosen = np.where(side, attack_bar, -np.inf).argmax(axis=1)
+        else:
+            chosen = np.where(side, attack_bar, np.inf).argmin(axis=1)
+        return (positions == chosen[:, None]) & side.any(axis=1)[:, None]
+
+    if target_type == "allies":
+        targets = is_ally
+    elif target_type == "enemies":
+        targets = ~is_ally
+    elif target_type == "self":
+        targets = positions == self_position[:, None]
+    elif target_type == "ally_atb_high":
+        targets = pick(is_ally, highest=True)
+    elif target_type == "ally_atb_low":
+        targets = pick(is_ally, highest=False)
+    elif target_type == "enemy_atb_high":
+        targets = pick(~is_ally, highest=True)
+    elif target_type == "enemy_atb_low":
+        targets = pick(~is_ally, highest=False)
+    elif target_type in key_index:
+        targets = positions == position_of[rows, key_index[target_type]][:, None]
+    else:
+        targets = np.zeros((batch_size, monster_count), dtype=bool)
+    return targets & active[:, None]
+
+
+def _apply_batch_skill_effects(state: Dict[str, Any], skill: Dict[str, Any], targets: np.ndarray) -> None:
+    manipulation = skill.get("atbManipulationType")
+    amount = skill.get("atbManipulationAmount", 0)
+    if manipulation == "add":
+        state["attack_bar"] += np.where(targets, amount, 0)
+    elif manipulation == "subtract":
+        state["attack_bar"] -= np.where(targets, amount, 0)
+    elif manipulation == "set":
+        state["attack_bar"] = np.where(targets, amount, state["attack_bar"])
+
+    if skill.get("buffSpeed"):
+        state["has_speed_buff"] |= targets
+        state["speed_buff_duration"] = np.where(
+            targets,
+            skill.get("speedBuffDuration", 0),
+            state["speed_buff_duration"],
+        )
+    if skill.get("stripSpeed"):
+        state["has_speed_buff"] &= ~targets
+        state["speed_buff_duration"] = np.where(targets, 0, state["speed_buff_duration"])
+    if skill.get("slow"):
+        state["has_slow"] |= targets
+        state["slow_duration"] = np.where(targets, skill.get("slowDuration", 0), state["slow_duration"])
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.atb_simulator_presets import (
+    ATB_SIMULATOR_PRESETS,
+    TOWER_PERCENT,
+    build_monsters_for_keys,
+)
+from domain.atb_preset_compiler import compile_preset
+from domain.atb_simulator import simulate_with_turn_log
+from domain.atb_simulator_utils import prefix_monsters
+from domain.speed_optimizer_cache import CACHE_PATH_ENV
+from domain.speed_optimizer_detail import build_section1_detail_cached
+from domain.speed_optimizer_grid import GRID_PATH_ENV
+
+BENCHMARK_SCHEMA_VERSION = 1
+SYNTHETIC_MONSTER_COUNTS = (6, 10)
+# In-band section 1 inputs, so every preset runs a real search: Presets A and
+# B read input_2 and the rest read input_1. Out-of-band inputs return NO VALID
+# SOLUTION almost immediately and would time nothing.
+SECTION1_BENCHMARK_INPUTS: Dict[str, Tuple[Optional[int], Optional[int], Optional[int]]] = {
+    "Preset A": (None, 170, None),
+    "Preset B": (None, 170, None),
+}
+DEFAULT_SECTION1_INPUTS = (220, None, None)
+DEFAULT_MIN_TIME_S = 1.0
+
+
+def synthetic_preset(monster_count: int) -> Dict[str, Any]:
+    # Fills both sides with distinct library monsters taken from the shipped
+    # presets, so the synthetic fights use the same skills as real ones.
+    monster_keys: List[str] = []
+    for preset_meta in ATB_SIMULATOR_PRESETS.values():
+        for key in preset_meta["allies"]["monsters"] + preset_meta["enemies"]["monsters"]:
+            if key not in monster_keys:
+                monster_keys.append(key)
+    ally_count = monster_count // 2
+    enemy_count = monster_count - ally_count
+    if ally_count + enemy_count > len(monster_keys):
+        raise ValueError(f"Only {len(monster_keys)} distinct monsters are available.")
+    allies, _ = prefix_monsters(build_monsters_for_keys(monster_keys[:ally_count], is_ally=True), prefix="A")
+    enemies, _ = prefix_monsters(
+        build_monsters_for_keys(monster_keys[ally_count:ally_count + enemy_count], is_ally=False),
+        prefix="E",
+    )
+    effects = {"tower": TOWER_PERCENT, "lead": 0, "element": None}
+    return {
+        "allies": allies,
+        "enemies": enemies,
+        "allyEffects": dict(effects),
+        "enemyEffects": dict(effects),
+        "tickCount": 100,
+    }
+
+
+def benchmark_simulation(preset: Dict[str, Any], min_time_s: float = DEFAULT_MIN_TIME_S) -> Dict[str, Any]:
+    simulations, seconds = _repeat_for(lambda: simulate_with_turn_log(preset), min_time_s)
+    return {
+        "monsters": len(preset.get("allies", [])) + len(preset.get("enemies", [])),
+        "simulations": simulations,
+        "seconds": seconds,
+        "simulations_per_second": simulations / seconds if seconds else None,
+        "peak_bytes": _peak_bytes(lambda: simulate_with_turn_log(preset)),
+    }
+
+
+def section1_benchmark_inputs(preset_id: str) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    return SECTION1_BENCHMARK_INPUTS.get(preset_id, DEFAULT_SECTION1_INPUTS)
+
+
+def benchmark_section1(
+    preset_id: str,
+    inputs: Optional[Tuple[Optional[int], Optional[int], Optional[int]]] = None,
+) -> Dict[str, Any]:
+    inputs = inputs or section1_benchmark_inputs(preset_id)
+    # Bypasses the in-process lru_cache; run_benchmarks also turns off the
+    # persistent result cache and the precomputed grid.
+    build = build_section1_detail_cached.__wrapped__
+    start = time.perf_counter()
+    result = build(preset_id, *inputs, None, False)
+    seconds = time.perf_counter() - start
+    return {
+        "inputs": list(inputs),
+        "seconds": seconds,
+        "status": result.status,
+        "peak_bytes": _peak_bytes(lambda: build(preset_id, *inputs, None, False)),
+    }
+
+
+def run_benchmarks(
+    preset_ids: Optional[Sequence[str]] = None,
+    monster_counts: Sequence[int] = SYNTHETIC_MONSTER_COUNTS,
+    min_time_s: float = DEFAULT_MIN_TIME_S,
+    section1: bool = True,
+) -> Dict[str, Any]:
+    preset_ids = list(preset_ids or ATB_SIMULATOR_PRESETS.keys())
+    saved_env = {name: os.environ.get(name) for name in (CACHE_PATH_ENV, GRID_PATH_ENV)}
+    for name in saved_env:
+        os.environ[name] = ""
+    try:
+        simulation = {
+            preset_id: benchmark_simulation(compile_preset(preset_id).preset, min_time_s)
+            for preset_id in preset_ids
+        }
+        for count in monster_counts:
+            simulation[f"synthetic_{count}"] = benchmark_simulation(synthetic_preset(count), min_time_s)
+        section1_results = {preset_id: benchmark_section1(preset_id) for preset_id in preset_ids} if section1 else {}
+    finally:
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    return {
+        "schema_version": BENCHMARK_SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "min_time_s": min_time_s,
+        "simulate_with_turn_log": simulation,
+        "build_section1_detail": section1_results,
+        "max_rss_bytes": _max_rss_bytes(),
+    }
+
+
+def _repeat_for(run: Callable[[], Any], min_time_s: float) -> Tuple[int, float]:
+    run()
+    count = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while count == 0 or elapsed < min_time_s:
+        run()
+        count += 1
+        elapsed = time.perf_counter() - start
+    return count, elapsed
+
+
+def _peak_bytes(run: Callable[[], Any]) -> int:
+    # Measured in a separate run: tracemalloc slows allocation-heavy code
+    # enough to distort the timings.
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    if not was_tracing:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+def _max_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the ATB simulator and Speed Optimizer section 1.")
+    parser.add_argument("--out", type=Path, default=None, help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME_S)
+    parser.add_argument("--preset", action="append", dest="presets")
+    parser.add_argument("--skip-section1", action="store_true")
+    args = parser.parse_args(argv)
+    report = run_benchmarks(preset_ids=args.presets, min_time_s=args.min_time, section1=not args.skip_section1)
+    text = json.dumps(report, indent=2)
+    if args.out is None:
+        print(text)
+    else:
+        args.out.write_text(text + "\n", encoding="utf-8")
+        print(f"Wrote benchmark report to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from contextlib import closing
+from functools import lru_cache
+import hashlib
+import json
+import os
+from pathlib import Path
+import pickle
+import sqlite3
+import time
+from typing import Any, Optional
+
+from config.atb_simulator_presets import ATB_SIMULATOR_PRESETS
+from domain.atb_preset_compiler import compile_preset
+
+# Bump when PresetDetailResult or the search semantics change in a way the
+# code hash below would not catch (e.g. a dependency upgrade).
+CACHE_SCHEMA_VERSION = 1
+CACHE_PATH_ENV = "SPEEDOPT_CACHE_PATH"
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "sw-analyzer" / "speed_optimizer.sqlite3"
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+_ROOT = Path(__file__).resolve().parents[1]
+_CODE_SOURCES = (
+    "domain/atb_preset_compiler.py",
+    "domain/atb_simulator.py",
+    "domain/atb_simulator_utils.py",
+    "domain/speed_optimizer_detail.py",
+)
+_CACHE_ERRORS = (sqlite3.Error, OSError, pickle.PickleError, AttributeError, EOFError, ImportError)
+
+
+def resolve_cache_path() -> Optional[Path]:
+    # An empty SPEEDOPT_CACHE_PATH turns the persistent cache off.
+    value = os.environ.get(CACHE_PATH_ENV)
+    if value is None:
+        return DEFAULT_CACHE_PATH
+    if not value.strip():
+        return None
+    return Path(value)
+
+
+def preset_fingerprint(preset_id: str) -> str:
+    # Hash of the compiled preset content, so an edit to one preset (or a
+    # comment anywhere in the config file) leaves the other entries valid.
+    return compile_preset(preset_id).fingerprint
+
+
+def code_version() -> str:
+    return f"{CACHE_SCHEMA_VERSION}:{_hash_sources(_CODE_SOURCES, _stat_sources(_CODE_SOURCES))}"
+
+
+def make_cache_key(
+    preset_id: str,
+    input_1: Optional[int],
+    input_2: Optional[int],
+    input_3: Optional[int],
+    debug: bool,
+) -> str:
+    return json.dumps([preset_fingerprint(preset_id), code_version(), preset_id, input_1, input_2, input_3, debug])
+
+
+def load_result(path: Path, key: str) -> Optional[Any]:
+    try:
+        with closing(_connect(path)) as conn, conn:
+            row = conn.execute(
+                "SELECT payload FROM results WHERE key = ? AND version = ?",
+                (key, code_version()),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0])
+    except _CACHE_ERRORS:
+        return None
+
+
+def store_result(path: Path, key: str, value: Any, max_bytes: int = MAX_CACHE_BYTES) -> None:
+    try:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > max_bytes:
+            return
+        fingerprints = _current_fingerprints()
+        with closing(_connect(path)) as conn, conn:
+            conn.execute(
+                "DELETE FROM results WHERE version != ? "
+                f"OR fingerprint NOT IN ({', '.join('?' for _ in fingerprints)})",
+                (code_version(), *fingerprints),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, fingerprint, version, payload, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, _key_fingerprint(key), code_version(), payload, len(payload), time.time()),
+            )
+            _evict_to_size(conn, max_bytes)
+    except _CACHE_ERRORS:
+        return
+
+
+def clear_results(path: Path) -> None:
+    try:
+        with closing(_connect(path)) as conn, conn:
+            conn.execute("DELETE FROM results")
+    except _CACHE_ERRORS:
+        return
+
+
+def _key_fingerprint(key: str) -> str:
+    # make_cache_key puts the preset fingerprint first.
+    return json.loads(key)[0]
+
+
+def _current_fingerprints() -> tuple[str, ...]:
+    # Entries of presets whose content changed (or that were removed) go.
+    return tuple(preset_fingerprint(preset_id) for preset_id in ATB_SIMULATOR_PRESETS)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS results ("
+        "key TEXT PRIMARY KEY, "
+        "fingerprint TEXT NOT NULL, "
+        "version TEXT NOT NULL, "
+        "payload BLOB NOT NULL, "
+        "size INTEGER NOT NULL, "
+        "accessed_at REAL NOT NULL)"
+    )
+    return conn
+
+
+def _evict_to_size(conn: sqlite3.Connection, max_bytes: int) -> None:
+    # Least recently read entries go first once the payloads outgrow the budget.
+    total = 0
+    stale = []
+    for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at DESC"):
+        total += size
+        if total > max_bytes:
+            stale.append((key,))
+    if stale:
+        conn.executemany("DELETE FROM results WHERE key = ?", stale)
+
+
+def _stat_sources(relative_paths: tuple[str, ...]) -> tuple[tuple[int, int], ...]:
+    stats = [(_ROOT / relative_path).stat() for relative_path in relative_paths]
+    return tuple((stat.st_mtime_ns, stat.st_size) for stat in stats)
+
+
+@lru_cache(maxsize=16)
+def _hash_sources(relative_paths: tuple[str, ...], stat_signature: tuple[tuple[int, int], ...]) -> str:
+    # stat_signature only keys the memo, so an edited file is re-hashed
+    # without restarting the process.
+    digest = hashlib.sha256()
+    for relative_path in relative_paths:
+        digest.update(relative_path.encode("utf-8"))
+        digest.update((_ROOT / relative_path).read_bytes())
+    return digest.hexdigest()[:16]
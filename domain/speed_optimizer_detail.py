@@ -1,17 +1,42 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from functools import lru_cache
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
+import json
+import os
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from config.atb_simulator_presets import (
     TOWER_PERCENT,
-    build_full_preset,
     get_leader_percent,
 )
-from domain.atb_simulator import simulate_atb_table, simulate_with_turn_log
-from domain.atb_simulator_utils import prefix_monsters
+from domain.atb_simulator import (
+    SimulationStats,
+    active_simulation_stats,
+    batch_speed_bonus,
+    batch_speed_inputs,
+    batch_turn_order_keys,
+    calculate_combat_speed,
+    collect_simulation_stats,
+    iter_turn_events,
+    simulate_batch,
+    simulate_batch_arrays,
+    simulate_atb_table,
+    simulate_with_turn_log,
+    transform_monster,
+)
+from domain.atb_preset_compiler import compile_preset
+from domain.speed_optimizer_cache import (
+    load_result,
+    make_cache_key,
+    resolve_cache_path,
+    store_result,
+)
 
 MAX_RUNE_SPEED = 250
 MIN_RUNE_SPEED = 150
@@ -19,6 +44,18 @@ COARSE_STEP = 10
 MAX_EFFECT = 60
 DEFAULT_INPUT_3 = 0
 PRESET_AB_INPUT_OFFSET = 39
+SEARCH_MODE_SCAN = "scan"
+SEARCH_MODE_BISECT = "bisect"
+DEFAULT_SEARCH_MODE = SEARCH_MODE_BISECT
+# Set to a non-empty value to attach SimulationStats to every section 1
+# result; debug builds always collect them.
+STATS_ENV = "SPEEDOPT_STATS"
+# a3 levels simulated per batch in the joint (a1, a2, a3) search.
+JOINT_SEARCH_CHUNK = 8
+MONTE_CARLO_SAMPLES = 10_000
+DEBUG_ATTEMPT_LIMIT = 25
+DEBUG_ATTEMPT_SAMPLE_EVERY = 10
+DEBUG_EFFECT_LOG_LIMIT = 16
 
 
 def _resolve_enemy_baseline_rune_speed(
@@ -81,6 +118,39 @@ class PresetDetailResult:
     enemy_rune_speed_source: Optional[str] = None
     enemy_rune_speed_effective: Optional[int] = None
     status: Optional[str] = None
+    debug: Optional[Dict[str, Any]] = None
+    # Work done by the build that produced this result; cached results keep
+    # the stats of their original build.
+    stats: Optional[SimulationStats] = field(default=None, compare=False, repr=False)
+
+
+@dataclass
+class LazyAtbLog:
+    # Debug captures keep the raw ATB log; the table rows are only built when
+    # a panel actually reads them.
+    atb_log: List[Dict[str, Any]]
+    label_map: Dict[str, str]
+    _rows: Optional[List[Dict[str, Any]]] = field(default=None, repr=False, compare=False)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        if self._rows is None:
+            self._rows = _format_atb_log(self.atb_log, self.label_map)
+        return self._rows
+
+
+@dataclass
+class SimulationMemo:
+    # Scoped to a single build, so every entry belongs to the same detail preset.
+    turn_events: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    speed_caches: Dict[str, Optional[Dict[str, Any]]] = field(default_factory=dict)
+    stats: Dict[str, int] = field(
+        default_factory=lambda: {
+            "hits": 0,
+            "misses": 0,
+            "signature_hits": 0,
+            "signature_misses": 0,
+        }
+    )
 
 
 @lru_cache(maxsize=128)
@@ -92,26 +162,62 @@ def build_section1_detail_cached(
     max_runtime_s: Optional[float],
     debug: bool,
 ) -> PresetDetailResult:
-    preset = build_full_preset(preset_id)
-    if preset_id == "Preset B":
-        return _build_preset_detail_type_b(
-            preset_id,
-            preset,
-            input_1,
-            input_2,
-            input_3,
-            max_runtime_s=max_runtime_s,
-            debug=debug,
-        )
-    return _build_preset_detail_type_general(
-        preset_id,
-        preset,
-        input_1,
-        input_2,
-        input_3,
-        max_runtime_s=max_runtime_s,
-        debug=debug,
-    )
+    cache_path = resolve_cache_path()
+    if cache_path is None:
+        return _build_section1_detail(preset_id, input_1, input_2, input_3, max_runtime_s, debug)
+    cache_key = make_cache_key(preset_id, input_1, input_2, input_3, debug)
+    cached = load_result(cache_path, cache_key)
+    if cached is not None:
+        return cached
+    start_time = time.perf_counter()
+    result = _build_section1_detail(preset_id, input_1, input_2, input_3, max_runtime_s, debug)
+    # A run that finished inside its budget never hit a deadline check, so its
+    # result does not depend on max_runtime_s and is safe to share.
+    if not max_runtime_s or time.perf_counter() - start_time < max_runtime_s:
+        store_result(cache_path, cache_key, result)
+    return result
+
+
+def _build_section1_detail(
+    preset_id: str,
+    input_1: Optional[int],
+    input_2: Optional[int],
+    input_3: Optional[int],
+    max_runtime_s: Optional[float],
+    debug: bool,
+) -> PresetDetailResult:
+    preset = compile_preset(preset_id).preset
+    builder = _build_preset_detail_type_b if preset_id == "Preset B" else _build_preset_detail_type_general
+    if not (debug or os.environ.get(STATS_ENV)):
+        return builder(preset_id, preset, input_1, input_2, input_3, max_runtime_s=max_runtime_s, debug=debug)
+    with collect_simulation_stats() as stats, stats.phase("total"):
+        result = builder(preset_id, preset, input_1, input_2, input_3, max_runtime_s=max_runtime_s, debug=debug)
+    result.stats = stats
+    return result
+
+
+def _stats_phase(name: str) -> ContextManager[None]:
+    stats = active_simulation_stats()
+    return nullcontext() if stats is None else stats.phase(name)
+
+
+def _timed_phase(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with _stats_phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _count_memo(memo: SimulationMemo, name: str) -> None:
+    memo.stats[name] += 1
+    stats = active_simulation_stats()
+    if stats is not None:
+        stats.count_cache(name)
 
 
 def _build_preset_detail_type_general(
@@ -149,8 +255,9 @@ def _build_preset_detail_type_general(
     start_time = time.perf_counter()
     deadline = start_time + max_runtime_s if max_runtime_s else None
 
-    prefixed_allies, _ = prefix_monsters(allies, prefix="A")
-    prefixed_enemies, _ = prefix_monsters(enemies, prefix="E")
+    # Compiled presets are already prefixed ("A|"/"E|") and read-only.
+    prefixed_allies = list(allies)
+    prefixed_enemies = list(enemies)
     prefixed_overrides, enemy_speed_source, enemy_speed_effective = _build_section1_overrides(
         preset_id,
         prefixed_allies,
@@ -162,8 +269,7 @@ def _build_preset_detail_type_general(
     )
     debug_payload: Optional[Dict[str, Any]] = None
     if debug:
-        debug_payload = {
-            "input_summary": {
+        debug_payload = _new_debug_payload({
                 "preset_id": preset_id,
                 "input_1": input_1,
                 "input_2": input_2,
@@ -171,15 +277,7 @@ def _build_preset_detail_type_general(
                 "enemy_rune_speed_source": enemy_speed_source,
                 "enemy_rune_speed_effective": enemy_speed_effective,
                 "calc_type": "general",
-            },
-            "attempts": [],
-            # Debug mode stores only a limited number of attempts to avoid heavy memory use.
-            "attempt_limit": 25,
-            "truncated": False,
-            "min_rune_speed": MIN_RUNE_SPEED,
-            "max_rune_speed": MAX_RUNE_SPEED,
-            "effect_logs": [],
-        }
+            })
     if debug_payload is not None:
         debug_payload["calc_type"] = "general"
         debug_payload["input_summary"]["selected_enemy_key"] = "E_MIRROR"
@@ -214,8 +312,12 @@ def _build_preset_detail_type_general(
             enemy_rune_speed_source=None,
             enemy_rune_speed_effective=None,
             status="NO VALID SOLUTION",
+            debug=debug_payload,
         )
 
+    memo = SimulationMemo()
+    if debug_payload is not None:
+        debug_payload["simulation_cache"] = memo.stats
     baseline_overrides = dict(prefixed_overrides)
     baseline_overrides[detail_keys["a3"]] = {
         "rune_speed": MIN_RUNE_SPEED,
@@ -227,6 +329,7 @@ def _build_preset_detail_type_general(
         detail_keys,
         required_order,
         baseline_overrides,
+        memo=memo,
     )
 
     if debug_payload is not None:
@@ -265,7 +368,7 @@ def _build_preset_detail_type_general(
         )
         debug_payload["tick_snapshots"] = debug_snapshots
         debug_payload["baseline_turn_events"] = baseline_turn_events
-        debug_payload["tick_atb_log"] = _format_atb_log(debug_atb_log, case_display["unit_display_map"])
+        debug_payload["tick_atb_log"] = LazyAtbLog(debug_atb_log, case_display["unit_display_map"])
 
     effect_table, effect_error = _build_unit_detail_table(
         detail_preset,
@@ -274,6 +377,7 @@ def _build_preset_detail_type_general(
         detail_keys["a3"],
         deadline,
         debug_payload,
+        memo=memo,
     )
     tick_atb_table = _build_final_tick_table_for_a3(
         detail_preset,
@@ -282,6 +386,7 @@ def _build_preset_detail_type_general(
         detail_keys["a3"],
         case_display["short_label_map"],
         deadline,
+        memo=memo,
     )
     min_speed = _find_minimum_rune_speed(
         detail_preset,
@@ -292,6 +397,7 @@ def _build_preset_detail_type_general(
         start_speed=MIN_RUNE_SPEED,
         deadline=deadline,
         debug=None,
+        memo=memo,
     )
     objective = _format_required_order_display(
         preset_id,
@@ -306,6 +412,7 @@ def _build_preset_detail_type_general(
             prefixed_overrides,
             detail_keys["a3"],
             case_display,
+            memo=memo,
         )
         return PresetDetailResult(
             preset_name=preset_id,
@@ -330,6 +437,7 @@ def _build_preset_detail_type_general(
             enemy_rune_speed_source=enemy_speed_source,
             enemy_rune_speed_effective=enemy_speed_effective,
             status=effect_error or "NO VALID SOLUTION",
+            debug=debug_payload,
         )
     overrides_for_formula = dict(prefixed_overrides)
     overrides_for_formula[detail_keys["a3"]] = {
@@ -360,6 +468,7 @@ def _build_preset_detail_type_general(
         enemy_rune_speed_source=enemy_speed_source,
         enemy_rune_speed_effective=enemy_speed_effective,
         status="OK",
+        debug=debug_payload,
     )
 
 
@@ -399,8 +508,9 @@ def _build_preset_detail_type_b(
     start_time = time.perf_counter()
     deadline = start_time + max_runtime_s if max_runtime_s else None
 
-    prefixed_allies, _ = prefix_monsters(allies, prefix="A")
-    prefixed_enemies, _ = prefix_monsters(enemies, prefix="E")
+    # Compiled presets are already prefixed ("A|"/"E|") and read-only.
+    prefixed_allies = list(allies)
+    prefixed_enemies = list(enemies)
     prefixed_overrides, enemy_speed_source, enemy_speed_effective = _build_section1_overrides(
         preset_id,
         prefixed_allies,
@@ -412,8 +522,7 @@ def _build_preset_detail_type_b(
     )
     debug_payload: Optional[Dict[str, Any]] = None
     if debug:
-        debug_payload = {
-            "input_summary": {
+        debug_payload = _new_debug_payload({
                 "preset_id": preset_id,
                 "input_1": input_1,
                 "input_2": input_2,
@@ -421,14 +530,7 @@ def _build_preset_detail_type_b(
                 "enemy_rune_speed_source": enemy_speed_source,
                 "enemy_rune_speed_effective": enemy_speed_effective,
                 "calc_type": "special_b",
-            },
-            "attempts": [],
-            "attempt_limit": 25,
-            "truncated": False,
-            "min_rune_speed": MIN_RUNE_SPEED,
-            "max_rune_speed": MAX_RUNE_SPEED,
-            "effect_logs": [],
-        }
+            })
 
     enemy_mirror = _build_enemy_mirror(
         preset_id,
@@ -462,8 +564,12 @@ def _build_preset_detail_type_b(
             enemy_rune_speed_source=enemy_speed_source,
             enemy_rune_speed_effective=enemy_speed_effective,
             status="NO VALID SOLUTION",
+            debug=debug_payload,
         )
 
+    memo = SimulationMemo()
+    if debug_payload is not None:
+        debug_payload["simulation_cache"] = memo.stats
     baseline_overrides = dict(prefixed_overrides)
     baseline_overrides[detail_keys["a3"]] = {
         "rune_speed": MIN_RUNE_SPEED,
@@ -475,6 +581,7 @@ def _build_preset_detail_type_b(
         detail_keys,
         required_order,
         baseline_overrides,
+        memo=memo,
     )
     if debug_payload is not None:
         debug_payload["required_order"] = {
@@ -512,7 +619,7 @@ def _build_preset_detail_type_b(
         )
         debug_payload["tick_snapshots"] = debug_snapshots
         debug_payload["baseline_turn_events"] = baseline_turn_events
-        debug_payload["tick_atb_log"] = _format_atb_log(debug_atb_log, case_display["unit_display_map"])
+        debug_payload["tick_atb_log"] = LazyAtbLog(debug_atb_log, case_display["unit_display_map"])
 
     required_order_a1 = RequiredOrder(
         mode="strict",
@@ -528,6 +635,7 @@ def _build_preset_detail_type_b(
         start_speed=MIN_RUNE_SPEED,
         deadline=deadline,
         debug=debug_payload,
+        memo=memo,
     )
     a1_time = time.perf_counter() - a1_start
     if debug_payload is not None:
@@ -559,6 +667,7 @@ def _build_preset_detail_type_b(
                 prefixed_overrides,
                 detail_keys["a3"],
                 case_display,
+                memo=memo,
             ),
             effect_table=_build_no_solution_table(),
             min_cut_result=None,
@@ -571,6 +680,7 @@ def _build_preset_detail_type_b(
             enemy_rune_speed_source=enemy_speed_source,
             enemy_rune_speed_effective=enemy_speed_effective,
             status="NO VALID SOLUTION",
+            debug=debug_payload,
         )
 
     step1_overrides = dict(prefixed_overrides)
@@ -585,6 +695,7 @@ def _build_preset_detail_type_b(
         detail_keys,
         required_order,
         fixed_overrides,
+        memo=memo,
     )
     effect_table_step1, _ = _build_unit_detail_table(
         detail_preset,
@@ -593,6 +704,7 @@ def _build_preset_detail_type_b(
         detail_keys["a1"],
         deadline,
         debug_payload,
+        memo=memo,
     )
     effect_table, effect_error = _build_unit_detail_table(
         detail_preset,
@@ -601,6 +713,7 @@ def _build_preset_detail_type_b(
         detail_keys["a3"],
         deadline,
         debug_payload,
+        memo=memo,
     )
     tick_atb_table_step2 = _build_final_tick_table_for_a3(
         detail_preset,
@@ -609,6 +722,7 @@ def _build_preset_detail_type_b(
         detail_keys["a3"],
         case_display["short_label_map"],
         deadline,
+        memo=memo,
     )
     min_speed_a3 = _find_minimum_rune_speed(
         detail_preset,
@@ -619,6 +733,7 @@ def _build_preset_detail_type_b(
         start_speed=MIN_RUNE_SPEED,
         deadline=deadline,
         debug=None,
+        memo=memo,
     )
     if min_speed_a3 is None:
         return PresetDetailResult(
@@ -640,6 +755,7 @@ def _build_preset_detail_type_b(
                 fixed_overrides,
                 detail_keys["a3"],
                 case_display,
+                memo=memo,
             ),
             effect_table=effect_table,
             min_cut_result=None,
@@ -652,6 +768,7 @@ def _build_preset_detail_type_b(
             enemy_rune_speed_source=enemy_speed_source,
             enemy_rune_speed_effective=enemy_speed_effective,
             status=effect_error or "NO VALID SOLUTION",
+            debug=debug_payload,
         )
     overrides_for_formula = dict(fixed_overrides)
     overrides_for_formula[detail_keys["a3"]] = {
@@ -685,7 +802,310 @@ def _build_preset_detail_type_b(
         enemy_rune_speed_source=enemy_speed_source,
         enemy_rune_speed_effective=enemy_speed_effective,
         status="OK",
+        debug=debug_payload,
+    )
+
+
+def build_enemy_speed_sweep(
+    preset_id: str,
+    input_1: Optional[int],
+    input_2: Optional[int],
+    enemy_rune_speeds: Sequence[int] = range(MIN_RUNE_SPEED, MAX_RUNE_SPEED + 1),
+) -> List[Dict[str, Optional[int]]]:
+    """Minimum a3 rune speed (effect 0) for each effective enemy rune speed.
+
+    Each row matches what section 1 reports when the enemy baseline resolves
+    to that speed. The enemy mirror is swept through overrides, so every row
+    shares one detail preset and all rows are simulated in a single batch
+    before the usual searches replay from the cache.
+    """
+    preset = compile_preset(preset_id).preset
+    allies = list(preset.get("allies", []))
+    enemies = list(preset.get("enemies", []))
+    if len(allies) < 3 or len(enemies) < 2:
+        raise ValueError(f"{preset_id} does not have enough units for a sweep.")
+    base_overrides, _, _ = _build_section1_overrides(
+        preset_id,
+        allies,
+        enemies,
+        input_1,
+        input_2,
+        None,
+        allow_enemy_fallback=True,
+    )
+    enemy_mirror = _build_enemy_mirror(preset_id, allies, base_overrides, MIN_RUNE_SPEED)
+    detail_preset, detail_keys = _build_detail_preset(preset, allies, enemy_mirror)
+    required_order = _resolve_required_order(preset_id, detail_keys)
+    if required_order is None:
+        raise ValueError(f"{preset_id} has no required order.")
+
+    memo = SimulationMemo()
+    rows: List[Dict[str, Optional[int]]] = []
+    row_overrides: List[Dict[str, Dict[str, int]]] = []
+    for enemy_rune_speed in enemy_rune_speeds:
+        overrides = dict(base_overrides)
+        overrides[detail_keys["e_fast"]] = {"rune_speed": enemy_rune_speed}
+        rows.append({"enemy_rune_speed": enemy_rune_speed})
+        row_overrides.append(overrides)
+
+    if preset_id == "Preset B":
+        # Preset B first fixes a1 at its own minimum, then optimizes a3.
+        required_order_a1 = RequiredOrder(
+            mode="strict",
+            order=[detail_keys["a2"], detail_keys["a1"], detail_keys["e_fast"]],
+        )
+        a1_minimums = _sweep_minimum_rune_speeds(
+            detail_preset,
+            required_order_a1,
+            row_overrides,
+            detail_keys["a1"],
+            memo,
+        )
+        for row, overrides, a1_min in zip(rows, row_overrides, a1_minimums):
+            row["a1_min_rune_speed"] = a1_min
+            if a1_min is not None:
+                overrides[detail_keys["a1"]] = {"rune_speed": a1_min, "speedIncreasingEffect": 0}
+        solvable = [index for index, a1_min in enumerate(a1_minimums) if a1_min is not None]
+    else:
+        solvable = list(range(len(rows)))
+
+    a3_minimums = _sweep_minimum_rune_speeds(
+        detail_preset,
+        required_order,
+        [row_overrides[index] for index in solvable],
+        detail_keys["a3"],
+        memo,
+    )
+    for row in rows:
+        row["a3_min_rune_speed"] = None
+    for index, a3_min in zip(solvable, a3_minimums):
+        rows[index]["a3_min_rune_speed"] = a3_min
+    return rows
+
+
+def _sweep_minimum_rune_speeds(
+    detail_preset: Dict[str, Any],
+    required_order: RequiredOrder,
+    overrides_list: List[Dict[str, Dict[str, int]]],
+    target_key: str,
+    memo: SimulationMemo,
+) -> List[Optional[int]]:
+    _batch_prefill_signatures(
+        detail_preset,
+        required_order,
+        target_key,
+        [
+            (overrides, _speed_cache_for(memo, detail_preset, required_order, overrides, target_key))
+            for overrides in overrides_list
+        ],
+        [0],
+    )
+    return [
+        _find_minimum_rune_speed(
+            detail_preset,
+            required_order,
+            overrides,
+            target_key,
+            effect=0,
+            start_speed=MIN_RUNE_SPEED,
+            deadline=None,
+            debug=None,
+            memo=memo,
+        )
+        for overrides in overrides_list
+    ]
+
+
+def build_joint_speed_pareto(
+    preset_id: str,
+    enemy_rune_speed: int,
+    effects: Optional[Dict[str, int]] = None,
+    speed_range: Tuple[int, int] = (MIN_RUNE_SPEED, MAX_RUNE_SPEED),
+    step: int = 1,
+) -> List[Dict[str, int]]:
+    """Pareto-minimal (a1, a2, a3) rune speeds that satisfy the required order.
+
+    All three allies are tuned together against the enemy mirror at
+    ``enemy_rune_speed``. ``effects`` optionally fixes the speedIncreasingEffect
+    per role (``"a1"``, ``"a2"``, ``"a3"``); unset roles keep their preset value.
+    Rows are sorted by total rune speed, so the first row is the cheapest.
+    """
+    preset = compile_preset(preset_id).preset
+    allies = list(preset.get("allies", []))
+    if len(allies) < 3 or len(preset.get("enemies", [])) < 2:
+        raise ValueError(f"{preset_id} does not have enough units for a joint search.")
+    enemy_mirror = _build_enemy_mirror(preset_id, allies, {}, enemy_rune_speed)
+    detail_preset, detail_keys = _build_detail_preset(preset, allies, enemy_mirror)
+    required_order = _resolve_required_order(preset_id, detail_keys)
+    if required_order is None:
+        raise ValueError(f"{preset_id} has no required order.")
+
+    speeds = np.arange(speed_range[0], speed_range[1] + 1, step)
+    keys, base_rune_speed, base_effect = batch_speed_inputs(detail_preset, 1)
+    columns = {role: keys.index(detail_keys[role]) for role in ("a1", "a2", "a3")}
+    for role, value in (effects or {}).items():
+        base_effect[0, columns[role]] = value
+    max_turns = None if required_order.mode == "a2_a3_e" else len(required_order.order)
+    # a2_a3_e only compares first turns, so rows can stop once all three moved.
+    until_keys = required_order.order if required_order.mode == "a2_a3_e" else None
+
+    # Only the slowest feasible a3 of each (a1, a2) pair can be Pareto-minimal,
+    # so a3 is scanned upwards and a pair leaves the scan once it is solved.
+    # Every pair at least as fast as a solved one can then only be dominated,
+    # which prunes whole quadrants of the grid after each batch.
+    size = len(speeds)
+    active = np.ones((size, size), dtype=bool)
+    minimum = np.full((size, size), size, dtype=np.int64)
+    for chunk_start in range(0, size, JOINT_SEARCH_CHUNK):
+        pairs = np.argwhere(active)
+        if not len(pairs):
+            break
+        levels = np.arange(chunk_start, min(chunk_start + JOINT_SEARCH_CHUNK, size))
+        rune_speed = np.repeat(base_rune_speed, len(pairs) * len(levels), axis=0)
+        rune_speed[:, columns["a1"]] = np.repeat(speeds[pairs[:, 0]], len(levels))
+        rune_speed[:, columns["a2"]] = np.repeat(speeds[pairs[:, 1]], len(levels))
+        rune_speed[:, columns["a3"]] = np.tile(speeds[levels], len(pairs))
+        effect = np.repeat(base_effect, len(rune_speed), axis=0)
+        batch_result = simulate_batch_arrays(
+            detail_preset,
+            rune_speed,
+            effect,
+            max_turns=max_turns,
+            until_keys=until_keys,
+        )
+        matched = _batch_order_matches(required_order, batch_result).reshape(len(pairs), len(levels))
+        solved = matched.any(axis=1)
+        solved_a1, solved_a2 = pairs[solved].T
+        minimum[solved_a1, solved_a2] = levels[matched[solved].argmax(axis=1)]
+        solved_mask = np.zeros_like(active)
+        solved_mask[solved_a1, solved_a2] = True
+        active &= ~np.logical_or.accumulate(np.logical_or.accumulate(solved_mask, axis=0), axis=1)
+
+    return [
+        {
+            "a1_rune_speed": int(speeds[a1]),
+            "a2_rune_speed": int(speeds[a2]),
+            "a3_rune_speed": int(speeds[a3]),
+            "total_rune_speed": int(speeds[a1] + speeds[a2] + speeds[a3]),
+        }
+        for a1, a2, a3 in sorted(
+            _pareto_minimal_cells(minimum, size),
+            key=lambda cell: (sum(cell), cell),
+        )
+    ]
+
+
+def _pareto_minimal_cells(minimum: np.ndarray, missing: int) -> List[Tuple[int, int, int]]:
+    # A cell is dominated when some other cell with a1' <= a1 and a2' <= a2
+    # needs no more a3; the 2-D prefix minimum answers that for every cell.
+    prefix = np.minimum.accumulate(np.minimum.accumulate(minimum, axis=0), axis=1)
+    best_other = np.full_like(minimum, missing)
+    best_other[1:, :] = prefix[:-1, :]
+    best_other[:, 1:] = np.minimum(best_other[:, 1:], prefix[:, :-1])
+    cells = np.argwhere((minimum < missing) & (minimum < best_other))
+    return [(int(a1), int(a2), int(minimum[a1, a2])) for a1, a2 in cells]
+
+
+def estimate_order_probability(
+    preset_id: str,
+    input_1: Optional[int],
+    input_2: Optional[int],
+    ally_rune_speeds: Dict[str, int],
+    enemy_rune_speed_range: Tuple[int, int],
+    enemy_effect_range: Optional[Tuple[int, int]] = None,
+    enemy_tower_range: Optional[Tuple[int, int]] = None,
+    enemy_lead_range: Optional[Tuple[int, int]] = None,
+    samples: int = MONTE_CARLO_SAMPLES,
+    seed: Optional[int] = None,
+) -> Dict[str, float]:
+    """Probability that the required order holds when the enemy is uncertain.
+
+    Allies are set up as in section 1 from ``input_1``/``input_2``, and
+    ``ally_rune_speeds`` (e.g. ``{"a3": 182}``) sets candidate rune speeds at
+    effect 0. Enemy rune speed, speedIncreasingEffect, tower and lead percent
+    are sampled uniformly from the given inclusive ranges; ranges left as
+    ``None`` keep the preset value. All samples run in one batch.
+    """
+    preset = compile_preset(preset_id).preset
+    allies = list(preset.get("allies", []))
+    enemies = list(preset.get("enemies", []))
+    if len(allies) < 3 or len(enemies) < 2:
+        raise ValueError(f"{preset_id} does not have enough units for a robust-order estimate.")
+    base_overrides, _, _ = _build_section1_overrides(
+        preset_id,
+        allies,
+        enemies,
+        input_1,
+        input_2,
+        None,
+        allow_enemy_fallback=True,
     )
+    enemy_mirror = _build_enemy_mirror(preset_id, allies, base_overrides, enemy_rune_speed_range[0])
+    detail_preset, detail_keys = _build_detail_preset(preset, allies, enemy_mirror)
+    required_order = _resolve_required_order(preset_id, detail_keys)
+    if required_order is None:
+        raise ValueError(f"{preset_id} has no required order.")
+
+    overrides = dict(base_overrides)
+    for role, rune_speed in ally_rune_speeds.items():
+        overrides[detail_keys[role]] = {"rune_speed": rune_speed, "speedIncreasingEffect": 0}
+    keys, rune_speed, effect = batch_speed_inputs(detail_preset, samples)
+    speed_bonus = batch_speed_bonus(detail_preset, samples)
+    for key, override in overrides.items():
+        column = keys.index(key)
+        rune_speed[:, column] = override.get("rune_speed", rune_speed[0, column])
+        effect[:, column] = override.get("speedIncreasingEffect", effect[0, column])
+
+    rng = np.random.default_rng(seed)
+    enemy = keys.index(detail_keys["e_fast"])
+    rune_speed[:, enemy] = rng.integers(enemy_rune_speed_range[0], enemy_rune_speed_range[1] + 1, samples)
+    if enemy_effect_range is not None:
+        effect[:, enemy] = rng.integers(enemy_effect_range[0], enemy_effect_range[1] + 1, samples)
+    if enemy_tower_range is not None or enemy_lead_range is not None:
+        enemy_effects = detail_preset.get("enemyEffects", {})
+        tower_low, tower_high = enemy_tower_range or (enemy_effects.get("tower", 0),) * 2
+        lead_low, lead_high = enemy_lead_range or (enemy_effects.get("lead", 0),) * 2
+        speed_bonus[:, enemy] = (
+            rng.integers(tower_low, tower_high + 1, samples) + rng.integers(lead_low, lead_high + 1, samples)
+        )
+
+    batch_result = simulate_batch_arrays(
+        detail_preset,
+        rune_speed,
+        effect,
+        max_turns=None if required_order.mode == "a2_a3_e" else len(required_order.order),
+        until_keys=required_order.order if required_order.mode == "a2_a3_e" else None,
+        speed_bonus=speed_bonus,
+    )
+    matched = int(_batch_order_matches(required_order, batch_result).sum())
+    probability = matched / samples if samples else 0.0
+    return {
+        "probability": probability,
+        "matched": matched,
+        "samples": samples,
+        "std_error": float(np.sqrt(probability * (1 - probability) / samples)) if samples else 0.0,
+    }
+
+
+def _batch_order_matches(required_order: RequiredOrder, batch_result: Dict[str, Any]) -> np.ndarray:
+    """Vectorised ``_order_matches`` over every row of a ``simulate_batch`` result."""
+    turn_order = batch_result["turn_order"]
+    key_index = {key: index for index, key in enumerate(batch_result["keys"])}
+    if any(key not in key_index for key in required_order.order):
+        return np.zeros(len(turn_order), dtype=bool)
+    required = np.array([key_index[key] for key in required_order.order])
+    if required_order.mode == "a2_a3_e":
+        turn_order = turn_order[:, : int(batch_result["turn_counts"].max(initial=0))]
+        occurs = turn_order[:, :, None] == required[None, None, :]
+        first_turn = np.where(occurs.any(axis=1), occurs.argmax(axis=1), turn_order.shape[1])
+        return (
+            occurs.any(axis=1).all(axis=1)
+            & (first_turn[:, 0] < first_turn[:, 1])
+            & (first_turn[:, 1] < first_turn[:, 2])
+        )
+    if turn_order.shape[1] < len(required):
+        return np.zeros(len(turn_order), dtype=bool)
+    return (turn_order[:, : len(required)] == required[None, :]).all(axis=1)
 
 
 def _build_section1_overrides(
@@ -832,6 +1252,7 @@ def _build_case_display(
     detail_keys: Dict[str, str],
     required_order: RequiredOrder,
     overrides: Dict[str, Dict[str, int]],
+    memo: Optional[SimulationMemo] = None,
 ) -> Dict[str, Any]:
     unit_names = _build_unit_name_map(detail_preset, detail_keys, preset_id)
     unit_display_map = {
@@ -857,6 +1278,7 @@ def _build_case_display(
         overrides,
         required_order,
         debug=None,
+        memo=memo,
     )
     required_display = _format_required_order_display(
         preset_id,
@@ -945,12 +1367,14 @@ def _build_formula_table(
     return rows
 
 
+@_timed_phase("diagnostic")
 def _build_no_solution_diagnostic(
     detail_preset: Dict[str, Any],
     required_order: RequiredOrder,
     overrides: Dict[str, Dict[str, int]],
     target_key: Optional[str],
     case_display: Dict[str, Any],
+    memo: Optional[SimulationMemo] = None,
 ) -> Optional[Dict[str, Any]]:
     if not target_key:
         return None
@@ -959,7 +1383,7 @@ def _build_no_solution_diagnostic(
         "rune_speed": MAX_RUNE_SPEED,
         "speedIncreasingEffect": 0,
     }
-    _, turn_events = simulate_with_turn_log(detail_preset, overrides_max)
+    turn_events = _simulate_turn_events(detail_preset, overrides_max, memo)
     actual_order = [event.get("key") for event in turn_events]
     actual_display = _format_actual_order_display(
         actual_order,
@@ -1046,6 +1470,7 @@ def _build_resolved_specs(
     return summary
 
 
+@_timed_phase("tick_table")
 def _build_tick_atb_table(
     detail_preset: Dict[str, Any],
     overrides: Dict[str, Dict[str, int]],
@@ -1083,6 +1508,7 @@ def _build_tick_headers(
     return headers
 
 
+@_timed_phase("tick_table")
 def _build_final_tick_table_for_a3(
     detail_preset: Dict[str, Any],
     required_order: RequiredOrder,
@@ -1090,6 +1516,7 @@ def _build_final_tick_table_for_a3(
     target_key: str,
     short_label_map: Dict[str, str],
     deadline: Optional[float],
+    memo: Optional[SimulationMemo] = None,
 ) -> List[Dict[str, Any]]:
     min_speed = _find_minimum_rune_speed(
         detail_preset,
@@ -1100,6 +1527,7 @@ def _build_final_tick_table_for_a3(
         start_speed=MIN_RUNE_SPEED,
         deadline=deadline,
         debug=None,
+        memo=memo,
     )
     if min_speed is None:
         return []
@@ -1111,6 +1539,7 @@ def _build_final_tick_table_for_a3(
     return _build_tick_atb_table(detail_preset, overrides, short_label_map)
 
 
+@_timed_phase("effect_table")
 def _build_unit_detail_table(
     detail_preset: Dict[str, Any],
     required_order: RequiredOrder,
@@ -1118,11 +1547,21 @@ def _build_unit_detail_table(
     target_key: Optional[str],
     deadline: Optional[float],
     debug: Optional[Dict[str, Any]],
+    memo: Optional[SimulationMemo] = None,
 ) -> Tuple[Optional[DetailTable], Optional[str]]:
     if not target_key:
         return None, "Target unit key was missing."
 
     effect_to_speed: Dict[int, Optional[int]] = {}
+    if memo is None:
+        memo = SimulationMemo()
+    _prefill_grid_signatures(
+        detail_preset,
+        required_order,
+        base_overrides,
+        target_key,
+        _speed_cache_for(memo, detail_preset, required_order, base_overrides, target_key),
+    )
     start_speed = MIN_RUNE_SPEED
     for effect in range(0, MAX_EFFECT + 1):
         if deadline and time.perf_counter() > deadline:
@@ -1136,6 +1575,7 @@ def _build_unit_detail_table(
             start_speed,
             deadline,
             debug,
+            memo=memo,
         )
         effect_to_speed[effect] = minimum
         if minimum is not None:
@@ -1144,6 +1584,79 @@ def _build_unit_detail_table(
     return DetailTable(ranges=_summarize_effect_ranges(effect_to_speed)), None
 
 
+@_timed_phase("grid_prefill")
+def _prefill_grid_signatures(
+    detail_preset: Dict[str, Any],
+    required_order: RequiredOrder,
+    base_overrides: Dict[str, Dict[str, int]],
+    target_key: str,
+    speed_cache: Optional[Dict[str, Any]],
+) -> None:
+    # Full-grid batch prefill, not a boundary walk: every distinct combat-speed
+    # signature in the 0..MAX_EFFECT x MIN_RUNE_SPEED..MAX_RUNE_SPEED grid goes
+    # through one batched simulation, so the signature work is O(effects x
+    # speeds). The per-effect searches that follow then read each probe from
+    # the cache instead of simulating it.
+    _batch_prefill_signatures(
+        detail_preset,
+        required_order,
+        target_key,
+        [(base_overrides, speed_cache)],
+        range(0, MAX_EFFECT + 1),
+    )
+
+
+def _batch_prefill_signatures(
+    detail_preset: Dict[str, Any],
+    required_order: RequiredOrder,
+    target_key: str,
+    caches: List[Tuple[Dict[str, Dict[str, int]], Optional[Dict[str, Any]]]],
+    effects: Sequence[int],
+) -> None:
+    # Simulates each uncached signature of every (effect, rune speed) cell
+    # once, in a single batch, and stores the outcome in its speed cache.
+    cells: Dict[Tuple[int, Tuple[int, ...]], Tuple[int, int]] = {}
+    for index, (_, speed_cache) in enumerate(caches):
+        if speed_cache is None:
+            return
+        for effect in effects:
+            for rune_speed in range(MIN_RUNE_SPEED, MAX_RUNE_SPEED + 1):
+                signature = _target_speed_signature(
+                    detail_preset,
+                    target_key,
+                    effect,
+                    rune_speed,
+                    speed_cache["variants"],
+                )
+                if signature is None:
+                    return
+                if signature not in speed_cache["outcomes"]:
+                    cells.setdefault((index, signature), (effect, rune_speed))
+    if not cells:
+        return
+
+    overrides_batch = []
+    for (index, _), (effect, rune_speed) in cells.items():
+        overrides = dict(caches[index][0])
+        overrides[target_key] = {
+            "rune_speed": rune_speed,
+            "speedIncreasingEffect": effect,
+        }
+        overrides_batch.append(overrides)
+    try:
+        batch_result = simulate_batch(detail_preset, overrides_batch)
+    except ValueError:
+        return
+
+    limit = None if required_order.mode == "a2_a3_e" else len(required_order.order)
+    for (index, signature), actual_order in zip(cells, batch_turn_order_keys(batch_result, limit=limit)):
+        caches[index][1]["outcomes"][signature] = (
+            _order_matches(required_order, actual_order),
+            actual_order,
+            [],
+        )
+
+
 def _build_no_solution_table() -> DetailTable:
     effect_to_speed = {effect: None for effect in range(0, MAX_EFFECT + 1)}
     return DetailTable(ranges=_summarize_effect_ranges(effect_to_speed))
@@ -1158,15 +1671,63 @@ def _find_minimum_rune_speed(
     start_speed: int,
     deadline: Optional[float],
     debug: Optional[Dict[str, Any]],
+    search_mode: str = DEFAULT_SEARCH_MODE,
+    verify: bool = True,
+    memo: Optional[SimulationMemo] = None,
 ) -> Optional[int]:
     start = max(start_speed, MIN_RUNE_SPEED)
     effect_log = _init_effect_log(debug, effect, start)
 
+    if search_mode == SEARCH_MODE_BISECT:
+        minimum, consistent = _bisect_minimum_rune_speed(
+            detail_preset,
+            required_order,
+            base_overrides,
+            target_key,
+            effect,
+            start,
+            deadline,
+            debug,
+            verify,
+            effect_log,
+            memo=memo,
+        )
+        if consistent:
+            _finalize_effect_log(debug, effect_log, minimum)
+            return minimum
+
+    minimum = _scan_minimum_rune_speed(
+        detail_preset,
+        required_order,
+        base_overrides,
+        target_key,
+        effect,
+        start,
+        deadline,
+        debug,
+        effect_log,
+        memo=memo,
+    )
+    _finalize_effect_log(debug, effect_log, minimum)
+    return minimum
+
+
+def _scan_minimum_rune_speed(
+    detail_preset: Dict[str, Any],
+    required_order: RequiredOrder,
+    base_overrides: Dict[str, Dict[str, int]],
+    target_key: str,
+    effect: int,
+    start: int,
+    deadline: Optional[float],
+    debug: Optional[Dict[str, Any]],
+    effect_log: Optional[Dict[str, Any]],
+    memo: Optional[SimulationMemo] = None,
+) -> Optional[int]:
     coarse_start = start if start % COARSE_STEP == 0 else start + (COARSE_STEP - start % COARSE_STEP)
     coarse_feasible = None
     for rune_speed in range(coarse_start, MAX_RUNE_SPEED + 1, COARSE_STEP):
         if deadline and time.perf_counter() > deadline:
-            _finalize_effect_log(debug, effect_log, None)
             return None
         matched = _simulate_attempt(
             detail_preset,
@@ -1177,15 +1738,15 @@ def _find_minimum_rune_speed(
             rune_speed,
             debug,
             phase="coarse",
+            memo=memo,
         )
         _log_effect_step(effect_log, "coarse_attempts", {"speed": rune_speed, "matched": matched})
         if matched:
             coarse_feasible = rune_speed
-            _log_effect_step(effect_log, "coarse_first_feasible", rune_speed)
+            _log_effect_step(effect_log, "first_feasible", rune_speed)
             break
 
     if coarse_feasible is None:
-        _finalize_effect_log(debug, effect_log, None)
         return None
 
     bucket_low = max(MIN_RUNE_SPEED, coarse_feasible - COARSE_STEP)
@@ -1193,7 +1754,6 @@ def _find_minimum_rune_speed(
     refined = None
     for rune_speed in range(refine_start, coarse_feasible + 1):
         if deadline and time.perf_counter() > deadline:
-            _finalize_effect_log(debug, effect_log, None)
             return None
         matched = _simulate_attempt(
             detail_preset,
@@ -1204,6 +1764,7 @@ def _find_minimum_rune_speed(
             rune_speed,
             debug,
             phase="refine",
+            memo=memo,
         )
         _log_effect_step(effect_log, "refine_attempts", {"speed": rune_speed, "matched": matched})
         if matched:
@@ -1211,13 +1772,11 @@ def _find_minimum_rune_speed(
             break
 
     if refined is None:
-        _finalize_effect_log(debug, effect_log, None)
         return None
 
     while refined > MIN_RUNE_SPEED:
         candidate = refined - 1
         if deadline and time.perf_counter() > deadline:
-            _finalize_effect_log(debug, effect_log, None)
             return None
         matched = _simulate_attempt(
             detail_preset,
@@ -1228,6 +1787,7 @@ def _find_minimum_rune_speed(
             candidate,
             debug,
             phase="refine",
+            memo=memo,
         )
         _log_effect_step(effect_log, "refine_attempts", {"speed": candidate, "matched": matched})
         if matched:
@@ -1235,19 +1795,165 @@ def _find_minimum_rune_speed(
         else:
             break
 
-    _finalize_effect_log(debug, effect_log, refined)
     return refined
 
 
+def _bisect_minimum_rune_speed(
+    detail_preset: Dict[str, Any],
+    required_order: RequiredOrder,
+    base_overrides: Dict[str, Dict[str, int]],
+    target_key: str,
+    effect: int,
+    start: int,
+    deadline: Optional[float],
+    debug: Optional[Dict[str, Any]],
+    verify: bool,
+    effect_log: Optional[Dict[str, Any]],
+    memo: Optional[SimulationMemo] = None,
+) -> Tuple[Optional[int], bool]:
+    # Feasible speeds form an interval: too slow loses to the enemy, too fast
+    # can overtake an ally. Only the lower edge is searched, below a speed
+    # that is known to be feasible, so the upper edge never matters.
+    # Returns (minimum, consistent); consistent=False asks for a scan fallback.
+    # The result is only guaranteed to match the scan when feasible speeds are
+    # contiguous: verify catches gaps that span a coarse grid point, but a gap
+    # narrower than COARSE_STEP between two probes goes unnoticed.
+    if deadline and time.perf_counter() > deadline:
+        return None, True
+    matched = _simulate_attempt(
+        detail_preset,
+        base_overrides,
+        required_order,
+        target_key,
+        effect,
+        start,
+        debug,
+        phase="coarse",
+        memo=memo,
+    )
+    _log_effect_step(effect_log, "coarse_attempts", {"speed": start, "matched": matched})
+    if matched:
+        feasible = start
+        infeasible = None
+    else:
+        feasible = None
+        coarse_start = start + (COARSE_STEP - start % COARSE_STEP)
+        for rune_speed in range(coarse_start, MAX_RUNE_SPEED + 1, COARSE_STEP):
+            if deadline and time.perf_counter() > deadline:
+                return None, True
+            matched = _simulate_attempt(
+                detail_preset,
+                base_overrides,
+                required_order,
+                target_key,
+                effect,
+                rune_speed,
+                debug,
+                phase="coarse",
+                memo=memo,
+            )
+            _log_effect_step(effect_log, "coarse_attempts", {"speed": rune_speed, "matched": matched})
+            if matched:
+                feasible = rune_speed
+                break
+        if feasible is None:
+            return None, True
+        infeasible = max(start, feasible - COARSE_STEP)
+    _log_effect_step(effect_log, "first_feasible", feasible)
+
+    anchor = feasible
+    step = 1
+    while infeasible is None:
+        # Gallop down from a feasible start: the previous effect's minimum is
+        # usually the answer or very close to it.
+        if feasible == MIN_RUNE_SPEED:
+            infeasible = MIN_RUNE_SPEED - 1
+            break
+        if deadline and time.perf_counter() > deadline:
+            return None, True
+        candidate = max(MIN_RUNE_SPEED, feasible - step)
+        matched = _simulate_attempt(
+            detail_preset,
+            base_overrides,
+            required_order,
+            target_key,
+            effect,
+            candidate,
+            debug,
+            phase="bisect",
+            memo=memo,
+        )
+        _log_effect_step(effect_log, "refine_attempts", {"speed": candidate, "matched": matched})
+        if matched:
+            feasible = candidate
+            step *= 2
+        else:
+            infeasible = candidate
+
+    while feasible - infeasible > 1:
+        if deadline and time.perf_counter() > deadline:
+            return None, True
+        candidate = (feasible + infeasible) // 2
+        matched = _simulate_attempt(
+            detail_preset,
+            base_overrides,
+            required_order,
+            target_key,
+            effect,
+            candidate,
+            debug,
+            phase="bisect",
+            memo=memo,
+        )
+        _log_effect_step(effect_log, "refine_attempts", {"speed": candidate, "matched": matched})
+        if matched:
+            feasible = candidate
+        else:
+            infeasible = candidate
+
+    if verify:
+        # Spot-check the coarse grid between the result and the anchor; a gap
+        # there means the preset is not monotone and the scan must decide.
+        # Probing every speed instead would cost as much as the scan itself.
+        verify_start = feasible + (COARSE_STEP - feasible % COARSE_STEP)
+        for rune_speed in range(verify_start, anchor, COARSE_STEP):
+            if deadline and time.perf_counter() > deadline:
+                return None, True
+            matched = _simulate_attempt(
+                detail_preset,
+                base_overrides,
+                required_order,
+                target_key,
+                effect,
+                rune_speed,
+                debug,
+                phase="verify",
+                memo=memo,
+            )
+            _log_effect_step(effect_log, "refine_attempts", {"speed": rune_speed, "matched": matched})
+            if not matched:
+                return None, False
+
+    return feasible, True
+
+
 def _matches_required_order(
     detail_preset: Dict[str, Any],
     overrides: Dict[str, Dict[str, int]],
     required_order: RequiredOrder,
     debug: Optional[Dict[str, Any]] = None,
+    memo: Optional[SimulationMemo] = None,
 ) -> Tuple[bool, List[str], List[Dict[str, Any]]]:
-    _, turn_events = simulate_with_turn_log(detail_preset, overrides)
-    if required_order.mode == "a2_a3_e":
+    turn_events = _simulate_turn_events(detail_preset, overrides, memo)
+    if required_order.mode == "a2_a3_e" or len(turn_events) < len(required_order.order):
         actual_order = [event.get("key") for event in turn_events]
+    else:
+        actual_order = [event.get("key") for event in turn_events[: len(required_order.order)]]
+    return _order_matches(required_order, actual_order), actual_order, _trim_turn_events(turn_events, debug)
+
+
+def _order_matches(required_order: RequiredOrder, actual_order: List[Optional[str]]) -> bool:
+    if required_order.mode == "a2_a3_e":
         index_map: Dict[str, int] = {}
         for idx, key in enumerate(actual_order):
             if key is None or key in index_map:
@@ -1255,14 +1961,9 @@ def _matches_required_order(
             index_map[key] = idx
         a2, a3, enemy = required_order.order
         if a2 not in index_map or a3 not in index_map or enemy not in index_map:
-            return False, actual_order, _trim_turn_events(turn_events, debug)
-        is_valid = index_map[a2] < index_map[a3] < index_map[enemy]
-        return is_valid, actual_order, _trim_turn_events(turn_events, debug)
-    if len(turn_events) < len(required_order.order):
-        actual_order = [event.get("key") for event in turn_events]
-        return False, actual_order, _trim_turn_events(turn_events, debug)
-    actual_order = [event.get("key") for event in turn_events[: len(required_order.order)]]
-    return actual_order == required_order.order, actual_order, _trim_turn_events(turn_events, debug)
+            return False
+        return index_map[a2] < index_map[a3] < index_map[enemy]
+    return actual_order[: len(required_order.order)] == required_order.order
 
 
 def _summarize_effect_ranges(effect_to_speed: Dict[int, Optional[int]]) -> List[Dict[str, str]]:
@@ -1327,6 +2028,22 @@ def _format_atb_log(
     return formatted
 
 
+def _new_debug_payload(input_summary: Dict[str, Any]) -> Dict[str, Any]:
+    # Attempts and effect logs are ring buffers: a long search keeps its most
+    # recent records instead of growing with every probe.
+    return {
+        "input_summary": input_summary,
+        "attempts": deque(maxlen=DEBUG_ATTEMPT_LIMIT),
+        "attempt_limit": DEBUG_ATTEMPT_LIMIT,
+        "attempt_sample_every": DEBUG_ATTEMPT_SAMPLE_EVERY,
+        "attempts_seen": 0,
+        "truncated": False,
+        "min_rune_speed": MIN_RUNE_SPEED,
+        "max_rune_speed": MAX_RUNE_SPEED,
+        "effect_logs": deque(maxlen=DEBUG_EFFECT_LOG_LIMIT),
+    }
+
+
 def _record_debug_attempt(
     debug: Optional[Dict[str, Any]],
     effect: int,
@@ -1339,13 +2056,19 @@ def _record_debug_attempt(
 ) -> None:
     if debug is None:
         return
-    if debug.get("truncated"):
+    limit = debug.get("attempt_limit", DEBUG_ATTEMPT_LIMIT)
+    if limit <= 0:
         return
-    attempts = debug.get("attempts", [])
-    limit = debug.get("attempt_limit", 25)
+    seen = debug.get("attempts_seen", 0)
+    debug["attempts_seen"] = seen + 1
+    # Failed probes explain a minimum, so they are all kept; matches are sampled.
+    if matched and seen % debug.get("attempt_sample_every", 1):
+        return
+    attempts = debug["attempts"]
     if len(attempts) >= limit:
         debug["truncated"] = True
-        return
+        if getattr(attempts, "maxlen", None) is None:
+            del attempts[0]
     attempts.append({
         "effect": effect,
         "rune_speed": rune_speed,
@@ -1398,18 +2121,40 @@ def _simulate_attempt(
     rune_speed: int,
     debug: Optional[Dict[str, Any]],
     phase: str,
+    memo: Optional[SimulationMemo] = None,
 ) -> bool:
-    overrides = dict(base_overrides)
-    overrides[target_key] = {
-        "rune_speed": rune_speed,
-        "speedIncreasingEffect": effect,
-    }
-    matched, actual_order, turn_events = _matches_required_order(
-        detail_preset,
-        overrides,
-        required_order,
-        debug=debug,
-    )
+    speed_cache = None
+    if memo is not None:
+        speed_cache = _speed_cache_for(memo, detail_preset, required_order, base_overrides, target_key)
+    signature = None
+    if speed_cache is not None:
+        signature = _target_speed_signature(
+            detail_preset,
+            target_key,
+            effect,
+            rune_speed,
+            speed_cache["variants"],
+        )
+    outcome = _lookup_speed_cache(memo, speed_cache, signature)
+    if outcome is not None:
+        matched, actual_order, turn_events = outcome
+    else:
+        overrides = dict(base_overrides)
+        overrides[target_key] = {
+            "rune_speed": rune_speed,
+            "speedIncreasingEffect": effect,
+        }
+        with _stats_phase(phase):
+            matched, actual_order, turn_events = _matches_required_order(
+                detail_preset,
+                overrides,
+                required_order,
+                debug=debug,
+                memo=memo,
+            )
+        if signature is not None:
+            # Debug turn events belong to the attempt record, not the shared cache.
+            speed_cache["outcomes"][signature] = (matched, actual_order, [])
     _record_debug_attempt(
         debug,
         effect,
@@ -1423,6 +2168,118 @@ def _simulate_attempt(
     return matched
 
 
+def _init_speed_cache(detail_preset: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    variants = _speed_signature_variants(detail_preset)
+    if variants is None:
+        return None
+    return {"variants": variants, "outcomes": {}}
+
+
+def _speed_signature_variants(detail_preset: Dict[str, Any]) -> Optional[List[Tuple[bool, bool]]]:
+    # Returns the (has_slow, has_speed_buff) states the preset's skills can
+    # put a unit in, or None when flat speed buffs add state-dependent terms
+    # before the ceil and the combat speeds no longer describe the unit.
+    can_slow = False
+    can_buff = False
+    for unit in detail_preset.get("allies", []) + detail_preset.get("enemies", []):
+        for skill in unit.get("skills", []):
+            if skill.get("flatSpeedBuff"):
+                return None
+            can_slow = can_slow or bool(skill.get("slow"))
+            can_buff = can_buff or bool(skill.get("buffSpeed"))
+    return [
+        (has_slow, has_speed_buff)
+        for has_slow in ((False, True) if can_slow else (False,))
+        for has_speed_buff in ((False, True) if can_buff else (False,))
+    ]
+
+
+def _target_speed_signature(
+    detail_preset: Dict[str, Any],
+    target_key: str,
+    effect: int,
+    rune_speed: int,
+    variants: List[Tuple[bool, bool]],
+) -> Optional[Tuple[int, ...]]:
+    # The simulator only sees rune speed and effect through the ceiled combat
+    # speed, so two attempts with the same speed in every reachable buff/slow
+    # state play out identically and can share one simulation.
+    base_monster = next(
+        (
+            unit
+            for unit in detail_preset.get("allies", []) + detail_preset.get("enemies", [])
+            if unit.get("key") == target_key
+        ),
+        None,
+    )
+    if base_monster is None:
+        return None
+    monster = transform_monster(
+        detail_preset,
+        {**base_monster, "rune_speed": rune_speed, "speedIncreasingEffect": effect},
+    )
+    signature = []
+    for has_slow, has_speed_buff in variants:
+        monster["has_slow"] = has_slow
+        monster["has_speed_buff"] = has_speed_buff
+        signature.append(calculate_combat_speed(monster))
+    return tuple(signature)
+
+
+def _lookup_speed_cache(
+    memo: Optional[SimulationMemo],
+    speed_cache: Optional[Dict[str, Any]],
+    signature: Optional[Tuple[int, ...]],
+) -> Optional[Tuple[bool, List[str], List[Dict[str, Any]]]]:
+    if memo is None or speed_cache is None or signature is None:
+        return None
+    outcome = speed_cache["outcomes"].get(signature)
+    if outcome is None:
+        _count_memo(memo, "signature_misses")
+    else:
+        _count_memo(memo, "signature_hits")
+    return outcome
+
+
+def _speed_cache_for(
+    memo: SimulationMemo,
+    detail_preset: Dict[str, Any],
+    required_order: RequiredOrder,
+    base_overrides: Dict[str, Dict[str, int]],
+    target_key: str,
+) -> Optional[Dict[str, Any]]:
+    # Signature outcomes are only interchangeable for the same search: the
+    # same target, required order and fixed overrides for everyone else.
+    key = json.dumps(
+        [target_key, required_order.mode, required_order.order, _overrides_key(base_overrides)]
+    )
+    if key not in memo.speed_caches:
+        memo.speed_caches[key] = _init_speed_cache(detail_preset)
+    return memo.speed_caches[key]
+
+
+def _overrides_key(overrides: Dict[str, Dict[str, Any]]) -> str:
+    return json.dumps(overrides, sort_keys=True)
+
+
+def _simulate_turn_events(
+    detail_preset: Dict[str, Any],
+    overrides: Dict[str, Dict[str, Any]],
+    memo: Optional[SimulationMemo],
+) -> List[Dict[str, Any]]:
+    if memo is None:
+        return list(iter_turn_events(detail_preset, overrides))
+    key = _overrides_key(overrides)
+    turn_events = memo.turn_events.get(key)
+    if turn_events is None:
+        _count_memo(memo, "misses")
+        turn_events = list(iter_turn_events(detail_preset, overrides))
+        memo.turn_events[key] = turn_events
+    else:
+        _count_memo(memo, "hits")
+    return turn_events
+
+
 def _init_effect_log(
     debug: Optional[Dict[str, Any]],
     effect: int,
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import json
+import os
+from pathlib import Path
+import pickle
+import shutil
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import zlib
+
+import numpy as np
+
+from config.atb_simulator_presets import ATB_SIMULATOR_PRESETS
+from domain.speed_optimizer_cache import CACHE_PATH_ENV, code_version, preset_fingerprint
+from domain.speed_optimizer_detail import (
+    MAX_RUNE_SPEED,
+    MIN_RUNE_SPEED,
+    PRESET_AB_INPUT_OFFSET,
+    PresetDetailResult,
+    build_section1_detail_cached,
+)
+
+GRID_PATH_ENV = "SPEEDOPT_GRID_PATH"
+DEFAULT_GRID_PATH = Path.home() / ".cache" / "sw-analyzer" / "speed_optimizer_grid"
+# input_1/input_3 are rune speeds inside the search band; input_2 maps to an
+# enemy rune speed of input_2 + PRESET_AB_INPUT_OFFSET for Presets A/B.
+DEFAULT_INPUT_1_RANGE = (MIN_RUNE_SPEED, MAX_RUNE_SPEED)
+DEFAULT_INPUT_2_RANGE = (MIN_RUNE_SPEED - PRESET_AB_INPUT_OFFSET, MAX_RUNE_SPEED - PRESET_AB_INPUT_OFFSET)
+DEFAULT_INPUT_3_RANGE = (MIN_RUNE_SPEED, MAX_RUNE_SPEED)
+# Presets A/B only read input_2; the others read input_1 and input_3 (where a
+# missing input_3 falls back to input_1 but reports a different source).
+_INPUT_2_PRESETS = {"Preset A", "Preset B"}
+
+CanonicalInputs = Tuple[Optional[int], Optional[int], Optional[int]]
+
+
+def resolve_grid_path() -> Optional[Path]:
+    value = os.environ.get(GRID_PATH_ENV)
+    if value is None:
+        return DEFAULT_GRID_PATH
+    if not value.strip():
+        return None
+    return Path(value)
+
+
+def lookup_precomputed_result(
+    preset_id: str,
+    input_1: Optional[int],
+    input_2: Optional[int],
+    input_3: Optional[int],
+    path: Optional[Path] = None,
+) -> Optional[PresetDetailResult]:
+    path = path or resolve_grid_path()
+    if path is None:
+        return None
+    grid = _open_grid(path)
+    if grid is None:
+        return None
+    meta, starts, lengths, payload = grid
+    index = _cell_index(meta, preset_id, input_1, input_2, input_3)
+    if index is None or lengths[index] == 0:
+        return None
+    # Cells of a preset whose content changed since the build are stale; the
+    # other presets in the grid stay usable.
+    if meta.get("fingerprints", {}).get(preset_id) != preset_fingerprint(preset_id):
+        return None
+    start = int(starts[index])
+    return pickle.loads(zlib.decompress(payload[start:start + int(lengths[index])].tobytes()))
+
+
+def build_grid(
+    path: Path,
+    preset_ids: Optional[Sequence[str]] = None,
+    input_1_range: Tuple[int, int] = DEFAULT_INPUT_1_RANGE,
+    input_2_range: Tuple[int, int] = DEFAULT_INPUT_2_RANGE,
+    input_3_range: Tuple[int, int] = DEFAULT_INPUT_3_RANGE,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    preset_ids = list(preset_ids or ATB_SIMULATOR_PRESETS.keys())
+    meta: Dict[str, Any] = {
+        "fingerprints": {preset_id: preset_fingerprint(preset_id) for preset_id in preset_ids},
+        "code_version": code_version(),
+        "input_1": list(input_1_range),
+        "input_2": list(input_2_range),
+        "input_3": list(input_3_range),
+        "presets": {},
+    }
+    cells: List[Tuple[str, CanonicalInputs]] = []
+    for preset_id in preset_ids:
+        preset_cells = list(_iter_preset_cells(meta, preset_id))
+        meta["presets"][preset_id] = [len(cells), len(preset_cells)]
+        cells.extend((preset_id, inputs) for inputs in preset_cells)
+
+    staging = path.with_name(f"{path.name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    starts = np.zeros(len(cells), dtype=np.int64)
+    lengths = np.zeros(len(cells), dtype=np.int64)
+    offset = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_disable_result_cache) as executor, open(
+        staging / "payload.bin", "wb"
+    ) as payload_file:
+        blobs = executor.map(_build_cell_payload, cells, chunksize=16)
+        for index, blob in enumerate(blobs):
+            starts[index] = offset
+            lengths[index] = len(blob)
+            payload_file.write(blob)
+            offset += len(blob)
+    np.save(staging / "starts.npy", starts)
+    np.save(staging / "lengths.npy", lengths)
+    (staging / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    shutil.rmtree(path, ignore_errors=True)
+    staging.rename(path)
+    return meta
+
+
+def _iter_preset_cells(meta: Dict[str, Any], preset_id: str) -> Iterator[CanonicalInputs]:
+    if preset_id in _INPUT_2_PRESETS:
+        low, high = meta["input_2"]
+        for input_2 in range(low, high + 1):
+            yield None, input_2, None
+        return
+    low_1, high_1 = meta["input_1"]
+    low_3, high_3 = meta["input_3"]
+    for input_1 in range(low_1, high_1 + 1):
+        yield input_1, None, None
+        for input_3 in range(low_3, high_3 + 1):
+            yield input_1, None, input_3
+
+
+def _cell_index(
+    meta: Dict[str, Any],
+    preset_id: str,
+    input_1: Optional[int],
+    input_2: Optional[int],
+    input_3: Optional[int],
+) -> Optional[int]:
+    bounds = meta["presets"].get(preset_id)
+    if bounds is None:
+        return None
+    first, _ = bounds
+    if preset_id in _INPUT_2_PRESETS:
+        low, high = meta["input_2"]
+        if input_2 is None or not low <= input_2 <= high:
+            return None
+        return first + input_2 - low
+    low_1, high_1 = meta["input_1"]
+    low_3, high_3 = meta["input_3"]
+    if input_1 is None or not low_1 <= input_1 <= high_1:
+        return None
+    row = first + (input_1 - low_1) * (high_3 - low_3 + 2)
+    if input_3 is None:
+        return row
+    if not low_3 <= input_3 <= high_3:
+        return None
+    return row + 1 + input_3 - low_3
+
+
+@lru_cache(maxsize=4)
+def _open_grid_files(
+    path: Path,
+    meta_mtime_ns: int,
+) -> Tuple[Dict[str, Any], np.ndarray, np.ndarray, np.ndarray]:
+    meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    starts = np.load(path / "starts.npy", mmap_mode="r")
+    lengths = np.load(path / "lengths.npy", mmap_mode="r")
+    payload_path = path / "payload.bin"
+    if payload_path.stat().st_size:
+        payload = np.memmap(payload_path, dtype=np.uint8, mode="r")
+    else:
+        payload = np.zeros(0, dtype=np.uint8)
+    return meta, starts, lengths, payload
+
+
+def _open_grid(path: Path) -> Optional[Tuple[Dict[str, Any], np.ndarray, np.ndarray, np.ndarray]]:
+    try:
+        grid = _open_grid_files(path, (path / "meta.json").stat().st_mtime_ns)
+    except (OSError, ValueError):
+        return None
+    meta = grid[0]
+    # A grid built from other code answers a different question.
+    if meta.get("code_version") != code_version():
+        return None
+    return grid
+
+
+def _disable_result_cache() -> None:
+    os.environ[CACHE_PATH_ENV] = ""
+
+
+def _build_cell_payload(cell: Tuple[str, CanonicalInputs]) -> bytes:
+    preset_id, (input_1, input_2, input_3) = cell
+    try:
+        result = build_section1_detail_cached(preset_id, input_1, input_2, input_3, None, False)
+    except ValueError:
+        return b""
+    return zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute Speed Optimizer section 1 results.")
+    parser.add_argument("--out", type=Path, default=resolve_grid_path() or DEFAULT_GRID_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--preset", action="append", dest="presets")
+    args = parser.parse_args(argv)
+    meta = build_grid(args.out, preset_ids=args.presets, workers=args.workers)
+    total = sum(count for _, count in meta["presets"].values())
+    print(f"Wrote {total} cells to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
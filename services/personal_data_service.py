@@ -5,7 +5,7 @@ from typing import Dict, List, Tuple
 import pandas as pd
 import streamlit as st
 
-from services.supabase_client import get_supabase_client
+from data.log_mirror import fetch_log_rows
 from utils.deck_utils import make_deck_key, split_deck_key
 
 
@@ -47,39 +47,22 @@ def get_record_summary(wizard_name: str) -> pd.DataFrame:
         "five": {"win": 0, "lose": 0},
     }
 
-    client = get_supabase_client()
-    page_size = 1000
-    start = 0
-
-    while True:
-        res = (
-            client
-            .table("siege_logs")
-            .select("result, base")
-            .eq("wizard", wizard_name)
-            .in_("result", ["Win", "Lose"])
-            .range(start, start + page_size - 1)
-            .execute()
-        )
-        batch = res.data or []
-        if not batch:
-            break
-
-        for row in batch:
-            result = _clean_name(row.get("result"))
-            if result not in {"Win", "Lose"}:
-                continue
-            is_win = result == "Win"
+    for row in fetch_log_rows(
+        "siege_logs",
+        "result, base",
+        eq={"wizard": wizard_name},
+        in_={"result": ["Win", "Lose"]},
+    ):
+        result = _clean_name(row.get("result"))
+        if result not in {"Win", "Lose"}:
+            continue
+        is_win = result == "Win"
 
-            totals["all"]["win" if is_win else "lose"] += 1
+        totals["all"]["win" if is_win else "lose"] += 1
 
-            base_val = _parse_base(row.get("base"))
-            key = "four" if (base_val in FOUR_STAR_BASES) else "five"
-            totals[key]["win" if is_win else "lose"] += 1
-
-        if len(batch) < page_size:
-            break
-        start += page_size
+        base_val = _parse_base(row.get("base"))
+        key = "four" if (base_val in FOUR_STAR_BASES) else "five"
+        totals[key]["win" if is_win else "lose"] += 1
 
     rows = []
     for label, key in [("All", "all"), ("4★", "four"), ("5★", "five")]:
@@ -105,41 +88,24 @@ def get_top_offense_decks(wizard_name: str, limit: int) -> pd.DataFrame:
     if not wizard_name:
         return pd.DataFrame()
 
-    client = get_supabase_client()
-    page_size = 1000
-    start = 0
-
     deck_counts: Dict[str, Tuple[int, int]] = {}
 
-    while True:
-        res = (
-            client
-            .table("siege_logs")
-            .select("result, deck1_1, deck1_2, deck1_3")
-            .eq("wizard", wizard_name)
-            .in_("result", ["Win", "Lose"])
-            .range(start, start + page_size - 1)
-            .execute()
-        )
-        batch = res.data or []
-        if not batch:
-            break
-
-        for row in batch:
-            key = _make_deck_key(row.get("deck1_1"), row.get("deck1_2"), row.get("deck1_3"))
-            if not key:
-                continue
-            is_win = _clean_name(row.get("result")) == "Win"
-            win, lose = deck_counts.get(key, (0, 0))
-            if is_win:
-                win += 1
-            else:
-                lose += 1
-            deck_counts[key] = (win, lose)
-
-        if len(batch) < page_size:
-            break
-        start += page_size
+    for row in fetch_log_rows(
+        "siege_logs",
+        "result, deck1_1, deck1_2, deck1_3",
+        eq={"wizard": wizard_name},
+        in_={"result": ["Win", "Lose"]},
+    ):
+        key = _make_deck_key(row.get("deck1_1"), row.get("deck1_2"), row.get("deck1_3"))
+        if not key:
+            continue
+        is_win = _clean_name(row.get("result")) == "Win"
+        win, lose = deck_counts.get(key, (0, 0))
+        if is_win:
+            win += 1
+        else:
+            lose += 1
+        deck_counts[key] = (win, lose)
 
     rows: List[Dict[str, object]] = []
     for key, (win, lose) in deck_counts.items():
@@ -177,41 +143,24 @@ def get_top_defense_decks(wizard_name: str, limit: int) -> pd.DataFrame:
     if not wizard_name:
         return pd.DataFrame()
 
-    client = get_supabase_client()
-    page_size = 1000
-    start = 0
-
     deck_counts: Dict[str, Tuple[int, int]] = {}
 
-    while True:
-        res = (
-            client
-            .table("defense_logs")
-            .select("result, deck1_1, deck1_2, deck1_3, wizard")
-            .eq("wizard", wizard_name)
-            .in_("result", ["Win", "Lose"])
-            .range(start, start + page_size - 1)
-            .execute()
-        )
-        batch = res.data or []
-        if not batch:
-            break
-
-        for row in batch:
-            key = _make_deck_key(row.get("deck1_1"), row.get("deck1_2"), row.get("deck1_3"))
-            if not key:
-                continue
-            is_win = _clean_name(row.get("result")) == "Win"
-            win, lose = deck_counts.get(key, (0, 0))
-            if is_win:
-                win += 1
-            else:
-                lose += 1
-            deck_counts[key] = (win, lose)
-
-        if len(batch) < page_size:
-            break
-        start += page_size
+    for row in fetch_log_rows(
+        "defense_logs",
+        "result, deck1_1, deck1_2, deck1_3, wizard",
+        eq={"wizard": wizard_name},
+        in_={"result": ["Win", "Lose"]},
+    ):
+        key = _make_deck_key(row.get("deck1_1"), row.get("deck1_2"), row.get("deck1_3"))
+        if not key:
+            continue
+        is_win = _clean_name(row.get("result")) == "Win"
+        win, lose = deck_counts.get(key, (0, 0))
+        if is_win:
+            win += 1
+        else:
+            lose += 1
+        deck_counts[key] = (win, lose)
 
     rows: List[Dict[str, object]] = []
     for key, (win, lose) in deck_counts.items():
@@ -253,39 +202,19 @@ def get_offense_deck_details(wizard_name: str, offense_key: str, limit: int) ->
     key_parts = offense_key.split("|")
     leader = key_parts[0] if key_parts else ""
 
-    client = get_supabase_client()
-    page_size = 1000
-    start = 0
-
     rows: List[Dict[str, object]] = []
 
-    while True:
-        res = (
-            client
-            .table("siege_logs")
-            .select(
-                "ts, result, wizard, opp_wizard, opp_guild, "
-                "deck1_1, deck1_2, deck1_3, deck2_1, deck2_2, deck2_3"
-            )
-            .eq("wizard", wizard_name)
-            .eq("deck1_1", leader)
-            .in_("result", ["Win", "Lose"])
-            .range(start, start + page_size - 1)
-            .execute()
-        )
-        batch = res.data or []
-        if not batch:
-            break
-
-        for row in batch:
-            key = _make_deck_key(row.get("deck1_1"), row.get("deck1_2"), row.get("deck1_3"))
-            if key != offense_key:
-                continue
-            rows.append(row)
-
-        if len(batch) < page_size:
-            break
-        start += page_size
+    for row in fetch_log_rows(
+        "siege_logs",
+        "ts, result, wizard, opp_wizard, opp_guild, "
+        "deck1_1, deck1_2, deck1_3, deck2_1, deck2_2, deck2_3",
+        eq={"wizard": wizard_name, "deck1_1": leader},
+        in_={"result": ["Win", "Lose"]},
+    ):
+        key = _make_deck_key(row.get("deck1_1"), row.get("deck1_2"), row.get("deck1_3"))
+        if key != offense_key:
+            continue
+        rows.append(row)
 
     if not rows:
         return pd.DataFrame()
@@ -328,29 +257,8 @@ def get_attack_log_hour_distribution(wizard_name: str, timezone: str = "Asia/Seo
     if not wizard_name:
         return _empty_hour_distribution()
 
-    client = get_supabase_client()
-    page_size = 1000
-    start = 0
-    ts_values: List[str] = []
-
-    while True:
-        res = (
-            client
-            .table("siege_logs")
-            .select("ts")
-            .eq("wizard", wizard_name)
-            .range(start, start + page_size - 1)
-            .execute()
-        )
-        batch = res.data or []
-        if not batch:
-            break
-
-        ts_values.extend([row.get("ts") for row in batch if row.get("ts")])
-
-        if len(batch) < page_size:
-            break
-        start += page_size
+    rows = fetch_log_rows("siege_logs", "ts", eq={"wizard": wizard_name})
+    ts_values: List[str] = [row.get("ts") for row in rows if row.get("ts")]
 
     if not ts_values:
         return _empty_hour_distribution()
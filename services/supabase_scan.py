@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import math
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+SCAN_PAGE_SIZE = 1000
+SCAN_WORKERS_ENV = "SUPABASE_SCAN_WORKERS"
+DEFAULT_SCAN_WORKERS = 4
+
+# table -> unique, monotonically increasing key used for keyset paging. Only
+# list columns the app is known to read; other tables fall back to .range().
+SCAN_KEYS: Dict[str, str] = {
+    "siege_logs": "log_id",
+}
+
+
+def scan_table(
+    client: Any,
+    table: str,
+    columns: Sequence[str],
+    key: Optional[str] = None,
+    eq: Optional[Dict[str, Any]] = None,
+    in_: Optional[Dict[str, Sequence[Any]]] = None,
+    gte: Optional[Dict[str, Any]] = None,
+    page_size: int = SCAN_PAGE_SIZE,
+    lte: Optional[Dict[str, Any]] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    key 기준 keyset 페이지네이션(key > 마지막 값)으로 table을 배치 단위로 yield.
+    offset이 없어서 테이블이 커져도 페이지 비용이 같고, 스캔 중 insert가 있어도 row가 밀리지 않는다.
+    key는 유니크/단조 증가 컬럼이어야 하며, columns에 없으면 같이 select된다.
+    key를 안 주면 SCAN_KEYS에서 찾고, 없는 테이블은 .range() offset 페이지로 읽는다.
+    """
+    key = key or SCAN_KEYS.get(table)
+    if key is None:
+        yield from _scan_by_range(client, table, columns, eq, in_, gte, lte, page_size)
+        return
+    selected = list(columns)
+    if key not in selected:
+        selected.append(key)
+    last_key = None
+    while True:
+        query = client.table(table).select(", ".join(selected))
+        for column, value in (eq or {}).items():
+            query = query.eq(column, value)
+        for column, values in (in_ or {}).items():
+            query = query.in_(column, list(values))
+        for column, value in (gte or {}).items():
+            query = query.gte(column, value)
+        for column, value in (lte or {}).items():
+            query = query.lte(column, value)
+        if last_key is not None:
+            query = query.gt(key, last_key)
+        res = query.order(key).limit(page_size).execute()
+        batch = res.data or []
+        if batch:
+            yield batch
+        if len(batch) < page_size:
+            return
+        last_key = batch[-1][key]
+
+
+def _scan_by_range(
+    client: Any,
+    table: str,
+    columns: Sequence[str],
+    eq: Optional[Dict[str, Any]],
+    in_: Optional[Dict[str, Sequence[Any]]],
+    gte: Optional[Dict[str, Any]],
+    lte: Optional[Dict[str, Any]],
+    page_size: int,
+) -> Iterator[List[Dict[str, Any]]]:
+    start = 0
+    while True:
+        query = client.table(table).select(", ".join(columns))
+        for column, value in (eq or {}).items():
+            query = query.eq(column, value)
+        for column, values in (in_ or {}).items():
+            query = query.in_(column, list(values))
+        for column, value in (gte or {}).items():
+            query = query.gte(column, value)
+        for column, value in (lte or {}).items():
+            query = query.lte(column, value)
+        batch = query.range(start, start + page_size - 1).execute().data or []
+        if batch:
+            yield batch
+        if len(batch) < page_size:
+            return
+        start += page_size
+
+
+def resolve_scan_workers() -> int:
+    value = os.environ.get(SCAN_WORKERS_ENV, "").strip()
+    try:
+        return max(1, int(value)) if value else DEFAULT_SCAN_WORKERS
+    except ValueError:
+        return DEFAULT_SCAN_WORKERS
+
+
+def scan_table_concurrent(
+    client: Any,
+    table: str,
+    columns: Sequence[str],
+    key: Optional[str] = None,
+    eq: Optional[Dict[str, Any]] = None,
+    in_: Optional[Dict[str, Sequence[Any]]] = None,
+    gte: Optional[Dict[str, Any]] = None,
+    page_size: int = SCAN_PAGE_SIZE,
+    max_workers: Optional[int] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    scan_table과 같은 배치를 같은 key 순서로 yield하되, key 범위를 나눠 여러 구간을 동시에 받아온다.
+    key를 모르는 테이블, 정수 key가 아니거나 worker가 1이면 scan_table로 순차 스캔.
+    """
+    key = key or SCAN_KEYS.get(table)
+    max_workers = max_workers or resolve_scan_workers()
+    filters = {"eq": eq, "in_": in_, "gte": gte}
+    bounds = _key_bounds(client, table, key, **filters) if key and max_workers > 1 else None
+    if bounds is None:
+        yield from scan_table(client, table, columns, key=key, page_size=page_size, **filters)
+        return
+    partitions = _partition_key_range(*bounds, page_size=page_size, max_workers=max_workers)
+    if len(partitions) == 1:
+        yield from scan_table(client, table, columns, key=key, page_size=page_size, **filters)
+        return
+
+    def scan_partition(low: int, high: int) -> List[List[Dict[str, Any]]]:
+        partition_gte = dict(gte or {})
+        partition_gte[key] = max(low, partition_gte[key]) if key in partition_gte else low
+        return list(
+            scan_table(
+                client,
+                table,
+                columns,
+                key=key,
+                eq=eq,
+                in_=in_,
+                gte=partition_gte,
+                lte={key: high},
+                page_size=page_size,
+            )
+        )
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(partitions))) as pool:
+        futures = [pool.submit(scan_partition, low, high) for low, high in partitions]
+        # Partitions are disjoint key ranges, so yielding them in submission
+        # order keeps the merged stream in key order.
+        for future in futures:
+            yield from future.result()
+
+
+def _key_bounds(
+    client: Any,
+    table: str,
+    key: str,
+    eq: Optional[Dict[str, Any]],
+    in_: Optional[Dict[str, Sequence[Any]]],
+    gte: Optional[Dict[str, Any]],
+) -> Optional[Tuple[int, int]]:
+    bounds = []
+    for desc in (False, True):
+        query = client.table(table).select(key)
+        for column, value in (eq or {}).items():
+            query = query.eq(column, value)
+        for column, values in (in_ or {}).items():
+            query = query.in_(column, list(values))
+        for column, value in (gte or {}).items():
+            query = query.gte(column, value)
+        rows = query.order(key, desc=desc).limit(1).execute().data or []
+        if not rows or not isinstance(rows[0].get(key), int):
+            return None
+        bounds.append(rows[0][key])
+    return bounds[0], bounds[1]
+
+
+def _partition_key_range(low: int, high: int, page_size: int, max_workers: int) -> List[Tuple[int, int]]:
+    # Dense keys put about one page in each partition; a few partitions per
+    # worker keeps a sparse or skewed range from leaving one worker with most
+    # of the rows.
+    span = high - low + 1
+    count = max(1, min(math.ceil(span / page_size), max_workers * 4))
+    step = math.ceil(span / count)
+    return [(start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
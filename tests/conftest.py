@@ -1,6 +1,80 @@
+import os
 from pathlib import Path
 import sys
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+# Keep test runs from reading or writing the shared speed-optimizer caches.
+os.environ.setdefault("SPEEDOPT_CACHE_PATH", "")
+os.environ.setdefault("SPEEDOPT_GRID_PATH", "")
+os.environ.setdefault("SIEGE_MIRROR_PATH", "")
+
+
+class FakeQuery:
+    """In-memory stand-in for the postgrest query builder used by the data layer."""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.columns = None
+        self.filters = []
+        self.orders = []
+        self.bounds = None
+
+    def select(self, columns):
+        self.columns = [column.strip() for column in columns.split(",") if column.strip()]
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = list(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) <= value)
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end + 1)
+        return self
+
+    def limit(self, count):
+        self.bounds = (0, count)
+        return self
+
+    def execute(self):
+        self.client.requests.append(self)
+        rows = [row for row in self.client.tables.get(self.table, []) if all(f(row) for f in self.filters)]
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if self.bounds is not None:
+            rows = rows[self.bounds[0]:self.bounds[1]]
+        data = [{column: row.get(column) for column in self.columns} for row in rows]
+        return type("Response", (), {"data": data})()
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+        self.requests = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
@@ -0,0 +1,43 @@
+import copy
+import pickle
+
+import pytest
+
+from config.atb_simulator_presets import build_full_preset
+from domain.atb_preset_compiler import compile_preset, preset_content_hash
+from domain.atb_simulator import simulate_with_turn_log
+from domain.atb_simulator_utils import prefix_monsters
+
+
+def test_compiled_preset_is_prefixed_cached_and_fingerprinted():
+    compiled = compile_preset("Preset C")
+    assert compile_preset("Preset C") is compiled
+    assert all(ally["key"].startswith("A|") for ally in compiled.preset["allies"])
+    assert all(enemy["key"].startswith("E|") for enemy in compiled.preset["enemies"])
+    assert compiled.fingerprint == preset_content_hash(compiled.preset)
+    assert compiled.fingerprint != compile_preset("Preset D").fingerprint
+
+
+def test_compiled_preset_is_read_only_and_shared_by_copies():
+    compiled = compile_preset("Preset A")
+    with pytest.raises(TypeError):
+        compiled.preset["tickCount"] = 1
+    skills = next(ally["skills"] for ally in compiled.preset["allies"] if ally["skills"])
+    with pytest.raises(TypeError):
+        skills[0].update({"target": "enemies"})
+    assert copy.deepcopy(compiled.preset) is compiled.preset
+    assert pickle.loads(pickle.dumps(compiled.preset)) == compiled.preset
+
+
+def test_compiled_preset_simulates_like_rebuilt_preset():
+    preset = build_full_preset("Preset F")
+    allies, _ = prefix_monsters(preset["allies"], prefix="A")
+    enemies, _ = prefix_monsters(preset["enemies"], prefix="E")
+    rebuilt = dict(preset, allies=allies, enemies=enemies)
+    compiled = compile_preset("Preset F")
+    overrides = {allies[2]["key"]: {"rune_speed": 190, "speedIncreasingEffect": 25}}
+
+    _, compiled_events = simulate_with_turn_log(compiled.preset, overrides)
+    _, rebuilt_events = simulate_with_turn_log(rebuilt, overrides)
+    assert compiled_events == rebuilt_events
+    assert compiled.fingerprint == preset_content_hash(rebuilt)
@@ -1,13 +1,27 @@
 import math
 
-from config.atb_simulator_presets import ATB_MONSTER_LIBRARY
+import pytest
+
+import domain.atb_simulator as atb_simulator
+from config.atb_simulator_presets import ATB_MONSTER_LIBRARY, build_full_preset
 from domain.atb_simulator import (
     apply_skill_effects,
+    batch_speed_inputs,
+    batch_turn_order_keys,
+    active_simulation_stats,
     calculate_combat_speed,
+    collect_simulation_stats,
+    compile_skill_tables,
     get_skill_targets,
+    iter_ticks,
+    iter_turn_events,
+    simulate,
     simulate_atb_table,
+    simulate_batch,
+    simulate_batch_arrays,
     simulate_with_turn_log,
 )
+from domain.atb_simulator_utils import prefix_monsters
 
 
 def test_swift_bonus_disabled():
@@ -165,3 +179,186 @@ def test_dark_harg_skill_applies_atb_and_speed_buff():
     assert monsters[2]["attack_bar"] == 5
     assert all(monster["has_speed_buff"] for monster in monsters)
     assert all(monster["speedBuffDuration"] == 2 for monster in monsters)
+
+
+def _prefixed_full_preset(preset_id):
+    preset = build_full_preset(preset_id)
+    allies, _ = prefix_monsters(preset["allies"], prefix="A")
+    enemies, _ = prefix_monsters(preset["enemies"], prefix="E")
+    return {**preset, "allies": allies, "enemies": enemies}
+
+
+def test_simulate_batch_matches_turn_log_per_row():
+    preset = _prefixed_full_preset("Preset E")
+    a3_key = preset["allies"][2]["key"]
+    e1_key = preset["enemies"][0]["key"]
+    overrides_batch = [
+        {
+            a3_key: {"rune_speed": rune_speed, "speedIncreasingEffect": effect},
+            e1_key: {"rune_speed": 240 - rune_speed // 2},
+        }
+        for rune_speed in range(150, 251, 25)
+        for effect in (0, 30, 60)
+    ]
+
+    result = simulate_batch(preset, overrides_batch)
+    orders = batch_turn_order_keys(result)
+
+    assert len(orders) == len(overrides_batch)
+    for overrides, order in zip(overrides_batch, orders):
+        _, turn_events = simulate_with_turn_log(preset, overrides)
+        assert order == [event["key"] for event in turn_events]
+
+
+def test_simulate_batch_max_turns_truncates_order():
+    preset = _prefixed_full_preset("Preset C")
+    a3_key = preset["allies"][2]["key"]
+    overrides_batch = [{a3_key: {"rune_speed": speed}} for speed in (150, 200, 250)]
+
+    result = simulate_batch(preset, overrides_batch, max_turns=4)
+
+    assert result["turn_order"].shape == (3, 4)
+    assert list(result["turn_counts"]) == [4, 4, 4]
+    for overrides, order in zip(overrides_batch, batch_turn_order_keys(result)):
+        _, turn_events = simulate_with_turn_log(preset, overrides)
+        assert order == [event["key"] for event in turn_events[:4]]
+
+
+def test_simulate_batch_rejects_flat_speed_buffs():
+    preset = {
+        "allies": [
+            {
+                "key": "ally_1",
+                "isAlly": True,
+                "base_speed": 100,
+                "skills": [{"applyOnTurn": 1, "target": "self", "flatSpeedBuff": True}],
+            }
+        ],
+        "enemies": [],
+        "allyEffects": {},
+        "enemyEffects": {},
+        "tickCount": 5,
+    }
+    with pytest.raises(ValueError):
+        simulate_batch(preset, [{}])
+
+
+@pytest.mark.parametrize("preset_id", ["Preset A", "Preset C", "Preset F"])
+def test_skill_tables_match_per_turn_skill_scan(preset_id, monkeypatch):
+    preset = _prefixed_full_preset(preset_id)
+    a3_key = preset["allies"][2]["key"]
+    overrides = {a3_key: {"rune_speed": 210, "speedIncreasingEffect": 20}}
+    atb_keys = [monster["key"] for monster in preset["allies"] + preset["enemies"]]
+
+    def run():
+        atb_log = []
+        ticks, turn_events = simulate_with_turn_log(
+            preset, overrides, debug_atb_log=atb_log, debug_atb_keys=atb_keys
+        )
+        table = simulate_atb_table(preset, overrides, atb_keys=atb_keys)
+        return ticks, turn_events, atb_log, table
+
+    compiled = run()
+    monkeypatch.setattr(atb_simulator, "compile_skill_tables", lambda simulator, monsters: None)
+    assert compiled == run()
+
+
+def test_compile_skill_tables_groups_skills_by_turn():
+    buff = {"applyOnTurn": -1, "target": "self"}
+    opener = {"applyOnTurn": 0, "target": "allies"}
+    second = {"applyOnTurn": 2, "target": "e1"}
+    simulator = {
+        "allies": [{"key": "a1", "skills": [second, opener, buff]}],
+        "enemies": [{"key": "e1", "skills": []}],
+    }
+    monsters = [{"key": "e1", "isAlly": False}, {"key": "a1", "isAlly": True}]
+
+    tables = compile_skill_tables(simulator, monsters)
+
+    assert tables["opening"] == [[], [opener]]
+    assert tables["by_turn"] == [{}, {2: [second, buff]}]
+    assert tables["every_turn"] == [[], [buff]]
+    assert tables["key_index"] == {"e1": 0, "a1": 1}
+    assert tables["ally_indexes"] == [1]
+    assert tables["enemy_indexes"] == [0]
+
+
+def test_iter_turn_events_matches_turn_log_and_stops_early():
+    preset = _prefixed_full_preset("Preset F")
+    overrides = {preset["allies"][2]["key"]: {"rune_speed": 190, "speedIncreasingEffect": 25}}
+    _, turn_events = simulate_with_turn_log(preset, overrides)
+
+    assert list(iter_turn_events(preset, overrides)) == turn_events
+
+    ticks = iter_ticks(preset, overrides)
+    first_turn = next(tick for tick in ticks if tick["turn_event"] is not None)
+    assert first_turn["turn_event"] == turn_events[0]
+    assert first_turn["tick"] == turn_events[0]["tick"]
+    assert next(ticks)["tick"] == first_turn["tick"] + 1
+
+
+def test_iter_ticks_copies_monsters_only_on_request():
+    preset = _prefixed_full_preset("Preset C")
+    live = [tick["monsters"] for tick in iter_ticks(preset, tick_limit=3)]
+    copied = [tick["monsters"] for tick in iter_ticks(preset, tick_limit=3, copy_monsters=True)]
+
+    assert live[0] is live[2]
+    assert copied[0] is not copied[2]
+    assert copied[2] == live[2]
+
+
+def test_simulate_batch_arrays_stops_once_watched_keys_moved():
+    preset = _prefixed_full_preset("Preset C")
+    keys, rune_speed, effect = batch_speed_inputs(preset, 3)
+    a3_column = keys.index(preset["allies"][2]["key"])
+    rune_speed[:, a3_column] = [150, 200, 250]
+    watched = [preset["allies"][2]["key"], preset["enemies"][0]["key"]]
+
+    full = simulate_batch_arrays(preset, rune_speed, effect)
+    short = simulate_batch_arrays(preset, rune_speed, effect, until_keys=watched)
+
+    assert short["turn_counts"].max() < full["turn_counts"].max()
+    for full_order, short_order in zip(batch_turn_order_keys(full), batch_turn_order_keys(short)):
+        assert set(watched) <= set(short_order)
+        assert full_order[: len(short_order)] == short_order
+
+    with pytest.raises(ValueError, match="until_keys"):
+        simulate_batch_arrays(preset, rune_speed, effect, until_keys=["missing"])
+
+
+def test_simulation_stats_count_ticks_turns_and_batch_rows():
+    preset = _prefixed_full_preset("Preset C")
+    assert active_simulation_stats() is None
+    with collect_simulation_stats() as stats:
+        _, turn_events = simulate_with_turn_log(preset)
+        early = list(iter_ticks(preset, tick_limit=12))
+        keys, rune_speed, effect = batch_speed_inputs(preset, 4)
+        batch = simulate_batch_arrays(preset, rune_speed, effect, tick_count=20)
+    assert active_simulation_stats() is None
+
+    assert stats.simulations == 1 + 1 + 4
+    assert stats.batch_runs == 1
+    assert stats.ticks == preset["tickCount"] + 12 + 20 * 4
+    assert stats.turns == (
+        len(turn_events)
+        + sum(tick["turn_event"] is not None for tick in early)
+        + int(batch["turn_counts"].sum())
+    )
+
+    simulate_with_turn_log(preset)
+    assert stats.simulations == 6
+
+
+def test_simulation_stats_count_simulate_turns_and_stay_per_thread():
+    import threading
+
+    preset = _prefixed_full_preset("Preset C")
+    _, turn_events = simulate_with_turn_log(preset)
+    with collect_simulation_stats() as stats:
+        simulate(preset)
+        # Another session's thread must not count into this collector.
+        other = threading.Thread(target=simulate_with_turn_log, args=(preset,))
+        other.start()
+        other.join()
+    assert stats.simulations == 1
+    assert stats.turns == len(turn_events)
@@ -1,4 +1,15 @@
-from utils.deck_utils import format_deck_label, make_deck_key, split_deck_key
+import itertools
+
+import pandas as pd
+
+from utils.deck_utils import (
+    deck_keys_from_codes,
+    format_deck_label,
+    make_deck_codes,
+    make_deck_key,
+    make_deck_keys,
+    split_deck_key,
+)
 
 
 def test_make_deck_key_with_single_monster():
@@ -14,6 +25,35 @@ def test_make_deck_key_with_three_monsters_sorted():
     assert make_deck_key("Veromos", "Zaiross", "Lushen") == "Veromos|Lushen|Zaiross"
 
 
+def test_make_deck_keys_matches_make_deck_key():
+    names = ["", " ", "Veromos", " Lushen", "Zaiross ", "베라모스", None]
+    combos = list(itertools.product(names, repeat=3))
+    leaders, seconds, thirds = (list(column) for column in zip(*combos))
+    index = pd.RangeIndex(10, 10 + len(combos))
+
+    keys = make_deck_keys(pd.Series(leaders, index=index), seconds, thirds)
+    assert keys.index.equals(index)
+    assert keys.tolist() == [make_deck_key(*combo) for combo in combos]
+
+
+def test_make_deck_keys_treats_string_dtype_nulls_as_empty():
+    df = pd.DataFrame({"a": ["Veromos", "Veromos"], "b": [None, "Lushen"], "c": ["Zaiross", None]})
+    assert make_deck_keys(df["a"], df["b"], df["c"]).tolist() == ["Veromos|Zaiross|", "Veromos|Lushen|"]
+
+
+def test_deck_codes_group_like_deck_keys_and_decode_back():
+    names = ["", "Veromos", " Lushen", "Zaiross", "베라모스", None]
+    combos = list(itertools.product(names, repeat=3))
+    leaders, seconds, thirds = (list(column) for column in zip(*combos))
+
+    codes = make_deck_codes(leaders, seconds, thirds)
+    keys = [make_deck_key(*combo) for combo in combos]
+    assert len(set(codes)) == len(set(keys))
+    assert len(set(zip(codes, keys))) == len(set(codes))
+    assert deck_keys_from_codes(codes).tolist() == keys
+    assert all((code == 0) == (key == "") for code, key in zip(codes, keys))
+
+
 def test_split_deck_key_padding():
     assert split_deck_key("Veromos|Lushen|") == ["Veromos", "Lushen", ""]
     assert split_deck_key("Veromos||") == ["Veromos", "", ""]
@@ -0,0 +1,47 @@
+from conftest import FakeSupabase
+from data import defense_data, log_mirror
+
+
+def _defense_row(log_id, result, opp_guild, d1="A", d2="B", d3="C"):
+    return {
+        "log_id": log_id,
+        "result": result,
+        "opp_guild": opp_guild,
+        "deck1_1": d1,
+        "deck1_2": d2,
+        "deck1_3": d3,
+    }
+
+
+def test_best_defense_views_share_one_count_cube_scan(monkeypatch):
+    rows = [
+        _defense_row(1, "Draw", "Barcode", "A", "C", "B"),
+        _defense_row(2, "Win", "동아리", "A", "C", "B"),
+        _defense_row(3, "Lose", "Barcode", "A", "B", "C"),
+        _defense_row(4, "Win", " Barcode", "X", "Y", "Z"),
+        _defense_row(5, "Win", "Barcode", "X", "Y", ""),
+        _defense_row(6, "Win", "무덤", "A", "B", "C"),
+    ]
+    client = FakeSupabase({"defense_logs": rows})
+    monkeypatch.setattr(log_mirror, "get_supabase_client", lambda: client)
+    defense_data.get_defense_count_cube.clear()
+
+    stats = defense_data.get_defense_deck_stats.__wrapped__(limit=0)
+    vs_guild = defense_data.get_defense_decks_vs_guild.__wrapped__("Barcode")
+    guilds = defense_data.get_opp_guild_options.__wrapped__()
+    scans = len(client.requests)
+    defense_data.get_defense_decks_vs_guild.__wrapped__("무덤")
+    assert len(client.requests) == scans
+
+    assert guilds == ["Barcode", "동아리", "무덤"]
+    # Display order comes from the first Win/Lose row of each deck.
+    assert stats[["d1", "d2", "d3", "win", "lose"]].values.tolist() == [
+        ["X", "Y", "Z", 1, 0],
+        ["A", "C", "B", 2, 1],
+    ]
+    assert stats["in4_win"].tolist() == [1, 0]
+    assert stats["in4_lose"].tolist() == [0, 1]
+    assert stats["in12_win_rate"].tolist() == ["", "100.0%"]
+    assert stats["in32_win"].tolist() == ["", 1]
+    # The per-guild view matches the raw opp_guild value, like the old eq filter.
+    assert vs_guild[["d1", "d2", "d3", "win", "lose"]].values.tolist() == [["A", "B", "C", 0, 1]]
@@ -0,0 +1,75 @@
+from conftest import FakeSupabase
+from data import log_mirror
+from data.defense_matchups import fetch_matchups, refresh_defense_matchups
+
+
+def _siege_row(log_id, updated_at, result, offense=("A", "B", "C"), defense=("D", "E", "F")):
+    return {
+        "log_id": log_id,
+        "match_id": "2024-01-1-1",
+        "ts": updated_at,
+        "updated_at": updated_at,
+        "wizard": "kim",
+        "opp_wizard": "lee",
+        "opp_guild": "오후",
+        "result": result,
+        "base": 3,
+        "deck1_1": offense[0],
+        "deck1_2": offense[1],
+        "deck1_3": offense[2],
+        "deck2_1": defense[0],
+        "deck2_2": defense[1],
+        "deck2_3": defense[2],
+    }
+
+
+def test_matchups_apply_new_and_updated_siege_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_mirror, "MIRROR_SYNC_INTERVAL_S", 0.0)
+    path = tmp_path / "mirror.sqlite3"
+    rows = [
+        _siege_row(1, "2024-01-01T00:00:00", "Win"),
+        _siege_row(2, "2024-01-01T01:00:00", "Lose", offense=("A", "C", "B"), defense=("D", "F", "E")),
+        _siege_row(3, "2024-01-01T02:00:00", "Win", offense=("X", "Y", "Z")),
+        _siege_row(4, "2024-01-01T03:00:00", "Draw"),
+    ]
+    client = FakeSupabase({"siege_logs": rows})
+
+    assert refresh_defense_matchups(path=path, client=client) == 4
+    assert fetch_matchups("D|E|F", client=client, path=path) == [
+        {"o1": "A", "o2": "B", "o3": "C", "win": 1, "lose": 1, "total": 2, "win_rate": 50.0},
+        {"o1": "X", "o2": "Y", "o3": "Z", "win": 1, "lose": 0, "total": 1, "win_rate": 100.0},
+    ]
+
+    # Row 1 flips to a loss and row 3 moves to another defense; neither is
+    # counted twice.
+    rows[0] = _siege_row(1, "2024-01-02T00:00:00", "Lose")
+    rows[2] = _siege_row(3, "2024-01-02T00:00:00", "Win", offense=("X", "Y", "Z"), defense=("G", "H", "I"))
+    rows.append(_siege_row(5, "2024-01-02T00:00:00", "Win", offense=("A", "B", "")))
+    assert refresh_defense_matchups(path=path, client=client) == 3
+    assert refresh_defense_matchups(path=path, client=client, sync=False) == 0
+
+    assert fetch_matchups("D|E|F", limit=5, client=client, path=path) == [
+        {"o1": "A", "o2": "B", "o3": "C", "win": 0, "lose": 2, "total": 2, "win_rate": 0.0},
+        {"o1": "A", "o2": "B", "o3": "", "win": 1, "lose": 0, "total": 1, "win_rate": 100.0},
+    ]
+    assert [row["o1"] for row in fetch_matchups("G|H|I", client=client, path=path)] == ["X"]
+
+
+def test_full_refresh_resyncs_mirror_and_drops_deleted_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_mirror, "MIRROR_SYNC_INTERVAL_S", 0.0)
+    path = tmp_path / "mirror.sqlite3"
+    rows = [
+        _siege_row(1, "2024-01-01T00:00:00", "Win"),
+        _siege_row(2, "2024-01-01T01:00:00", "Lose"),
+    ]
+    client = FakeSupabase({"siege_logs": rows})
+    assert refresh_defense_matchups(path=path, client=client) == 2
+
+    del rows[1]
+    assert refresh_defense_matchups(path=path, client=client) == 0
+    assert fetch_matchups("D|E|F", client=client, path=path)[0]["total"] == 2
+
+    assert refresh_defense_matchups(path=path, client=client, full=True) == 1
+    assert fetch_matchups("D|E|F", client=client, path=path) == [
+        {"o1": "A", "o2": "B", "o3": "C", "win": 1, "lose": 0, "total": 1, "win_rate": 100.0},
+    ]
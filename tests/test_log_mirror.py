@@ -0,0 +1,86 @@
+from conftest import FakeSupabase
+from data import log_mirror
+from data.log_mirror import fetch_log_rows, sync_mirror
+
+
+def _siege_row(log_id, updated_at, wizard="kim", result="Win"):
+    return {
+        "log_id": log_id,
+        "match_id": "2024-01-1-1",
+        "ts": updated_at,
+        "updated_at": updated_at,
+        "wizard": wizard,
+        "opp_wizard": "lee",
+        "opp_guild": "오후",
+        "result": result,
+        "base": 3,
+        "deck1_1": "A",
+        "deck1_2": "B",
+        "deck1_3": "C",
+        "deck2_1": "D",
+        "deck2_2": "E",
+        "deck2_3": "F",
+    }
+
+
+def test_mirror_syncs_only_rows_changed_since_watermark(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_mirror, "PAGE_SIZE", 2)
+    path = tmp_path / "mirror.sqlite3"
+    rows = [_siege_row(i, f"2024-01-0{i}") for i in range(1, 6)]
+    client = FakeSupabase({"siege_logs": rows})
+
+    assert sync_mirror("siege_logs", path=path, client=client, force=True) == 5
+    rows[1] = _siege_row(2, "2024-01-09", result="Lose")
+    rows.append(_siege_row(6, "2024-01-08", wizard="park"))
+    client.requests.clear()
+
+    # Only the rows at or after the watermark (01-05) come back.
+    assert sync_mirror("siege_logs", path=path, client=client, force=True) == 3
+    local = fetch_log_rows("siege_logs", "log_id, wizard, result", client=client, path=path)
+    assert [row["log_id"] for row in local] == [1, 2, 3, 4, 5, 6]
+    assert local[1]["result"] == "Lose"
+
+    filtered = fetch_log_rows(
+        "siege_logs",
+        "log_id",
+        eq={"wizard": "kim"},
+        in_={"result": ["Win"]},
+        client=client,
+        path=path,
+    )
+    assert [row["log_id"] for row in filtered] == [1, 3, 4, 5]
+
+
+def test_fetch_without_known_key_pages_remote_table_by_range(monkeypatch):
+    monkeypatch.setattr(log_mirror, "PAGE_SIZE", 2)
+    client = FakeSupabase({"defense_logs": [{"opp_guild": f"g{i}", "result": "Win"} for i in range(5)]})
+    rows = fetch_log_rows("defense_logs", "opp_guild", in_={"result": ["Win"]}, client=client)
+    assert [row["opp_guild"] for row in rows] == [f"g{i}" for i in range(5)]
+    # defense_logs has no known key column, so it keeps the old offset paging.
+    assert [request.bounds for request in client.requests] == [(0, 2), (2, 4), (4, 6)]
+    assert all(not request.orders for request in client.requests)
+
+
+def test_full_resync_drops_rows_deleted_remotely(tmp_path, monkeypatch):
+    path = tmp_path / "mirror.sqlite3"
+    rows = [_siege_row(i, f"2024-01-0{i}") for i in range(1, 5)]
+    client = FakeSupabase({"siege_logs": rows})
+    assert sync_mirror("siege_logs", path=path, client=client, force=True) == 4
+
+    # Row 2 is deleted and row 3 re-keyed; an incremental sync misses both.
+    del rows[1]
+    rows[1] = dict(rows[1], log_id=30)
+    sync_mirror("siege_logs", path=path, client=client, force=True)
+    local = fetch_log_rows("siege_logs", "log_id", client=client, path=path)
+    assert [row["log_id"] for row in local] == [1, 2, 3, 4]
+
+    assert sync_mirror("siege_logs", path=path, client=client, full=True) == 3
+    local = fetch_log_rows("siege_logs", "log_id", client=client, path=path)
+    assert [row["log_id"] for row in local] == [1, 4, 30]
+
+    # Once the resync interval passes, a plain sync re-reads the table too.
+    del rows[0]
+    monkeypatch.setattr(log_mirror, "MIRROR_RESYNC_INTERVAL_S", 0.0)
+    assert sync_mirror("siege_logs", path=path, client=client, force=True) == 2
+    local = fetch_log_rows("siege_logs", "log_id", client=client, path=path)
+    assert [row["log_id"] for row in local] == [4, 30]
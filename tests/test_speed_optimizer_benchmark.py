@@ -0,0 +1,35 @@
+import json
+import os
+
+from config.atb_simulator_presets import ATB_SIMULATOR_PRESETS
+from domain.speed_optimizer_benchmark import run_benchmarks, section1_benchmark_inputs, synthetic_preset
+from domain.speed_optimizer_cache import CACHE_PATH_ENV
+from domain.speed_optimizer_detail import build_section1_detail_cached
+
+
+def test_synthetic_presets_have_distinct_prefixed_monsters():
+    preset = synthetic_preset(10)
+    keys = [unit["key"] for unit in preset["allies"] + preset["enemies"]]
+    assert len(preset["allies"]) == 5 and len(preset["enemies"]) == 5
+    assert len(set(keys)) == 10
+    assert all(key.startswith("A|") for key in keys[:5])
+
+
+def test_benchmark_report_is_json_and_restores_cache_settings(monkeypatch, tmp_path):
+    monkeypatch.setenv(CACHE_PATH_ENV, str(tmp_path / "cache.sqlite3"))
+    report = run_benchmarks(preset_ids=["Preset B"], monster_counts=(6,), min_time_s=0.0)
+
+    assert json.loads(json.dumps(report)) == report
+    assert set(report["simulate_with_turn_log"]) == {"Preset B", "synthetic_6"}
+    assert report["simulate_with_turn_log"]["synthetic_6"]["monsters"] == 6
+    assert report["simulate_with_turn_log"]["Preset B"]["simulations"] >= 1
+    assert report["build_section1_detail"]["Preset B"]["status"] == "OK"
+    assert report["build_section1_detail"]["Preset B"]["inputs"] == [None, 170, None]
+    assert not (tmp_path / "cache.sqlite3").exists()
+    assert os.environ[CACHE_PATH_ENV] == str(tmp_path / "cache.sqlite3")
+
+
+def test_default_section1_inputs_run_a_real_search():
+    for preset_id in ATB_SIMULATOR_PRESETS:
+        inputs = section1_benchmark_inputs(preset_id)
+        assert build_section1_detail_cached(preset_id, *inputs, None, False).status == "OK", preset_id
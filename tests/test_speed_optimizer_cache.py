@@ -0,0 +1,86 @@
+import dataclasses
+
+import domain.speed_optimizer_cache as speed_optimizer_cache
+import domain.speed_optimizer_detail as speed_optimizer_detail
+from domain.speed_optimizer_cache import (
+    CACHE_PATH_ENV,
+    load_result,
+    make_cache_key,
+    resolve_cache_path,
+    store_result,
+)
+
+
+def test_store_and_load_round_trip(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    key = make_cache_key("Preset A", 10, 20, None, False)
+    assert load_result(path, key) is None
+    store_result(path, key, {"status": "OK"})
+    assert load_result(path, key) == {"status": "OK"}
+    assert load_result(path, make_cache_key("Preset A", 10, 21, None, False)) is None
+
+
+def test_preset_content_change_invalidates_only_that_preset(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite3"
+    key_a = make_cache_key("Preset A", 10, 20, None, False)
+    key_c = make_cache_key("Preset C", 220, 0, None, False)
+    store_result(path, key_a, "cached a")
+    store_result(path, key_c, "cached c")
+
+    original_compile = speed_optimizer_cache.compile_preset
+
+    def retuned_compile(preset_id):
+        compiled = original_compile(preset_id)
+        if preset_id != "Preset C":
+            return compiled
+        return dataclasses.replace(compiled, fingerprint="retuned")
+
+    monkeypatch.setattr(speed_optimizer_cache, "compile_preset", retuned_compile)
+    new_key_c = make_cache_key("Preset C", 220, 0, None, False)
+    assert new_key_c != key_c
+    assert load_result(path, new_key_c) is None
+    assert make_cache_key("Preset A", 10, 20, None, False) == key_a
+    store_result(path, new_key_c, "rebuilt c")
+
+    assert load_result(path, key_a) == "cached a"
+    assert load_result(path, key_c) is None
+    assert load_result(path, new_key_c) == "rebuilt c"
+
+
+def test_size_eviction_drops_least_recently_read(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    payload = "x" * 400
+    keys = [make_cache_key("Preset A", speed, 0, None, False) for speed in (1, 2, 3)]
+    store_result(path, keys[0], payload, max_bytes=1000)
+    store_result(path, keys[1], payload, max_bytes=1000)
+    assert load_result(path, keys[0]) == payload
+    store_result(path, keys[2], payload, max_bytes=1000)
+
+    assert load_result(path, keys[0]) == payload
+    assert load_result(path, keys[1]) is None
+    assert load_result(path, keys[2]) == payload
+
+
+def test_empty_cache_path_disables_persistence(monkeypatch, tmp_path):
+    monkeypatch.setenv(CACHE_PATH_ENV, "")
+    assert resolve_cache_path() is None
+    monkeypatch.setenv(CACHE_PATH_ENV, str(tmp_path / "cache.sqlite3"))
+    assert resolve_cache_path() == tmp_path / "cache.sqlite3"
+
+
+def test_detail_builder_reads_persistent_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv(CACHE_PATH_ENV, str(tmp_path / "cache.sqlite3"))
+    built = []
+    original_build = speed_optimizer_detail._build_section1_detail
+
+    def counting_build(*args):
+        built.append(args)
+        return original_build(*args)
+
+    monkeypatch.setattr(speed_optimizer_detail, "_build_section1_detail", counting_build)
+    uncached_build = speed_optimizer_detail.build_section1_detail_cached.__wrapped__
+    first = uncached_build("Preset C", 220, 0, None, None, False)
+    second = uncached_build("Preset C", 220, 0, None, None, False)
+
+    assert len(built) == 1
+    assert second == first
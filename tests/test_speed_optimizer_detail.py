@@ -1,13 +1,31 @@
+import itertools
+
+import pytest
+
 from config.atb_simulator_presets import ATB_MONSTER_LIBRARY, build_full_preset
+import domain.speed_optimizer_detail as speed_optimizer_detail
 from domain.speed_optimizer_detail import (
+    DEBUG_ATTEMPT_LIMIT,
+    SEARCH_MODE_BISECT,
+    SEARCH_MODE_SCAN,
     RequiredOrder,
+    SimulationMemo,
     _build_enemy_mirror,
+    _build_section1_detail,
     _build_detail_preset,
     _resolve_enemy_baseline_rune_speed,
     _build_section1_overrides,
+    _new_debug_payload,
+    _record_debug_attempt,
+    _build_final_tick_table_for_a3,
+    _build_unit_detail_table,
     _find_minimum_rune_speed,
+    _init_speed_cache,
     _matches_required_order,
     _resolve_required_order,
+    build_enemy_speed_sweep,
+    build_joint_speed_pareto,
+    estimate_order_probability,
     build_section1_detail_cached,
 )
 from domain.atb_simulator_utils import prefix_monsters
@@ -334,6 +352,22 @@ def test_ui_effect_table_title_helper_uses_library_name_or_unknown():
     assert _effect_table_title_from_monster_key(None) == "UNKNOWN"
 
 
+def test_ui_section1_details_keep_preset_order_when_run_in_pool():
+    import streamlit as st
+    from ui import speed_optimizer_tab
+
+    st.session_state["speedopt_sec1_cache"] = {}
+    progress = []
+    results = speed_optimizer_tab._compute_section1_details(220, 0, None, progress_callback=progress.append)
+
+    preset_ids = list(speed_optimizer_tab.ATB_SIMULATOR_PRESETS.keys())
+    assert [result.preset_name for result in results] == preset_ids
+    assert progress == sorted(progress)
+    assert progress[-1] == 1.0
+    serial = build_section1_detail_cached(preset_ids[2], 220, 0, None, 10.0, False)
+    assert results[2].effect_table == serial.effect_table
+
+
 def test_preset_e_uses_dark_harg():
     preset = build_full_preset("Preset E")
     assert preset["allies"][1]["key"] == "dark_harg"
@@ -446,3 +480,420 @@ def test_preset_a_min_cut_respects_order():
     overrides[detail_keys["a3"]] = {"rune_speed": min_speed, "speedIncreasingEffect": 0}
     matched, _, _ = _matches_required_order(detail_preset, overrides, required_order)
     assert matched is True
+
+
+def _detail_context(preset_id, input_1, input_2, input_3):
+    preset = build_full_preset(preset_id)
+    allies, _ = prefix_monsters(preset["allies"], prefix="A")
+    enemies, _ = prefix_monsters(preset["enemies"], prefix="E")
+    overrides, _, enemy_speed = _build_section1_overrides(
+        preset_id,
+        allies,
+        enemies,
+        input_1=input_1,
+        input_2=input_2,
+        input_3=input_3,
+        allow_enemy_fallback=True,
+    )
+    enemy_mirror = _build_enemy_mirror(preset_id, allies, overrides, enemy_baseline_rune_speed=enemy_speed)
+    detail_preset, detail_keys = _build_detail_preset(preset, allies, enemy_mirror)
+    required_order = _resolve_required_order(preset_id, detail_keys)
+    return detail_preset, detail_keys, required_order, overrides
+
+
+def test_bisect_search_matches_scan_and_keeps_effect_log_shape():
+    detail_preset, detail_keys, required_order, overrides = _detail_context("Preset C", 220, 0, None)
+    for effect, start_speed in [(0, 150), (30, 150), (30, 175)]:
+        scan_debug = {"attempts": [], "attempt_limit": 0, "effect_logs": []}
+        bisect_debug = {"attempts": [], "attempt_limit": 0, "effect_logs": []}
+        scanned = _find_minimum_rune_speed(
+            detail_preset,
+            required_order,
+            overrides,
+            detail_keys["a3"],
+            effect=effect,
+            start_speed=start_speed,
+            deadline=None,
+            debug=scan_debug,
+            search_mode=SEARCH_MODE_SCAN,
+        )
+        bisected = _find_minimum_rune_speed(
+            detail_preset,
+            required_order,
+            overrides,
+            detail_keys["a3"],
+            effect=effect,
+            start_speed=start_speed,
+            deadline=None,
+            debug=bisect_debug,
+            search_mode=SEARCH_MODE_BISECT,
+        )
+        assert bisected == scanned
+        assert len(bisect_debug["effect_logs"]) == 1
+        bisect_log = bisect_debug["effect_logs"][0]
+        assert bisect_log.keys() == scan_debug["effect_logs"][0].keys()
+        assert bisect_log["final_min"] == scanned
+        assert len(bisect_log["coarse_attempts"]) + len(bisect_log["refine_attempts"]) < (
+            len(scan_debug["effect_logs"][0]["coarse_attempts"])
+            + len(scan_debug["effect_logs"][0]["refine_attempts"])
+        )
+
+
+def test_bisect_search_falls_back_to_scan_when_not_monotone(monkeypatch):
+    feasible_speeds = set(range(150, 153)) | set(range(165, 251))
+    probes = []
+
+    def fake_attempt(
+        detail_preset, base_overrides, required_order, target_key, effect, rune_speed, debug, phase, memo=None
+    ):
+        probes.append(phase)
+        return rune_speed in feasible_speeds
+
+    monkeypatch.setattr(speed_optimizer_detail, "_simulate_attempt", fake_attempt)
+    required_order = RequiredOrder(mode="strict", order=["a1"])
+    kwargs = dict(effect=0, start_speed=200, deadline=None, debug=None)
+
+    unverified = _find_minimum_rune_speed({}, required_order, {}, "a1", verify=False, **kwargs)
+    assert unverified == 150
+
+    probes.clear()
+    verified = _find_minimum_rune_speed({}, required_order, {}, "a1", **kwargs)
+    assert "verify" in probes
+    scanned = _find_minimum_rune_speed({}, required_order, {}, "a1", search_mode=SEARCH_MODE_SCAN, **kwargs)
+    assert verified == scanned == 165
+
+
+def test_speed_signature_cache_reuses_equivalent_attempts():
+    detail_preset, detail_keys, required_order, overrides = _detail_context("Preset C", 220, 0, None)
+    target_key = detail_keys["a3"]
+    memo = SimulationMemo()
+    for effect in range(0, 12):
+        kwargs = dict(effect=effect, start_speed=150, deadline=None, debug=None)
+        uncached = _find_minimum_rune_speed(detail_preset, required_order, overrides, target_key, **kwargs)
+        cached = _find_minimum_rune_speed(
+            detail_preset,
+            required_order,
+            overrides,
+            target_key,
+            memo=memo,
+            **kwargs,
+        )
+        assert cached == uncached
+    assert memo.stats["signature_hits"] > 0
+    assert memo.stats["misses"] == len(memo.turn_events)
+
+
+def test_speed_signature_cache_is_disabled_for_flat_speed_buffs():
+    detail_preset, _, _, _ = _detail_context("Preset C", 220, 0, None)
+    detail_preset["allies"][0]["skills"] = [{"applyOnTurn": 1, "target": "allies", "flatSpeedBuff": True}]
+    assert _init_speed_cache(detail_preset) is None
+
+
+def test_grid_signature_prefill_matches_per_effect_search(monkeypatch):
+    monkeypatch.setattr(speed_optimizer_detail, "MAX_EFFECT", 12)
+    detail_preset, detail_keys, required_order, overrides = _detail_context("Preset C", 220, 0, None)
+    simulated_calls = []
+    original_simulate = speed_optimizer_detail.iter_turn_events
+
+    def counting_simulate(*args, **kwargs):
+        simulated_calls.append(1)
+        return original_simulate(*args, **kwargs)
+
+    monkeypatch.setattr(speed_optimizer_detail, "iter_turn_events", counting_simulate)
+    prefilled, prefilled_error = _build_unit_detail_table(
+        detail_preset, required_order, overrides, detail_keys["a3"], deadline=None, debug=None
+    )
+    assert prefilled_error is None
+    assert simulated_calls == []
+
+    monkeypatch.setattr(speed_optimizer_detail, "_prefill_grid_signatures", lambda *args: None)
+    searched, _ = _build_unit_detail_table(
+        detail_preset, required_order, overrides, detail_keys["a3"], deadline=None, debug=None
+    )
+    assert simulated_calls
+    assert prefilled.ranges == searched.ranges
+
+
+def test_simulation_memo_is_shared_across_helpers():
+    detail_preset, detail_keys, required_order, overrides = _detail_context("Preset C", 220, 0, None)
+    target_key = detail_keys["a3"]
+    memo = SimulationMemo()
+    table, _ = _build_unit_detail_table(
+        detail_preset, required_order, overrides, target_key, deadline=None, debug=None, memo=memo
+    )
+    assert table is not None
+    simulated = memo.stats["misses"]
+
+    tick_table = _build_final_tick_table_for_a3(
+        detail_preset,
+        required_order,
+        overrides,
+        target_key,
+        {target_key: "A3"},
+        deadline=None,
+        memo=memo,
+    )
+    assert tick_table
+    assert memo.stats["misses"] == simulated
+    assert memo.stats["signature_hits"] > 0
+
+    baseline = dict(overrides)
+    baseline[target_key] = {"rune_speed": 150, "speedIncreasingEffect": 0}
+    first = _matches_required_order(detail_preset, baseline, required_order, memo=memo)
+    second = _matches_required_order(detail_preset, baseline, required_order, memo=memo)
+    assert first == second
+    assert memo.stats["hits"] == 1
+
+
+def _effect0_rune_speed(result):
+    speed = result.effect_table.ranges[0]["Rune Speed"]
+    return None if speed == "NO SOLUTION" else int(speed)
+
+
+def test_enemy_speed_sweep_matches_single_builds():
+    rows = build_enemy_speed_sweep("Preset C", 220, None, enemy_rune_speeds=[180, 205, 215, 240])
+    assert [row["enemy_rune_speed"] for row in rows] == [180, 205, 215, 240]
+    for row in rows:
+        result = build_section1_detail_cached("Preset C", 220, None, row["enemy_rune_speed"], None, False)
+        assert row["a3_min_rune_speed"] == _effect0_rune_speed(result)
+
+    input_2 = 160
+    (row,) = build_enemy_speed_sweep("Preset B", None, input_2, enemy_rune_speeds=[input_2 + 39])
+    result = build_section1_detail_cached("Preset B", None, input_2, None, None, False)
+    assert row["a3_min_rune_speed"] == _effect0_rune_speed(result)
+    assert row["a1_min_rune_speed"] is not None
+
+
+@pytest.mark.parametrize("preset_id, enemy_rune_speed", [("Preset A", 219), ("Preset E", 210)])
+def test_joint_speed_pareto_matches_brute_force(preset_id, enemy_rune_speed):
+    rows = build_joint_speed_pareto(preset_id, enemy_rune_speed, speed_range=(150, 250), step=20)
+    assert rows
+    assert [row["total_rune_speed"] for row in rows] == sorted(row["total_rune_speed"] for row in rows)
+
+    preset = speed_optimizer_detail.compile_preset(preset_id).preset
+    allies = list(preset["allies"])
+    mirror = _build_enemy_mirror(preset_id, allies, {}, enemy_rune_speed)
+    detail_preset, detail_keys = _build_detail_preset(preset, allies, mirror)
+    required_order = _resolve_required_order(preset_id, detail_keys)
+    feasible = set()
+    for speeds in itertools.product(range(150, 251, 20), repeat=3):
+        overrides = {
+            detail_keys[role]: {"rune_speed": speed} for role, speed in zip(("a1", "a2", "a3"), speeds)
+        }
+        if _matches_required_order(detail_preset, overrides, required_order)[0]:
+            feasible.add(speeds)
+    pareto = {
+        point
+        for point in feasible
+        if not any(other != point and all(a <= b for a, b in zip(other, point)) for other in feasible)
+    }
+    assert {(row["a1_rune_speed"], row["a2_rune_speed"], row["a3_rune_speed"]) for row in rows} == pareto
+
+
+def _section1_detail_context(preset_id, input_1, input_2, a3_rune_speed):
+    preset = speed_optimizer_detail.compile_preset(preset_id).preset
+    allies = list(preset["allies"])
+    overrides, _, _ = _build_section1_overrides(
+        preset_id, allies, list(preset["enemies"]), input_1, input_2, None, allow_enemy_fallback=True
+    )
+    mirror = _build_enemy_mirror(preset_id, allies, overrides, 0)
+    detail_preset, detail_keys = _build_detail_preset(preset, allies, mirror)
+    overrides[detail_keys["a3"]] = {"rune_speed": a3_rune_speed, "speedIncreasingEffect": 0}
+    return detail_preset, detail_keys, _resolve_required_order(preset_id, detail_keys), overrides
+
+
+def test_order_probability_matches_exact_enumeration():
+    detail_preset, detail_keys, required_order, overrides = _section1_detail_context("Preset C", 220, None, 200)
+    matched = 0
+    for enemy_rune_speed in range(190, 231):
+        row = dict(overrides, **{detail_keys["e_fast"]: {"rune_speed": enemy_rune_speed}})
+        matched += _matches_required_order(detail_preset, row, required_order)[0]
+    exact = matched / 41
+
+    estimate = estimate_order_probability("Preset C", 220, None, {"a3": 200}, (190, 230), seed=7)
+    assert estimate["samples"] == 10_000
+    assert abs(estimate["probability"] - exact) < 4 * estimate["std_error"] + 1e-9
+
+
+def test_order_probability_applies_enemy_tower_and_lead():
+    detail_preset, detail_keys, required_order, overrides = _section1_detail_context("Preset C", 220, None, 190)
+    row = dict(overrides, **{detail_keys["e_fast"]: {"rune_speed": 236}})
+    outcomes = []
+    for tower, lead in [(0, 30), (0, 0)]:
+        tuned_preset = dict(detail_preset, enemyEffects={"tower": tower, "lead": lead})
+        expected = _matches_required_order(tuned_preset, row, required_order)[0]
+        estimate = estimate_order_probability(
+            "Preset C",
+            220,
+            None,
+            {"a3": 190},
+            (236, 236),
+            enemy_tower_range=(tower, tower),
+            enemy_lead_range=(lead, lead),
+            samples=50,
+        )
+        assert estimate["probability"] == float(expected)
+        outcomes.append(expected)
+    assert outcomes[0] != outcomes[1]
+
+
+def test_ui_section1_job_manager_shares_and_cancels_jobs():
+    from concurrent.futures import Future
+
+    from ui import speed_optimizer_tab
+
+    class PendingExecutor:
+        def submit(self, fn, *args):
+            return Future()
+
+    manager = speed_optimizer_tab.Section1JobManager(max_workers=1)
+    manager._executor = PendingExecutor()
+    first = ("Preset C", 220, None, None, 10.0, False)
+    second = ("Preset D", 220, None, None, 10.0, False)
+
+    shared = manager.submit("session-a", first)
+    assert manager.submit("session-b", first) is shared
+    superseded = manager.submit("session-a", second)
+    assert manager.in_flight() == 2
+
+    manager.release("session-a", keep=[first])
+    assert superseded.cancelled()
+    manager.release("session-a")
+    assert not shared.cancelled()
+    manager.release("session-b")
+    assert shared.cancelled()
+    assert manager.in_flight() == 0
+
+
+def test_ui_section1_job_manager_evicts_silent_sessions(monkeypatch):
+    from concurrent.futures import Future
+
+    from ui import speed_optimizer_tab
+
+    class PendingExecutor:
+        def submit(self, fn, *args):
+            return Future()
+
+    clock = [0.0]
+    monkeypatch.setattr(speed_optimizer_tab.time, "monotonic", lambda: clock[0])
+    manager = speed_optimizer_tab.Section1JobManager(max_workers=1, owner_ttl_s=60.0)
+    manager._executor = PendingExecutor()
+    shared = manager.submit("closed-tab", ("Preset C", 220, None, None, 10.0, False))
+    manager.submit("live-tab", ("Preset C", 220, None, None, 10.0, False))
+    orphaned = manager.submit("closed-tab", ("Preset D", 220, None, None, 10.0, False))
+
+    clock[0] = 30.0
+    manager.touch("live-tab")
+    assert not orphaned.cancelled()
+    clock[0] = 90.0
+    manager.touch("live-tab")
+    assert orphaned.cancelled()
+    assert not shared.cancelled()
+    assert manager.in_flight() == 1
+
+
+def test_ui_section1_workers_are_capped(monkeypatch):
+    from ui import speed_optimizer_tab
+
+    monkeypatch.setattr(speed_optimizer_tab.os, "cpu_count", lambda: 64)
+    monkeypatch.delenv(speed_optimizer_tab.SECTION1_WORKERS_ENV, raising=False)
+    assert speed_optimizer_tab.resolve_section1_workers() == speed_optimizer_tab.DEFAULT_SECTION1_WORKERS
+    monkeypatch.setenv(speed_optimizer_tab.SECTION1_WORKERS_ENV, "3")
+    assert speed_optimizer_tab.resolve_section1_workers() == 3
+    monkeypatch.setenv(speed_optimizer_tab.SECTION1_WORKERS_ENV, "1000")
+    assert speed_optimizer_tab.resolve_section1_workers() == len(speed_optimizer_tab.ATB_SIMULATOR_PRESETS)
+
+
+def test_ui_section1_debug_jobs_skip_the_precomputed_grid(monkeypatch):
+    import streamlit as st
+    from ui import speed_optimizer_tab
+
+    class FakeJobs:
+        def __init__(self):
+            self.submitted = []
+
+        def release(self, owner, keep=()):
+            pass
+
+        def submit(self, owner, key):
+            self.submitted.append(key)
+            return None
+
+    jobs = FakeJobs()
+    lookups = []
+    monkeypatch.setattr(speed_optimizer_tab, "_get_section1_jobs", lambda: jobs)
+    monkeypatch.setattr(
+        speed_optimizer_tab,
+        "lookup_precomputed_result",
+        lambda *args: lookups.append(args) or object(),
+    )
+    st.session_state["speedopt_sec1_cache"] = {}
+
+    plain = speed_optimizer_tab._start_section1_job(220, 0, None)
+    assert len(plain["results"]) == len(lookups) == len(speed_optimizer_tab.ATB_SIMULATOR_PRESETS)
+    assert jobs.submitted == []
+
+    lookups.clear()
+    debugged = speed_optimizer_tab._start_section1_job(220, 0, None, debug_mode=True)
+    assert lookups == [] and debugged["results"] == {}
+    assert [key[-1] for key in jobs.submitted] == [True] * len(speed_optimizer_tab.ATB_SIMULATOR_PRESETS)
+
+
+def test_debug_capture_is_bounded_and_formats_atb_log_lazily(monkeypatch):
+    import domain.speed_optimizer_detail as speed_optimizer_detail
+
+    formatted = []
+    original_format = speed_optimizer_detail._format_atb_log
+
+    def counting_format(*args):
+        formatted.append(args)
+        return original_format(*args)
+
+    monkeypatch.setattr(speed_optimizer_detail, "_format_atb_log", counting_format)
+    plain = _build_section1_detail("Preset C", 220, 0, None, None, False)
+    formatted.clear()
+    debugged = _build_section1_detail("Preset C", 220, 0, None, None, True)
+
+    capture = debugged.debug
+    debugged.debug = None
+    assert debugged == plain
+    assert capture["attempts_seen"] > DEBUG_ATTEMPT_LIMIT
+    assert len(capture["attempts"]) == DEBUG_ATTEMPT_LIMIT
+    assert capture["truncated"]
+
+    tick_formats = len(formatted)
+    rows = capture["tick_atb_log"].rows()
+    assert len(formatted) == tick_formats + 1
+    assert capture["tick_atb_log"].rows() is rows
+    assert len(formatted) == tick_formats + 1
+
+
+def test_debug_capture_keeps_failures_and_samples_matches():
+    required_order = RequiredOrder(mode="exact", order=["A|a3", "E|e1"])
+    debug = _new_debug_payload({})
+    debug["attempt_sample_every"] = 4
+    for index in range(20):
+        _record_debug_attempt(debug, 0, 150 + index, required_order, index >= 10, [], [], phase="coarse")
+
+    speeds = [attempt["rune_speed"] for attempt in debug["attempts"]]
+    assert speeds == list(range(150, 160)) + [162, 166]
+    assert debug["attempts_seen"] == 20
+    assert not debug["truncated"]
+
+
+def test_section1_stats_are_attached_only_when_enabled(monkeypatch):
+    from domain.speed_optimizer_detail import STATS_ENV
+
+    monkeypatch.delenv(STATS_ENV, raising=False)
+    plain = _build_section1_detail("Preset C", 220, 0, None, None, False)
+    assert plain.stats is None
+
+    monkeypatch.setenv(STATS_ENV, "1")
+    measured = _build_section1_detail("Preset C", 220, 0, None, None, False)
+    stats = measured.stats
+    assert measured == plain
+    assert stats.simulations == stats.phase_simulations["total"] > 0
+    assert stats.ticks >= stats.turns > 0
+    assert stats.phase_simulations["effect_table"] <= stats.simulations
+    assert stats.phase_seconds["total"] >= stats.phase_seconds["effect_table"]
+    assert sum(stats.cache.values()) > 0
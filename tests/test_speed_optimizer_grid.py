@@ -0,0 +1,44 @@
+import json
+
+import domain.speed_optimizer_grid as speed_optimizer_grid
+from domain.speed_optimizer_detail import build_section1_detail_cached
+from domain.speed_optimizer_grid import build_grid, lookup_precomputed_result
+
+
+def test_precomputed_grid_matches_live_results(tmp_path):
+    path = tmp_path / "grid"
+    meta = build_grid(
+        path,
+        preset_ids=["Preset A", "Preset C"],
+        input_1_range=(220, 221),
+        input_2_range=(180, 181),
+        input_3_range=(200, 200),
+        workers=1,
+    )
+    assert meta["presets"] == {"Preset A": [0, 2], "Preset C": [2, 4]}
+
+    for preset_id, inputs in [
+        ("Preset A", (230, 181, 190)),
+        ("Preset C", (221, 30, None)),
+        ("Preset C", (220, None, 200)),
+    ]:
+        assert lookup_precomputed_result(preset_id, *inputs, path=path) == build_section1_detail_cached(
+            preset_id, *inputs, None, False
+        )
+
+    assert lookup_precomputed_result("Preset C", 222, None, None, path=path) is None
+    assert lookup_precomputed_result("Preset C", 220, None, 201, path=path) is None
+    assert lookup_precomputed_result("Preset A", 220, None, None, path=path) is None
+    assert lookup_precomputed_result("Preset D", 220, None, None, path=path) is None
+
+
+def test_precomputed_grid_is_ignored_after_preset_change(tmp_path):
+    path = tmp_path / "grid"
+    build_grid(path, preset_ids=["Preset A"], input_2_range=(180, 180), workers=1)
+    assert lookup_precomputed_result("Preset A", None, 180, None, path=path) is not None
+
+    meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    meta["fingerprints"]["Preset A"] = "stale"
+    (path / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    speed_optimizer_grid._open_grid_files.cache_clear()
+    assert lookup_precomputed_result("Preset A", None, 180, None, path=path) is None
@@ -0,0 +1,43 @@
+from conftest import FakeSupabase
+from services.supabase_scan import scan_table, scan_table_concurrent
+
+
+def test_scan_pages_by_key_and_ignores_rows_inserted_behind_cursor():
+    rows = [{"log_id": i, "wizard": "kim" if i % 2 else "lee", "result": "Win"} for i in range(1, 11)]
+    client = FakeSupabase({"siege_logs": rows})
+
+    seen = []
+    columns = set()
+    for batch in scan_table(client, "siege_logs", ["wizard"], eq={"wizard": "kim"}, page_size=2):
+        seen.append([row["log_id"] for row in batch])
+        columns.update(*batch)
+        if len(seen) == 1:
+            # An offset scan would shift every later page by one here.
+            rows.insert(0, {"log_id": 0, "wizard": "kim", "result": "Win"})
+
+    assert seen == [[1, 3], [5, 7], [9]]
+    assert [query.bounds for query in client.requests] == [(0, 2)] * 3
+    assert columns == {"wizard", "log_id"}
+
+
+def test_concurrent_scan_matches_sequential_scan_in_key_order():
+    rows = [
+        {"log_id": log_id, "result": "Win" if log_id % 3 else "Lose", "updated_at": f"2024-01-{log_id % 28 + 1:02d}"}
+        for log_id in list(range(1, 40)) + list(range(200, 260, 2))
+    ]
+    client = FakeSupabase({"siege_logs": rows})
+    filters = {"in_": {"result": ["Win"]}, "gte": {"updated_at": "2024-01-05"}}
+
+    sequential = [row for batch in scan_table(client, "siege_logs", ["result"], page_size=4, **filters) for row in batch]
+    sequential_requests = len(client.requests)
+    client.requests.clear()
+    concurrent = [
+        row
+        for batch in scan_table_concurrent(client, "siege_logs", ["result"], page_size=4, max_workers=3, **filters)
+        for row in batch
+    ]
+
+    assert concurrent == sequential
+    # Two bound lookups, then one short final page per key partition.
+    assert len(client.requests) > sequential_requests + 2
+    assert list(scan_table_concurrent(client, "siege_logs", ["result"], eq={"result": "Draw"}, max_workers=3)) == []
@@ -1,4 +1,5 @@
 import copy
+from itertools import islice
 from typing import Any, Dict, List
 
 import pandas as pd
@@ -11,7 +12,7 @@ from config.atb_simulator_presets import (
     build_enemy_preset,
     build_monsters_for_keys,
 )
-from domain.atb_simulator import simulate_with_turn_log
+from domain.atb_simulator import iter_turn_events
 from domain.atb_simulator_utils import prefix_monsters
 
 
@@ -103,15 +104,15 @@ This tab runs a Summoners War style ATB tick simulation.
         "tickCount": ally_preset.get("tickCount", 0),
     }
 
-    _, turn_events = simulate_with_turn_log(preset, overrides)
+    max_turns = st.number_input("Max turns to display", min_value=1, value=20, step=1)
+
+    turn_events = list(islice(iter_turn_events(preset, overrides), int(max_turns)))
     if not turn_events:
         st.warning("No turn events were recorded. Please verify the preset data.")
         st.stop()
 
-    max_turns = st.number_input("Max turns to display", min_value=1, value=20, step=1)
-
     rows = []
-    for index, event in enumerate(turn_events[:max_turns], start=1):
+    for index, event in enumerate(turn_events, start=1):
         rows.append({
             "turn_index": index,
             "tick": event.get("tick"),
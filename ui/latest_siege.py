@@ -5,6 +5,7 @@ import pandas as pd
 import streamlit as st
 
 from config.settings import NEW_DEFENSE_DECK_MAX_LOGS
+from data.log_mirror import fetch_log_rows
 from services.supabase_client import get_supabase_client
 from ui.auth import require_access_or_stop
 from ui.search_offense_deck import get_matchups, make_def_key, _normalize_matchups
@@ -65,22 +66,7 @@ def _match_label_from_week_encoding(
 
 @st.cache_data(ttl=300)
 def get_match_options() -> list[MatchOption]:
-    batch_size = 1000
-    offset = 0
-    rows: list[dict] = []
-    while True:
-        res = (
-            sb()
-            .table("siege_logs")
-            .select("match_id, ts, updated_at, opp_guild")
-            .range(offset, offset + batch_size - 1)
-            .execute()
-        )
-        batch = res.data or []
-        rows.extend(batch)
-        if len(batch) < batch_size:
-            break
-        offset += batch_size
+    rows = fetch_log_rows("siege_logs", "match_id, ts, updated_at, opp_guild")
 
     df = pd.DataFrame(rows)
     if df.empty or "match_id" not in df.columns:
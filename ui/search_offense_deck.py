@@ -4,6 +4,7 @@ import pandas as pd
 from ui.auth import require_access_or_stop
 from ui.table_utils import apply_dataframe_style
 
+from data.defense_matchups import fetch_matchups
 from data.siege_trend import build_cumulative_trend_df
 from ui.siege_trend_chart import render_cumulative_trend_chart
 from services.supabase_client import get_supabase_client
@@ -89,17 +90,7 @@ def get_third_units(a: str, b: str):
 # -------------------------
 @st.cache_data(ttl=120)
 def get_matchups(def_key: str, limit: int = 200):
-    res = (
-        sb()
-        .table("defense_matchups")
-        .select("o1,o2,o3,win,lose,total,win_rate")
-        .eq("def_key", def_key)
-        .order("total", desc=True)
-        .order("win_rate", desc=True)
-        .limit(int(limit))
-        .execute()
-    )
-    return pd.DataFrame(res.data or [])
+    return pd.DataFrame(fetch_matchups(def_key, limit=int(limit)))
 
 
 def _normalize_matchups(df: pd.DataFrame, limit: int) -> pd.DataFrame:
@@ -1,6 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, Optional
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+import uuid
 
 import streamlit as st
 import streamlit.components.v1 as components
@@ -10,8 +17,19 @@ from html import escape
 from config.atb_simulator_presets import ATB_MONSTER_LIBRARY, ATB_SIMULATOR_PRESETS
 from domain.speed_optimizer_detail import (
     PresetDetailResult,
+    build_enemy_speed_sweep,
     build_section1_detail_cached,
 )
+from domain.speed_optimizer_grid import lookup_precomputed_result
+
+SECTION1_POLL_INTERVAL_S = 0.25
+# A session that has not polled for this long (closed tab, dropped
+# connection) stops owning its jobs, so unstarted ones can be cancelled.
+SECTION1_OWNER_TTL_S = 120.0
+# Caps the shared section 1 pool so one session cannot take every core on a
+# shared host.
+SECTION1_WORKERS_ENV = "SPEEDOPT_WORKERS"
+DEFAULT_SECTION1_WORKERS = 2
 
 
 def render_speed_optimizer_tab(state: Dict[str, Any], monster_names: Dict[int, str]) -> None:
@@ -28,7 +46,10 @@ def _initialize_speedopt_state() -> None:
         "speedopt_sec1_payload": None,
         "speedopt_sec1_results": None,
         "speedopt_sec1_cache": {},
+        "speedopt_sec1_sweeps": {},
+        "speedopt_sec1_job": None,
         "speedopt_sec1_max_runtime_s": 10.0,
+        "speedopt_sec1_debug": False,
         "speedopt_sec1_in1": "",
         "speedopt_sec1_in2": "",
         "speedopt_sec1_in3": "",
@@ -53,12 +74,10 @@ def _render_section_1() -> None:
         with input_cols[2]:
             st.text_input("적 최신속 (빛늑 기준)", key="speedopt_sec1_in3", label_visibility="collapsed")
         with spacer_col:
-            st.empty()
+            st.checkbox("Debug", key="speedopt_sec1_debug")
         with run_col:
             run_clicked = st.form_submit_button("Run", key="speedopt_sec1_run")
 
-    progress_slot = st.empty()
-
     if run_clicked:
         input_1 = st.session_state.speedopt_sec1_in1
         input_2 = st.session_state.speedopt_sec1_in2
@@ -77,24 +96,46 @@ def _render_section_1() -> None:
             "input_1": input_1,
             "input_2": input_2,
             "input_3": effective_input_3,
+            "parsed_inputs": (parsed_input_1, parsed_input_2),
         }
         st.session_state.speedopt_sec1_payload = payload
-        progress_bar = _render_progress_bar(progress_slot)
-        st.session_state.speedopt_sec1_results = _compute_section1_details(
+        # Starting a new job releases the previous one, so presets it had not
+        # started yet are cancelled instead of finishing for nobody.
+        st.session_state.speedopt_sec1_job = _start_section1_job(
             parsed_input_1,
             parsed_input_2,
             parsed_input_3,
-            progress_callback=lambda value: progress_bar.progress(value),
+            debug_mode=bool(st.session_state.speedopt_sec1_debug),
         )
-        results = st.session_state.speedopt_sec1_results or []
-        if results:
-            payload["resolved_enemy_rune_speed"] = results[0].enemy_rune_speed_effective
-        progress_bar.progress(1.0)
-        st.session_state.speedopt_sec1_ran = True
+
+    if st.session_state.get("speedopt_sec1_job") is not None:
+        # Only the progress fragment reruns while the job is pending, not the
+        # whole app script.
+        st.fragment(run_every=SECTION1_POLL_INTERVAL_S)(_render_section_1_progress)()
 
     _render_section_1_details()
 
 
+def _render_section_1_progress() -> None:
+    job = st.session_state.get("speedopt_sec1_job")
+    if job is None:
+        return
+    progress_bar = _render_progress_bar(st.container())
+    complete = _poll_section1_job(job, wait=False, progress_callback=progress_bar.progress)
+    progress_bar.progress(len(job["results"]) / max(len(job["keys"]), 1))
+    if not complete:
+        return
+    st.session_state.speedopt_sec1_job = None
+    st.session_state.speedopt_sec1_results = _finish_section1_job(job)
+    results = st.session_state.speedopt_sec1_results or []
+    payload = st.session_state.speedopt_sec1_payload or {}
+    if results:
+        payload["resolved_enemy_rune_speed"] = results[0].enemy_rune_speed_effective
+    st.session_state.speedopt_sec1_ran = True
+    # The details live outside the fragment; one full rerun renders them.
+    st.rerun()
+
+
 
 def _render_progress_bar(container: st.delta_generator.DeltaGenerator) -> st.delta_generator.DeltaGenerator:
     container.markdown("<div style='height: 6px'></div>", unsafe_allow_html=True)
@@ -149,10 +190,42 @@ def _render_section_1_details() -> None:
                 with st.expander("틱 테이블 보기", expanded=False):
                     st.markdown("**Tick ATB Table (Effect 0)**")
                     _render_tick_table(result.tick_atb_table, result.tick_headers)
+            if result.debug and result.debug.get("tick_atb_log") is not None:
+                _render_debug_atb_log(result.preset_name, result.debug["tick_atb_log"])
+            _render_enemy_speed_sweep(result.preset_name, payload.get("parsed_inputs", (None, None)))
             if index < len(results) - 1:
                 st.divider()
 
 
+def _render_debug_atb_log(preset_id: str, atb_log: Any) -> None:
+    with st.expander("디버그 ATB 로그", expanded=False):
+        # Expander bodies run even when collapsed, so the rows are only built
+        # once the toggle asks for them.
+        if not st.toggle("Show", key=f"speedopt_sec1_atb_log_{preset_id}"):
+            st.caption("Baseline ATB per tick for a1, a2, a3 and the fastest enemy.")
+            return
+        st.dataframe(pd.DataFrame(atb_log.rows()), use_container_width=True)
+
+
+def _render_enemy_speed_sweep(preset_id: str, inputs: tuple[Optional[int], Optional[int]]) -> None:
+    with st.expander("적 속도 스윕 보기", expanded=False):
+        sweeps = st.session_state.speedopt_sec1_sweeps
+        sweep_key = (preset_id, *inputs)
+        if st.button("Run sweep", key=f"speedopt_sec1_sweep_{preset_id}"):
+            try:
+                sweeps[sweep_key] = build_enemy_speed_sweep(preset_id, *inputs)
+            except ValueError as exc:
+                st.warning(str(exc))
+                return
+        rows = sweeps.get(sweep_key)
+        if not rows:
+            st.caption("Minimum rune speed (effect 0) for every enemy rune speed.")
+            return
+        df = pd.DataFrame(rows).set_index("enemy_rune_speed")
+        st.line_chart(df)
+        st.dataframe(df, use_container_width=True)
+
+
 def _render_unit_detail_table(
     title: str,
     detail_table: Optional[Any],
@@ -207,7 +280,7 @@ def _render_effect_speed_scroll_row(effect_ranges: list[str], speeds: list[Any])
         ".label { font-size:12px; font-weight:600; opacity:0.85; }"
         ".value { font-size:12px; margin-top:2px; }"
         "</style></head><body>"
-        f'<div class="container">{''.join(tiles)}</div>'
+        f'<div class="container">{"".join(tiles)}</div>'
         "</body></html>"
     )
     components.html(html, height=90, scrolling=True)
@@ -322,41 +395,206 @@ def _compute_section1_details(
     input_3: Optional[int],
     progress_callback: Callable[[float], None] | None = None,
 ) -> list[Any]:
-    debug_mode = False
+    job = _start_section1_job(input_1, input_2, input_3)
+    if progress_callback:
+        progress_callback(len(job["results"]) / max(len(job["keys"]), 1))
+    while not _poll_section1_job(job, wait=True, progress_callback=progress_callback):
+        pass
+    return _finish_section1_job(job)
+
+
+def _start_section1_job(
+    input_1: Optional[int],
+    input_2: Optional[int],
+    input_3: Optional[int],
+    debug_mode: bool = False,
+) -> Dict[str, Any]:
     cache_key = (input_1, input_2, input_3, debug_mode)
+    max_runtime_s = float(st.session_state.get("speedopt_sec1_max_runtime_s") or 10.0)
+    preset_ids = list(ATB_SIMULATOR_PRESETS.keys())
+    keys = [(preset_id, input_1, input_2, input_3, max_runtime_s, debug_mode) for preset_id in preset_ids]
+    job: Dict[str, Any] = {"cache_key": cache_key, "keys": keys, "results": {}, "futures": {}}
+
+    manager = _get_section1_jobs()
+    owner = _section1_owner()
     cached = st.session_state.speedopt_sec1_cache.get(cache_key)
     if cached is not None:
-        if progress_callback:
-            progress_callback(1.0)
-        return cached
+        manager.release(owner)
+        job["results"] = dict(enumerate(cached))
+        return job
+
+    # The precomputed grid stores results without debug captures.
+    for index, preset_id in enumerate([] if debug_mode else preset_ids):
+        precomputed = lookup_precomputed_result(preset_id, input_1, input_2, input_3)
+        if precomputed is not None:
+            job["results"][index] = precomputed
+    pending = {index: key for index, key in enumerate(keys) if index not in job["results"]}
+    manager.release(owner, keep=pending.values())
+    job["futures"] = {index: manager.submit(owner, key) for index, key in pending.items()}
+    return job
+
+
+def _poll_section1_job(
+    job: Dict[str, Any],
+    wait: bool,
+    progress_callback: Callable[[float], None] | None = None,
+) -> bool:
+    results = job["results"]
+    total = len(job["keys"])
+    index_by_future = {
+        future: index for index, future in job["futures"].items() if index not in results
+    }
+    manager = _get_section1_jobs()
+    manager.touch(_section1_owner())
+    try:
+        # Presets are independent, so progress follows completion order while
+        # the finished list keeps the preset order the renderer expects.
+        done = as_completed(index_by_future) if wait else [f for f in index_by_future if f.done()]
+        for future in done:
+            index = index_by_future[future]
+            try:
+                results[index] = future.result()
+            except CancelledError:
+                # Another session's release raced our submit; queue it again.
+                job["futures"][index] = manager.submit(_section1_owner(), job["keys"][index])
+                continue
+            if progress_callback:
+                progress_callback(len(results) / total)
+    except BrokenProcessPool:
+        manager.reset()
+        for index, key in enumerate(job["keys"]):
+            if index in results:
+                continue
+            results[index] = _build_section1_detail_or_error(*key)
+            if progress_callback:
+                progress_callback(len(results) / total)
+    return len(results) == total
+
+
+def _finish_section1_job(job: Dict[str, Any]) -> list[Any]:
+    _get_section1_jobs().release(_section1_owner())
+    results = [job["results"][index] for index in range(len(job["keys"]))]
+    st.session_state.speedopt_sec1_cache[job["cache_key"]] = results
+    return results
 
-    preset_ids = list(ATB_SIMULATOR_PRESETS.keys())
-    max_runtime_s = float(st.session_state.get("speedopt_sec1_max_runtime_s") or 10.0)
-    results: list[Any] = []
-    total = len(preset_ids)
-    if total == 0:
-        return results
 
-    if progress_callback:
-        progress_callback(0.0)
-    for index, preset_id in enumerate(preset_ids, start=1):
-        try:
-            result = build_section1_detail_cached(
-                preset_id,
-                input_1,
-                input_2,
-                input_3,
-                max_runtime_s,
-                debug_mode,
-            )
-        except ValueError as exc:
-            result = _build_error_result(preset_id, str(exc))
-        results.append(result)
-        if progress_callback:
-            progress_callback(index / total)
-
-    st.session_state.speedopt_sec1_cache[cache_key] = results
-    return results
+def _section1_owner() -> str:
+    return st.session_state.setdefault("speedopt_sec1_owner", uuid.uuid4().hex)
+
+
+Section1JobKey = Tuple[str, Optional[int], Optional[int], Optional[int], float, bool]
+
+
+class Section1JobManager:
+    """Runs section 1 preset builds in a process pool shared by all sessions.
+
+    Jobs are keyed by preset and inputs, so sessions asking for the same
+    build share one future. Each session owns the jobs it submitted; once no
+    session wants a job any more it is cancelled if it has not started yet.
+    Sessions silent for longer than owner_ttl_s are released as if they had
+    cancelled.
+    """
+
+    def __init__(self, max_workers: int, owner_ttl_s: float = SECTION1_OWNER_TTL_S) -> None:
+        self._max_workers = max_workers
+        self._owner_ttl_s = owner_ttl_s
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        self._jobs: Dict[Section1JobKey, Future] = {}
+        self._owners: Dict[Section1JobKey, Set[str]] = {}
+        self._last_seen: Dict[str, float] = {}
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Spawned workers: forking the multi-threaded Streamlit server can copy
+        # locks held by other sessions' threads into the children.
+        return ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def submit(self, owner: str, key: Section1JobKey) -> Future:
+        with self._lock:
+            self._touch_locked(owner)
+            future = self._jobs.get(key)
+            if future is None or future.cancelled():
+                future = self._executor.submit(_build_section1_detail_or_error, *key)
+                self._jobs[key] = future
+                self._owners[key] = set()
+            self._owners[key].add(owner)
+            return future
+
+    def release(self, owner: str, keep: Iterable[Section1JobKey] = ()) -> None:
+        with self._lock:
+            self._touch_locked(owner)
+            self._release_locked(owner, set(keep))
+
+    def touch(self, owner: str) -> None:
+        with self._lock:
+            self._touch_locked(owner)
+
+    def _touch_locked(self, owner: str) -> None:
+        now = time.monotonic()
+        self._last_seen[owner] = now
+        for stale in [o for o, seen in self._last_seen.items() if now - seen > self._owner_ttl_s]:
+            del self._last_seen[stale]
+            self._release_locked(stale, set())
+
+    def _release_locked(self, owner: str, keep: Set[Section1JobKey]) -> None:
+        for key in list(self._owners):
+            if key in keep:
+                continue
+            owners = self._owners[key]
+            owners.discard(owner)
+            if not owners:
+                self._jobs.pop(key).cancel()
+                del self._owners[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(1 for future in self._jobs.values() if not future.done())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            self._jobs.clear()
+            self._owners.clear()
+            self._last_seen.clear()
+
+
+@st.cache_resource
+def _get_section1_jobs() -> Section1JobManager:
+    return Section1JobManager(max_workers=resolve_section1_workers())
+
+
+def resolve_section1_workers() -> int:
+    value = os.environ.get(SECTION1_WORKERS_ENV, "").strip()
+    try:
+        cap = max(1, int(value)) if value else DEFAULT_SECTION1_WORKERS
+    except ValueError:
+        cap = DEFAULT_SECTION1_WORKERS
+    return min(len(ATB_SIMULATOR_PRESETS), os.cpu_count() or 1, cap)
+
+
+def _build_section1_detail_or_error(
+    preset_id: str,
+    input_1: Optional[int],
+    input_2: Optional[int],
+    input_3: Optional[int],
+    max_runtime_s: float,
+    debug_mode: bool,
+) -> PresetDetailResult:
+    try:
+        return build_section1_detail_cached(
+            preset_id,
+            input_1,
+            input_2,
+            input_3,
+            max_runtime_s,
+            debug_mode,
+        )
+    except ValueError as exc:
+        return _build_error_result(preset_id, str(exc))
 
 
 def _build_error_result(preset_id: str, message: str):
@@ -1,5 +1,21 @@
 from __future__ import annotations
 
+import threading
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+# Packed deck codes hold three monster codes of this many bits each.
+MONSTER_CODE_BITS = 21
+_MONSTER_CODE_MASK = (1 << MONSTER_CODE_BITS) - 1
+
+# Process-wide monster name dictionary shared by every DataFrame that encodes
+# deck columns; code 0 is the empty slot.
+_monster_codes: dict[str, int] = {"": 0}
+_monster_names: list[str] = [""]
+_monster_lock = threading.Lock()
+
 
 def _clean_name(value: str | None) -> str:
     return str(value).strip() if value is not None else ""
@@ -40,6 +56,101 @@ def make_deck_key(leader: str | None, second: str | None, third: str | None) ->
     return "|".join(slots)
 
 
+def _clean_column(values: Iterable[Any], index: pd.Index | None) -> pd.Series:
+    column = pd.Series(values, index=index, dtype=object)
+    # Missing values are "" like None in _clean_name, including the NaN pandas
+    # fills in for absent columns or string-dtype nulls.
+    return column.where(column.notna(), "").astype(str).str.strip()
+
+
+def make_deck_keys(
+    leaders: Iterable[Any],
+    seconds: Iterable[Any],
+    thirds: Iterable[Any],
+) -> pd.Series:
+    # Column-wise make_deck_key: same keys for whole columns without a Python
+    # call per row. The result keeps the index of `leaders` when it is a Series.
+    index = leaders.index if isinstance(leaders, pd.Series) else None
+    leader = _clean_column(leaders, index)
+    second = _clean_column(seconds, leader.index)
+    third = _clean_column(thirds, leader.index)
+    swap = second > third
+    low = second.where(~swap, third)
+    high = third.where(~swap, second)
+    # "" sorts first, so a lone slot 2/3 monster lands in `high`; move it
+    # forward and pad with "" as normalize_deck_slots does.
+    lone = low == ""
+    first = low.where(~lone, high)
+    last = high.where(~lone, "")
+    return (leader + "|" + first + "|" + last).where(leader != "", "")
+
+
+def _intern_monster(name: str) -> int:
+    code = _monster_codes.get(name)
+    if code is None:
+        code = len(_monster_names)
+        if code > _MONSTER_CODE_MASK:
+            raise ValueError("Too many distinct monster names to pack into deck codes.")
+        _monster_codes[name] = code
+        _monster_names.append(name)
+    return code
+
+
+def encode_monsters(values: Iterable[Any], index: pd.Index | None = None) -> np.ndarray:
+    # Only the distinct names of the column go through the dictionary.
+    inverse, uniques = pd.factorize(_clean_column(values, index))
+    with _monster_lock:
+        table = np.fromiter((_intern_monster(name) for name in uniques), dtype=np.int64, count=len(uniques))
+    return table[inverse]
+
+
+def monster_names(codes: Iterable[int]) -> np.ndarray:
+    with _monster_lock:
+        names = np.asarray(_monster_names, dtype=object)
+    return names[np.asarray(codes, dtype=np.int64)]
+
+
+def make_deck_codes(
+    leaders: Iterable[Any],
+    seconds: Iterable[Any],
+    thirds: Iterable[Any],
+) -> np.ndarray:
+    # One int64 per row that is equal exactly when make_deck_key is equal, so
+    # groupbys hash integers instead of "a|b|c" strings. 0 means no deck.
+    index = leaders.index if isinstance(leaders, pd.Series) else None
+    leader = encode_monsters(leaders, index)
+    index = index if index is not None else pd.RangeIndex(len(leader))
+    second = encode_monsters(seconds, index)
+    third = encode_monsters(thirds, index)
+    low = np.minimum(second, third)
+    high = np.maximum(second, third)
+    # The empty slot is code 0, so a lone slot 2/3 monster lands in `high`;
+    # move it forward like normalize_deck_slots pads the key.
+    first = np.where(low == 0, high, low)
+    last = np.where(low == 0, 0, high)
+    codes = (leader << (2 * MONSTER_CODE_BITS)) | (first << MONSTER_CODE_BITS) | last
+    return np.where(leader == 0, 0, codes)
+
+
+def unpack_deck_codes(codes: Iterable[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    codes = np.asarray(codes, dtype=np.int64)
+    return (
+        codes >> (2 * MONSTER_CODE_BITS),
+        (codes >> MONSTER_CODE_BITS) & _MONSTER_CODE_MASK,
+        codes & _MONSTER_CODE_MASK,
+    )
+
+
+def deck_keys_from_codes(codes: Iterable[int]) -> np.ndarray:
+    # Decodes each distinct deck once; slots 2/3 are packed in code order, so
+    # the key is rebuilt with make_deck_key to get its name order.
+    inverse, uniques = pd.factorize(np.asarray(codes, dtype=np.int64))
+    leaders, seconds, thirds = (monster_names(slot) for slot in unpack_deck_codes(uniques))
+    keys = np.empty(len(uniques), dtype=object)
+    keys[:] = [make_deck_key(*slots) for slots in zip(leaders, seconds, thirds)]
+    return keys[inverse]
+
+
 def split_deck_key(deck_key: str, max_slots: int = 3) -> list[str]:
     parts = deck_key.split("|") if deck_key else []
     return normalize_deck_slots(parts, max_slots=max_slots)